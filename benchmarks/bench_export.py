@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark export paths of DuckDBAnalytics.
+
+Compares wall time, throughput and output size of export_to_csv against
+export_to_parquet (several codecs, per-thread output, hive partitions) and
+export_to_arrow_ipc on the same result set.
+
+Usage:
+    python benchmarks/bench_export.py --rows 5000000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+
+QUERY = "SELECT * FROM sales"
+
+
+def create_sales(analytics, rows):
+    """Create an in-memory sales-like table with the given number of rows"""
+    analytics.create_table_from_query("sales", f"""
+        SELECT
+            range + 1 AS transaction_id,
+            'C' || lpad(((range * 7919) % 100 + 1)::VARCHAR, 4, '0') AS customer_id,
+            'P' || lpad(((range * 104729) % 50 + 1)::VARCHAR, 4, '0') AS product_id,
+            (range % 5 + 1)::INTEGER AS quantity,
+            round(10 + (range * 37 % 199000) / 100.0, 2) AS amount,
+            DATE '2025-01-01' + (range % 365)::INTEGER AS sale_date,
+            ['North', 'South', 'East', 'West', 'Central'][range % 5 + 1] AS region
+        FROM range({rows})
+    """)
+
+
+def output_size(path):
+    """Total size in bytes of a file or of every file below a directory"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def export_cases(tmp_dir):
+    """(label, output path, callable(analytics, path)) for each export path"""
+    return [
+        ("csv", os.path.join(tmp_dir, "sales.csv"),
+         lambda a, p: a.export_to_csv(QUERY, p)),
+        ("parquet snappy", os.path.join(tmp_dir, "snappy.parquet"),
+         lambda a, p: a.export_to_parquet(QUERY, p, compression="snappy")),
+        ("parquet zstd", os.path.join(tmp_dir, "zstd.parquet"),
+         lambda a, p: a.export_to_parquet(QUERY, p, compression="zstd")),
+        ("parquet per-thread", os.path.join(tmp_dir, "per_thread"),
+         lambda a, p: a.export_to_parquet(QUERY, p, compression="snappy", per_thread_output=True)),
+        ("parquet by region", os.path.join(tmp_dir, "by_region"),
+         lambda a, p: a.export_to_parquet(QUERY, p, compression="snappy", partition_by=["region"])),
+        ("arrow ipc", os.path.join(tmp_dir, "sales.arrow"),
+         lambda a, p: a.export_to_arrow_ipc(QUERY, p)),
+        ("arrow ipc lz4", os.path.join(tmp_dir, "sales_lz4.arrow"),
+         lambda a, p: a.export_to_arrow_ipc(QUERY, p, compression="lz4")),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    analytics = DuckDBAnalytics()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analytics.connect()
+        print(f"Generating {args.rows:,} rows...", file=sys.stderr)
+        create_sales(analytics, args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"\n{'path':<20}{'seconds':>10}{'Mrows/s':>10}{'size (MB)':>12}{'vs csv':>9}")
+        csv_size = None
+        for label, path, export in export_cases(tmp_dir):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if not export(analytics, path):
+                    raise SystemExit(f"{label} export failed")
+            elapsed = time.perf_counter() - start
+            size = output_size(path)
+            csv_size = csv_size or size
+            print(f"{label:<20}{elapsed:>10.3f}{args.rows / elapsed / 1e6:>10.2f}"
+                  f"{size / (1024 * 1024):>12.1f}{size / csv_size:>9.2f}")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        analytics.disconnect()
+
+
+if __name__ == "__main__":
+    main()
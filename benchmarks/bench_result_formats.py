@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark result materialization paths of DuckDBAnalytics.
+
+Compares wall time and peak RSS of fetch_data (fetchdf), execute_query
+(fetchall), fetch_arrow and fetch_record_batches on the same result set.
+Each path runs in a fresh subprocess so ru_maxrss reflects only that path.
+
+Usage:
+    python benchmarks/bench_result_formats.py --rows 5000000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+
+MODES = ["fetchdf", "fetchall", "arrow_table", "record_batches"]
+
+
+def generate_parquet(path, rows):
+    """Write a sales-like Parquet file with the given number of rows"""
+    analytics = DuckDBAnalytics()
+    analytics.connect()
+    analytics.execute_query(f"""
+        COPY (
+            SELECT
+                range + 1 AS transaction_id,
+                'C' || lpad(((range * 7919) % 100 + 1)::VARCHAR, 4, '0') AS customer_id,
+                'P' || lpad(((range * 104729) % 50 + 1)::VARCHAR, 4, '0') AS product_id,
+                (range % 5 + 1)::INTEGER AS quantity,
+                round(10 + (range * 37 % 199000) / 100.0, 2) AS amount,
+                DATE '2025-01-01' + (range % 365)::INTEGER AS sale_date,
+                ['North', 'South', 'East', 'West', 'Central'][range % 5 + 1] AS region
+            FROM range({rows})
+        ) TO '{path}' (FORMAT parquet)
+    """)
+    analytics.disconnect()
+
+
+def run_mode(mode, path, batch_size):
+    """Materialize the whole file through one result path and report timing/memory"""
+    analytics = DuckDBAnalytics()
+    analytics.connect()
+    query = f"SELECT * FROM read_parquet('{path}')"
+    start = time.perf_counter()
+    if mode == "fetchdf":
+        rows = len(analytics.fetch_data(query))
+    elif mode == "fetchall":
+        rows = len(analytics.execute_query(query))
+    elif mode == "arrow_table":
+        rows = analytics.fetch_arrow(query).num_rows
+    else:
+        rows = sum(batch.num_rows for batch in analytics.fetch_record_batches(query, batch_size))
+    elapsed = time.perf_counter() - start
+    analytics.disconnect()
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"mode": mode, "rows": rows, "seconds": round(elapsed, 4), "peak_rss_mb": round(peak_kb / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            result = run_mode(args.mode, args.file, args.batch_size)
+            sys.stdout = stdout
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sales.parquet")
+        print(f"Generating {args.rows:,} rows...")
+        generate_parquet(path, args.rows)
+        print(f"\n{'mode':<16}{'rows':>12}{'seconds':>10}{'peak RSS (MB)':>16}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--file", path, "--batch-size", str(args.batch_size)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{result['mode']:<16}{result['rows']:>12,}{result['seconds']:>10.3f}{result['peak_rss_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark suite for DuckDBAnalytics at configurable scale factors.
+
+For each scale factor (number of sales rows) the suite generates the
+scripts/generate_data.py schema (customers, products, sales) with the seeded
+SyntheticDataGenerator, then measures, in a fresh subprocess per scale:
+
+  * ingest_csv / ingest_parquet / ingest_json of the sales files
+  * create_table_from_query (daily revenue rollup)
+  * the AdvancedDuckDBAnalytics.perform_advanced_analytics queries through
+    fetch_data, repeated to get latency percentiles and throughput
+  * export_to_csv and export_to_parquet
+
+Results (seconds, rows/s, MB/s, p50/p95/p99 latency, peak RSS) are written
+to a JSON file. --compare flags regressions between two result files and
+exits with status 1 if any metric got worse by more than --threshold.
+
+Usage:
+    python benchmarks/bench_suite.py --scales 1M,10M --output results.json
+    python benchmarks/bench_suite.py --compare baseline.json results.json --threshold 0.1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import duckdb
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+from advanced_example import ADVANCED_ANALYTICS_QUERIES
+from data_generator import SyntheticDataGenerator
+
+INGEST_FORMATS = ["csv", "parquet", "json"]
+
+# Metric name suffix -> whether a higher value is better
+_METRIC_DIRECTIONS = {
+    "seconds": False, "p50_ms": False, "p95_ms": False, "p99_ms": False, "mean_ms": False,
+    "peak_rss_mb": False, "rows_per_second": True, "mb_per_second": True, "queries_per_second": True,
+}
+
+
+def parse_scale(value):
+    """'1M' -> 1_000_000, '500K' -> 500_000, '2500' -> 2500"""
+    value = value.strip().upper()
+    multiplier = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("KMB")) * multiplier)
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def generate_data(conn, data_dir, rows, formats):
+    """
+    Create customers/products tables and write the sales files for one scale
+    factor with a fixed seed (and the generator's fixed default end date), so
+    every run produces identical data.
+    """
+    generator = SyntheticDataGenerator(conn, max(100, rows // 1000), max(50, rows // 20000), rows, seed=42)
+    generator.to_tables(tables=("customers", "products"))
+    options = {"csv": "FORMAT csv, HEADER", "parquet": "FORMAT parquet", "json": "FORMAT json"}
+    paths = {}
+    for fmt in formats:
+        paths[fmt] = os.path.join(data_dir, f"sales.{fmt}")
+        conn.execute(f"COPY ({generator.query('sales')}) TO '{paths[fmt]}' ({options[fmt]})")
+    return paths
+
+
+def timed(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        return result, time.perf_counter() - start
+
+
+def step_result(seconds, rows, size_bytes=None):
+    result = {"seconds": round(seconds, 4), "rows_per_second": round(rows / seconds, 1) if seconds else 0.0}
+    if size_bytes is not None:
+        result["mb_per_second"] = round(size_bytes / (1024 * 1024) / seconds, 2) if seconds else 0.0
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def latency_result(latencies):
+    millis = np.array(latencies) * 1000
+    return {
+        "runs": len(latencies),
+        "mean_ms": round(float(millis.mean()), 3),
+        "p50_ms": round(float(np.percentile(millis, 50)), 3),
+        "p95_ms": round(float(np.percentile(millis, 95)), 3),
+        "p99_ms": round(float(np.percentile(millis, 99)), 3),
+        "queries_per_second": round(len(latencies) / sum(latencies), 2),
+    }
+
+
+def run_scale(rows, formats, repeat, threads):
+    """Run every benchmark step for one scale factor and return its results"""
+    results = {"rows": rows, "steps": {}, "queries": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.duckdb")
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytics = DuckDBAnalytics(db_path)
+            analytics.connect()
+        if threads:
+            analytics.execute_query(f"SET threads = {threads}")
+
+        with analytics.cursor() as conn:
+            paths, seconds = timed(generate_data, conn, tmp_dir, rows, formats)
+        results["steps"]["generate"] = step_result(seconds, rows)
+
+        for fmt in formats:
+            ingest = getattr(analytics, f"ingest_{fmt}")
+            ok, seconds = timed(ingest, paths[fmt], f"sales_{fmt}")
+            if not ok:
+                raise RuntimeError(f"ingest_{fmt} failed")
+            results["steps"][f"ingest_{fmt}"] = step_result(seconds, rows, os.path.getsize(paths[fmt]))
+
+        sales_table = f"sales_{formats[0]}"
+        analytics.execute_query(f"CREATE OR REPLACE VIEW transactions AS SELECT * FROM {sales_table}")
+
+        ok, seconds = timed(analytics.create_table_from_query, "daily_revenue", f"""
+            SELECT sale_date, region, SUM(amount) AS revenue, COUNT(*) AS sales
+            FROM {sales_table} GROUP BY sale_date, region
+        """)
+        if not ok:
+            raise RuntimeError("create_table_from_query failed")
+        results["steps"]["create_table_from_query"] = step_result(seconds, rows)
+
+        for name, (_, query) in ADVANCED_ANALYTICS_QUERIES.items():
+            latencies = []
+            for _ in range(repeat):
+                df, seconds = timed(analytics.fetch_data, query)
+                if df.empty and "LIMIT" not in query:
+                    raise RuntimeError(f"query {name} returned no rows")
+                latencies.append(seconds)
+            results["queries"][name] = latency_result(latencies)
+
+        export_query = f"SELECT * FROM {sales_table}"
+        csv_path = os.path.join(tmp_dir, "export.csv")
+        ok, seconds = timed(analytics.export_to_csv, export_query, csv_path)
+        if not ok:
+            raise RuntimeError("export_to_csv failed")
+        results["steps"]["export_to_csv"] = step_result(seconds, rows, os.path.getsize(csv_path))
+        parquet_path = os.path.join(tmp_dir, "export.parquet")
+        report, seconds = timed(analytics.export_to_parquet, export_query, parquet_path)
+        if report is None:
+            raise RuntimeError("export_to_parquet failed")
+        results["steps"]["export_to_parquet"] = step_result(seconds, rows, report["total_bytes"])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytics.disconnect()
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def flatten(results):
+    """{'1M/steps/ingest_csv/seconds': 1.2, ...} for every comparable metric"""
+    metrics = {}
+    for scale, scale_results in results["scales"].items():
+        for group in ("steps", "queries"):
+            for name, values in scale_results[group].items():
+                for metric, value in values.items():
+                    if metric in _METRIC_DIRECTIONS:
+                        metrics[f"{scale}/{group}/{name}/{metric}"] = value
+        metrics[f"{scale}/peak_rss_mb"] = scale_results["peak_rss_mb"]
+    return metrics
+
+
+def compare(baseline_path, current_path, threshold):
+    """Print metric changes between two runs; return the regressions"""
+    with open(baseline_path) as f:
+        baseline = flatten(json.load(f))
+    with open(current_path) as f:
+        current = flatten(json.load(f))
+    regressions = []
+    print(f"{'metric':<60}{'baseline':>14}{'current':>14}{'change':>9}")
+    for key in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[key], current[key]
+        if not before:
+            continue
+        change = (after - before) / before
+        higher_is_better = _METRIC_DIRECTIONS[key.rsplit("/", 1)[-1]]
+        regressed = (-change if higher_is_better else change) > threshold
+        if regressed:
+            regressions.append(key)
+        print(f"{key:<60}{before:>14.3f}{after:>14.3f}{change:>+9.1%}{'  REGRESSION' if regressed else ''}")
+    print(f"\n{len(regressions)} regression(s) above {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1M", help="comma-separated row counts, e.g. 1M,10M,100M")
+    parser.add_argument("--formats", default=",".join(INGEST_FORMATS), help="ingest formats to benchmark")
+    parser.add_argument("--repeat", type=int, default=10, help="runs of each analytical query")
+    parser.add_argument("--threads", type=int, help="DuckDB threads (default: all cores)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"))
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change flagged as regression")
+    parser.add_argument("--run-scale", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    if args.run_scale:
+        print(json.dumps(run_scale(args.run_scale, formats, args.repeat, args.threads)))
+        return
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "duckdb_version": duckdb.__version__,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "threads": args.threads,
+            "repeat": args.repeat,
+            "formats": formats,
+        },
+        "scales": {},
+    }
+    for label in (s.strip() for s in args.scales.split(",") if s.strip()):
+        rows = parse_scale(label)
+        print(f"Running scale {label} ({rows:,} rows)...", file=sys.stderr)
+        # Each scale runs in its own process so peak RSS is not inherited from smaller runs
+        command = [sys.executable, __file__, "--run-scale", str(rows), "--formats", ",".join(formats),
+                   "--repeat", str(args.repeat)]
+        if args.threads:
+            command += ["--threads", str(args.threads)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        scale_results = json.loads(output.strip().splitlines()[-1])
+        results["scales"][label] = scale_results
+        for name, values in {**scale_results["steps"], **scale_results["queries"]}.items():
+            summary = (f"{values['seconds']:.3f}s  {values['rows_per_second']:,.0f} rows/s" if "seconds" in values
+                       else f"p50 {values['p50_ms']:.1f}ms  p95 {values['p95_ms']:.1f}ms")
+            print(f"  {name:<40}{summary}", file=sys.stderr)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
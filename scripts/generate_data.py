@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 """
 Generate sample data for testing and examples
+
+Usage:
+    python scripts/generate_data.py
+    python scripts/generate_data.py --vectorized --sales 100000000 --partition-by region
 """
 
+import argparse
 import os
+import sys
 import json
 import pandas as pd
 from faker import Faker
@@ -63,17 +69,49 @@ def generate_sales(num_sales=1000, num_customers=100, num_products=50):
     
     return sales
 
+def generate_vectorized(args):
+    """Generate the same tables inside DuckDB and stream them to Parquet in batches"""
+    import duckdb
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+    from data_generator import SyntheticDataGenerator
+
+    conn = duckdb.connect()
+    generator = SyntheticDataGenerator(conn, args.customers, args.products, args.sales, seed=args.seed)
+    partition_by = {'sales': args.partition_by.split(',')} if args.partition_by else None
+    report = generator.to_parquet(args.output_dir, batch_size=args.batch_size, partition_by=partition_by)
+    conn.close()
+    for table, step in report.items():
+        print(f"  ✓ Generated {step['rows']:,} {table} in {step['seconds']:.2f}s -> {step['path']}/")
+
+
 def main():
     """Generate all sample data files"""
+    parser = argparse.ArgumentParser(description="Generate sample data for testing and examples")
+    parser.add_argument('--customers', type=int, default=100)
+    parser.add_argument('--products', type=int, default=50)
+    parser.add_argument('--sales', type=int, default=1000)
+    parser.add_argument('--output-dir', default='data/generated')
+    parser.add_argument('--vectorized', action='store_true',
+                        help='generate inside DuckDB and write batched Parquet (for millions of rows)')
+    parser.add_argument('--seed', type=int, default=42, help='seed for --vectorized')
+    parser.add_argument('--batch-size', type=int, default=10_000_000, help='rows per Parquet file for --vectorized')
+    parser.add_argument('--partition-by', help='comma-separated sales columns for hive partitioning, e.g. region')
+    args = parser.parse_args()
+
     print("Generating sample data...")
     
     # Create output directory
-    output_dir = 'data/generated'
+    output_dir = args.output_dir
     os.makedirs(output_dir, exist_ok=True)
+
+    if args.vectorized:
+        generate_vectorized(args)
+        print(f"\nAll data generated in '{output_dir}/' directory!")
+        return
     
     # Generate customers
     print("Generating customers...")
-    customers = generate_customers(100)
+    customers = generate_customers(args.customers)
     with open(f'{output_dir}/customers.json', 'w', encoding='utf-8') as f:
         json.dump(customers, f, indent=2, ensure_ascii=False)
     
@@ -84,7 +122,7 @@ def main():
     
     # Generate products
     print("Generating products...")
-    products = generate_products(50)
+    products = generate_products(args.products)
     products_df = pd.DataFrame(products)
     products_df.to_csv(f'{output_dir}/products.csv', index=False)
     products_df.to_parquet(f'{output_dir}/products.parquet', index=False)
@@ -92,7 +130,7 @@ def main():
     
     # Generate sales
     print("Generating sales...")
-    sales = generate_sales(1000, 100, 50)
+    sales = generate_sales(args.sales, args.customers, args.products)
     sales_df = pd.DataFrame(sales)
     sales_df.to_csv(f'{output_dir}/sales.csv', index=False)
     sales_df.to_parquet(f'{output_dir}/sales.parquet', index=False)
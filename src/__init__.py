@@ -8,6 +8,15 @@ Este pacote fornece ferramentas para trabalhar com DuckDB como um motor de analy
 
 from .duckdb_analytics import DuckDBAnalytics
 from .advanced_example import AdvancedDuckDBAnalytics
+from .query_cache import QueryCache
+from .connection_pool import ConnectionPool, PoolTimeoutError
+from .async_analytics import AsyncDuckDBAnalytics
+from .data_generator import SyntheticDataGenerator
+from .query_scheduler import QueryScheduler, AdmissionTimeoutError, UnknownQueryClassError
+from .lazy_frame import LazyFrame
+from .query_server import QueryServer, QueryClient
+from .process_pool import ProcessPoolAnalytics
+from .stream_ingest import TailingIngestor
 
-__all__ = ['DuckDBAnalytics', 'AdvancedDuckDBAnalytics']
+__all__ = ['DuckDBAnalytics', 'AdvancedDuckDBAnalytics', 'QueryCache', 'ConnectionPool', 'PoolTimeoutError', 'AsyncDuckDBAnalytics', 'SyntheticDataGenerator', 'QueryScheduler', 'AdmissionTimeoutError', 'UnknownQueryClassError', 'LazyFrame', 'QueryServer', 'QueryClient', 'ProcessPoolAnalytics', 'TailingIngestor']
 __version__ = '1.0.0'
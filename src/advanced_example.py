@@ -7,6 +7,75 @@ from faker import Faker
 import random
 from datetime import datetime, timedelta
 
+try:
+    from .data_generator import SyntheticDataGenerator
+except ImportError:
+    from data_generator import SyntheticDataGenerator
+
+# Consultas analíticas do exemplo avançado: nome -> (título, SQL).
+# Também usadas como carga de trabalho pela suíte de benchmarks.
+ADVANCED_ANALYTICS_QUERIES = {
+    # 1. Vendas totais por categoria de produto
+    "sales_by_category": ("Vendas totais por categoria de produto", """
+        SELECT
+            p.category,
+            SUM(t.quantity * p.price) AS total_sales_value
+        FROM transactions t
+        JOIN products p ON t.product_id = p.product_id
+        GROUP BY p.category
+        ORDER BY total_sales_value DESC
+    """),
+    # 2. Clientes que mais gastaram (Top 10)
+    "top_customers": ("Clientes que mais gastaram (Top 10)", """
+        SELECT
+            c.name,
+            c.city,
+            SUM(t.quantity * p.price) AS total_spent
+        FROM transactions t
+        JOIN customers c ON t.customer_id = c.customer_id
+        JOIN products p ON t.product_id = p.product_id
+        GROUP BY c.name, c.city
+        ORDER BY total_spent DESC
+        LIMIT 10
+    """),
+    # 3. Média de transações por cliente por cidade (usando Window Functions)
+    "avg_transactions_per_customer_city": ("Média de transações por cliente por cidade (usando Window Functions)", """
+        WITH CustomerTransactions AS (
+            SELECT
+                c.customer_id,
+                c.name,
+                c.city,
+                COUNT(t.transaction_id) AS num_transactions
+            FROM customers c
+            JOIN transactions t ON c.customer_id = t.customer_id
+            GROUP BY c.customer_id, c.name, c.city
+        )
+        SELECT
+            city,
+            AVG(num_transactions) AS avg_transactions_per_customer
+        FROM CustomerTransactions
+        GROUP BY city
+        ORDER BY avg_transactions_per_customer DESC
+        LIMIT 5
+    """),
+    # 4. Produtos com baixo estoque e alta demanda (exemplo de subconsulta e JOIN)
+    "low_stock_high_demand": ("Produtos com baixo estoque e alta demanda", """
+        SELECT
+            p.product_name,
+            p.category,
+            p.stock_quantity,
+            SUM(t.quantity) AS total_quantity_sold
+        FROM products p
+        JOIN transactions t ON p.product_id = t.product_id
+        WHERE p.stock_quantity < 100 -- Exemplo de 'baixo estoque'
+        GROUP BY p.product_name, p.category, p.stock_quantity
+        HAVING SUM(t.quantity) > 50 -- Exemplo de 'alta demanda'
+        ORDER BY total_quantity_sold DESC
+        LIMIT 5
+    """),
+}
+
+
 class AdvancedDuckDBAnalytics:
     def __init__(self, db_path=":memory:"):
         self.db_path = db_path
@@ -30,9 +99,22 @@ class AdvancedDuckDBAnalytics:
             self.connect()
         return self.conn.execute(query).fetchdf()
 
-    def generate_synthetic_data(self, num_customers=100, num_products=50, num_transactions=1000):
-        """Gera dados sintéticos para clientes, produtos e transações."""
+    def generate_synthetic_data(self, num_customers=100, num_products=50, num_transactions=1000,
+                                vectorized=False, seed=42):
+        """
+        Gera dados sintéticos para clientes, produtos e transações.
+        Com vectorized=True os dados são gerados dentro do DuckDB pelo
+        SyntheticDataGenerator (esquema de scripts/generate_data.py, com seed),
+        o que permite centenas de milhões de transações em memória limitada.
+        """
         print("Gerando dados sintéticos...")
+        if vectorized:
+            generator = SyntheticDataGenerator(self.conn, num_customers, num_products, num_transactions, seed=seed)
+            report = generator.to_tables(table_names={"sales": "transactions"})
+            print(f"  {num_customers} clientes, {num_products} produtos e {num_transactions} transações "
+                  f"gerados em {sum(step['seconds'] for step in report.values()):.2f}s.")
+            print("Geração de dados sintéticos concluída.")
+            return
 
         # Clientes
         customers_data = []
@@ -87,79 +169,10 @@ class AdvancedDuckDBAnalytics:
         """Executa consultas analíticas avançadas e demonstra funcionalidades do DuckDB."""
         print("\nExecutando análises avançadas...")
 
-        # 1. Vendas totais por categoria de produto
-        print("\n1. Vendas totais por categoria de produto:")
-        query_sales_by_category = """
-            SELECT
-                p.category,
-                SUM(t.quantity * p.price) AS total_sales_value
-            FROM transactions t
-            JOIN products p ON t.product_id = p.product_id
-            GROUP BY p.category
-            ORDER BY total_sales_value DESC
-        """
-        result = self.execute_query(query_sales_by_category)
-        print(result)
-
-        # 2. Clientes que mais gastaram (Top 10)
-        print("\n2. Clientes que mais gastaram (Top 10):")
-        query_top_customers = """
-            SELECT
-                c.name,
-                c.city,
-                SUM(t.quantity * p.price) AS total_spent
-            FROM transactions t
-            JOIN customers c ON t.customer_id = c.customer_id
-            JOIN products p ON t.product_id = p.product_id
-            GROUP BY c.name, c.city
-            ORDER BY total_spent DESC
-            LIMIT 10
-        """
-        result = self.execute_query(query_top_customers)
-        print(result)
-
-        # 3. Média de transações por cliente por cidade (usando Window Functions)
-        print("\n3. Média de transações por cliente por cidade (usando Window Functions):")
-        query_avg_transactions_per_customer_city = """
-            WITH CustomerTransactions AS (
-                SELECT
-                    c.customer_id,
-                    c.name,
-                    c.city,
-                    COUNT(t.transaction_id) AS num_transactions
-                FROM customers c
-                JOIN transactions t ON c.customer_id = t.customer_id
-                GROUP BY c.customer_id, c.name, c.city
-            )
-            SELECT
-                city,
-                AVG(num_transactions) AS avg_transactions_per_customer
-            FROM CustomerTransactions
-            GROUP BY city
-            ORDER BY avg_transactions_per_customer DESC
-            LIMIT 5
-        """
-        result = self.execute_query(query_avg_transactions_per_customer_city)
-        print(result)
-
-        # 4. Produtos com baixo estoque e alta demanda (exemplo de subconsulta e JOIN)
-        print("\n4. Produtos com baixo estoque e alta demanda:")
-        query_low_stock_high_demand = """
-            SELECT
-                p.product_name,
-                p.category,
-                p.stock_quantity,
-                SUM(t.quantity) AS total_quantity_sold
-            FROM products p
-            JOIN transactions t ON p.product_id = t.product_id
-            WHERE p.stock_quantity < 100 -- Exemplo de 'baixo estoque'
-            GROUP BY p.product_name, p.category, p.stock_quantity
-            HAVING SUM(t.quantity) > 50 -- Exemplo de 'alta demanda'
-            ORDER BY total_quantity_sold DESC
-            LIMIT 5
-        """
-        result = self.execute_query(query_low_stock_high_demand)
-        print(result)
+        for number, (title, query) in enumerate(ADVANCED_ANALYTICS_QUERIES.values(), start=1):
+            print(f"\n{number}. {title}:")
+            result = self.execute_query(query)
+            print(result)
 
         print("Análises avançadas concluídas.")
 
@@ -0,0 +1,221 @@
+"""
+DuckDB Embedded Analytics Engine - Consultas Aproximadas
+
+Reescreve consultas de agregação para rodar sobre uma amostra da tabela
+(system, bernoulli, reservoir ou uma amostra estratificada persistida) com um
+peso por linha (__weight = inverso da probabilidade de a linha estar na
+amostra). SUM, COUNT e AVG viram estimadores de Horvitz-Thompson ponderados,
+com erro padrão sqrt(Σ w·(w-1)·x²) para somas e contagens, o que permite
+devolver intervalos de confiança junto com o resultado. Quantis usam
+approx_quantile; consultas com COUNT(DISTINCT) não podem ser amostradas e
+rodam sobre a tabela inteira com approx_count_distinct (HyperLogLog).
+"""
+
+import copy
+import json
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+
+import duckdb
+
+try:
+    from .sql_utils import deserialize_select, expression_children, parse_expression, parse_select
+except ImportError:
+    from sql_utils import deserialize_select, expression_children, parse_expression, parse_select
+
+WEIGHT_COLUMN = "__weight"
+SAMPLE_METHODS = ("system", "bernoulli", "reservoir", "stratified")
+
+# Estimador ponderado de cada agregado (__arg = argumento original)
+_ESTIMATES = {
+    "sum": "SUM(__arg * __weight)",
+    "count_star": "ROUND(SUM(__weight))::BIGINT",
+    "count": "ROUND(SUM(CASE WHEN __arg IS NOT NULL THEN __weight ELSE 0 END))::BIGINT",
+    "avg": "SUM(__arg * __weight) / SUM(CASE WHEN __arg IS NOT NULL THEN __weight END)",
+}
+# Erro padrão do estimador
+_STANDARD_ERRORS = {
+    "sum": "sqrt(SUM(__weight * (__weight - 1) * __arg * __arg))",
+    "count_star": "sqrt(SUM(__weight * (__weight - 1)))",
+    "count": "sqrt(SUM(CASE WHEN __arg IS NOT NULL THEN __weight * (__weight - 1) ELSE 0 END))",
+    "avg": "stddev_samp(__arg) / sqrt(COUNT(__arg))",
+}
+_QUANTILE_FUNCTIONS = {"median", "quantile", "quantile_cont", "quantile_disc"}
+
+
+def sample_source(table_name: str, method: str, sample_percent: float, sample_rows: Optional[int],
+                  source_rows: Optional[int], seed: Optional[int]) -> str:
+    """
+    Subquery com uma amostra de table_name e a coluna __weight. system e
+    bernoulli usam sample_percent (system sorteia blocos de linhas: lê bem
+    menos dados, mas os intervalos ficam otimistas em tabelas ordenadas);
+    reservoir sorteia exatamente sample_rows linhas. Com source_rows (linhas
+    da tabela), o peso usa o tamanho realizado da amostra (source_rows /
+    linhas amostradas); sem ele, o esperado.
+    """
+    if method in ("system", "bernoulli"):
+        expected_weight = 100.0 / sample_percent
+        sample = f"{sample_percent}% ({method}{f', {seed}' if seed is not None else ''})"
+    elif method == "reservoir":
+        expected_weight = None
+        sample = f"reservoir({int(sample_rows)} ROWS){f' REPEATABLE ({seed})' if seed is not None else ''}"
+    else:
+        raise ValueError(f"Método de amostragem inválido: {method}. Use um de {SAMPLE_METHODS}")
+    if source_rows is not None:
+        weight = f"{int(source_rows)} / COUNT(*) OVER ()"
+    elif expected_weight is not None:
+        weight = repr(expected_weight)
+    else:
+        raise ValueError("A amostragem reservoir precisa do número de linhas da tabela")
+    return f"(SELECT *, {weight} AS {WEIGHT_COLUMN} FROM {table_name} USING SAMPLE {sample})"
+
+
+def stratified_sample_query(table_name: str, strata: Sequence[str], rows_per_stratum: int, seed: int) -> str:
+    """
+    SELECT da amostra estratificada de table_name: cerca de rows_per_stratum
+    linhas por combinação de strata (Bernoulli com taxa própria por estrato;
+    estratos menores entram inteiros) e __weight = linhas do estrato / linhas
+    amostradas do estrato.
+    """
+    columns = ", ".join(strata)
+    if strata:
+        counts = f"SELECT {columns}, COUNT(*) AS __stratum_rows FROM {table_name} GROUP BY ALL"
+        join = "JOIN strata ON " + " AND ".join(
+            f"source.{column} IS NOT DISTINCT FROM strata.{column}" for column in strata
+        )
+    else:
+        counts = f"SELECT COUNT(*) AS __stratum_rows FROM {table_name}"
+        join = "CROSS JOIN strata"
+    return (
+        f"WITH strata AS ({counts}), "
+        f"sampled AS (SELECT source.*, strata.__stratum_rows FROM {table_name} AS source {join} "
+        f"WHERE hash(source.rowid, {int(seed)}) % 1000000 < 1000000.0 * {int(rows_per_stratum)} / strata.__stratum_rows) "
+        f"SELECT * EXCLUDE (__stratum_rows), "
+        f"__stratum_rows / COUNT(*) OVER ({f'PARTITION BY {columns}' if strata else ''}) AS {WEIGHT_COLUMN} "
+        f"FROM sampled"
+    )
+
+
+def _substitute(template: dict, arguments: Dict[str, dict]) -> dict:
+    """Troca as colunas de marcação (__arg, __q) de um template parseado pelas expressões originais."""
+    if template.get("class") == "COLUMN_REF" and template["column_names"] == [template["column_names"][-1]]:
+        name = template["column_names"][0]
+        if name in arguments:
+            return copy.deepcopy(arguments[name])
+    for container, key in list(expression_children(template)):
+        container[key] = _substitute(container[key], arguments)
+    return template
+
+
+class _Approximator:
+    """Substitui os agregados de uma consulta pelos estimadores sobre a amostra (ou por funções aproximadas)."""
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, aggregates: Set[str], sampled: bool):
+        self.conn = conn
+        self.aggregates = aggregates
+        self.sampled = sampled
+        self.replaced = 0
+
+    def expression(self, template: str, node: dict) -> dict:
+        children = node.get("children", [])
+        arguments = {"__arg": children[0]} if children else {}
+        if len(children) > 1:
+            arguments["__q"] = children[1]
+        return _substitute(parse_expression(self.conn, template), arguments)
+
+    def rewrite(self, node: dict) -> Optional[dict]:
+        """Expressão reescrita, ou None se ela tiver agregados que o modo aproximado não trata."""
+        node_class = node.get("class")
+        if node_class == "SUBQUERY":
+            return node
+        if node_class == "WINDOW":
+            return None
+        if node_class == "FUNCTION" and node["function_name"].lower() in self.aggregates:
+            function = node["function_name"].lower()
+            if node.get("filter") or node.get("order_bys", {}).get("orders"):
+                return None
+            if node.get("distinct"):
+                if function != "count" or self.sampled:
+                    return None
+                template = "approx_count_distinct(__arg)"
+            elif function in _QUANTILE_FUNCTIONS:
+                template = "approx_quantile(__arg, 0.5)" if function == "median" else "approx_quantile(__arg, __q)"
+            elif self.sampled and function in _ESTIMATES:
+                template = _ESTIMATES[function]
+            else:
+                return node
+            self.replaced += 1
+            return {**self.expression(template, node), "alias": node.get("alias", "")}
+        for container, key in list(expression_children(node)):
+            rewritten = self.rewrite(container[key])
+            if rewritten is None:
+                return None
+            container[key] = rewritten
+        return node
+
+
+def _has_distinct_count(node: Any) -> bool:
+    if isinstance(node, list):
+        return any(_has_distinct_count(value) for value in node)
+    if not isinstance(node, dict) or node.get("class") == "SUBQUERY":
+        return False
+    if node.get("class") == "FUNCTION" and node.get("distinct") and node["function_name"].lower() == "count":
+        return True
+    return any(_has_distinct_count(value) for value in node.values())
+
+
+def rewrite_approximate(conn: duckdb.DuckDBPyConnection, statement: dict, source_sql: str,
+                        output_names: Sequence[str], z: float,
+                        aggregates: Set[str]) -> Optional[Tuple[str, str, Dict[str, Tuple[str, str]]]]:
+    """
+    Reescreve uma consulta de agregação sobre uma única tabela (statement, já
+    parseada) para o modo aproximado. Retorna (sql, modo, intervalos) ou None
+    se a consulta não for suportada. O modo é "sample" (a tabela é trocada por
+    source_sql, que deve ter a coluna __weight) ou "approx_functions" (com
+    COUNT(DISTINCT): tabela inteira, só funções aproximadas). intervalos mapeia
+    cada coluna de saída estimada para as colunas <nome>_low e <nome>_high
+    adicionadas ao resultado (intervalo de confiança normal com quantil z).
+    """
+    statement = json.loads(json.dumps(statement))
+    node = statement["node"]
+    from_table = node.get("from_table") or {}
+    if (node.get("type") != "SELECT_NODE" or node.get("cte_map", {}).get("map")
+            or from_table.get("type") != "BASE_TABLE" or from_table.get("sample") or node.get("sample")
+            or len(output_names) != len(node["select_list"])
+            or any(item.get("class") == "STAR" for item in node["select_list"])):
+        return None
+    sampled = not _has_distinct_count(node)
+    approximator = _Approximator(conn, aggregates, sampled)
+    intervals: Dict[str, Tuple[str, str]] = {}
+    select_list, interval_items = [], []
+    for item, name in zip(node["select_list"], output_names):
+        original = copy.deepcopy(item)
+        rewritten = approximator.rewrite(item)
+        if rewritten is None:
+            return None
+        rewritten["alias"] = item.get("alias") or name
+        select_list.append(rewritten)
+        function = original.get("function_name", "").lower() if original.get("class") == "FUNCTION" else ""
+        if sampled and function in _ESTIMATES and not original.get("distinct"):
+            low, high = f"{name}_low", f"{name}_high"
+            for alias, sign in ((low, "-"), (high, "+")):
+                template = f"({_ESTIMATES[function]}) {sign} {z!r} * ({_STANDARD_ERRORS[function]})"
+                interval_items.append({**approximator.expression(template, original), "alias": alias})
+            intervals[name] = (low, high)
+    node["select_list"] = select_list + interval_items
+    for key in ("where_clause", "having"):
+        if node.get(key) is not None:
+            node[key] = approximator.rewrite(node[key])
+            if node[key] is None:
+                return None
+    for modifier in node.get("modifiers", []):
+        for order in modifier.get("orders", []):
+            order["expression"] = approximator.rewrite(order["expression"])
+            if order["expression"] is None:
+                return None
+    if approximator.replaced == 0:
+        return None
+    if sampled:
+        alias = from_table.get("alias") or from_table["table_name"]
+        subquery = parse_select(conn, f"SELECT * FROM {source_sql} AS {alias}")
+        node["from_table"] = subquery["node"]["from_table"]
+    return deserialize_select(conn, statement), "sample" if sampled else "approx_functions", intervals
@@ -0,0 +1,299 @@
+"""
+DuckDB Embedded Analytics Engine - Interface asyncio
+
+Fachada assíncrona para DuckDBAnalytics. As chamadas rodam em um executor de
+threads limitado, cada uma com seu próprio cursor do pool de conexões, de modo
+que queries e ingestões longas não bloqueiam o event loop.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    from .duckdb_analytics import DuckDBAnalytics, FileSource
+    from .prepared_statements import Params
+except ImportError:
+    from duckdb_analytics import DuckDBAnalytics, FileSource
+    from prepared_statements import Params
+
+
+class AsyncDuckDBAnalytics:
+    """
+    Espelha os métodos públicos de DuckDBAnalytics como corrotinas.
+
+    Cancelar uma corrotina em andamento interrompe a query DuckDB que está
+    rodando no cursor da thread correspondente (o método síncrono então segue a
+    convenção usual de erro e a corrotina levanta CancelledError).
+    """
+    def __init__(self, db_path: str = ":memory:", max_workers: int = 4, **kwargs: Any):
+        self.analytics = DuckDBAnalytics(db_path, pool_size=max_workers, **kwargs)
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="duckdb-async")
+
+    async def __aenter__(self) -> "AsyncDuckDBAnalytics":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        await self.disconnect()
+
+    async def connect(self):
+        """Conecta ao banco de dados DuckDB."""
+        await self._run(self.analytics.connect)
+
+    async def disconnect(self):
+        """Desconecta do banco de dados DuckDB e encerra o executor."""
+        await self._run(self.analytics.disconnect)
+        self._executor.shutdown(wait=False)
+
+    async def execute_query(self, query: str, params: Optional[Params] = None) -> Optional[List[Tuple[Any, ...]]]:
+        """Executa uma query SQL e retorna os resultados, se houver."""
+        return await self._run(self.analytics.execute_query, query, params)
+
+    async def fetch_data(self, query: str, params: Optional[Params] = None, approximate: bool = False) -> pd.DataFrame:
+        """Executa uma query e retorna os resultados como um DataFrame Pandas (aproximados, se approximate=True)."""
+        return await self._run(self.analytics.fetch_data, query, params, approximate)
+
+    async def fetch_approximate(self, query: str, params: Optional[Params] = None, method: str = "auto",
+                                sample_percent: float = 1.0, sample_rows: int = 100_000, confidence: float = 0.95,
+                                seed: Optional[int] = None) -> pd.DataFrame:
+        """Executa uma consulta de agregação sobre uma amostra, com intervalos de confiança."""
+        return await self._run(self.analytics.fetch_approximate, query, params, method, sample_percent, sample_rows,
+                               confidence, seed)
+
+    async def fetch_arrow(self, query: str, params: Optional[Params] = None) -> pa.Table:
+        """Executa uma query e retorna os resultados como uma tabela PyArrow."""
+        return await self._run(self.analytics.fetch_arrow, query, params)
+
+    async def executemany(self, query: str, params_seq: Iterable[Params]) -> bool:
+        """Executa a mesma instrução para cada conjunto de parâmetros."""
+        return await self._run(self.analytics.executemany, query, list(params_seq))
+
+    async def create_table_from_query(self, table_name: str, query: str) -> bool:
+        """Cria uma nova tabela a partir dos resultados de uma query."""
+        return await self._run(self.analytics.create_table_from_query, table_name, query)
+
+    async def ingest_csv(self, file_path: FileSource, table_name: str, create_table: bool = True,
+                         threads: Optional[int] = None, hive_partitioning: Optional[bool] = None,
+                         incremental: bool = False,
+                         cluster_by: Optional[Sequence[str]] = None) -> bool:
+        """Ingere dados de um ou mais arquivos CSV para uma tabela DuckDB."""
+        return await self._run(self.analytics.ingest_csv, file_path, table_name, create_table, threads,
+                               hive_partitioning, incremental, cluster_by)
+
+    async def import_from_csv(self, file_path: FileSource, table_name: str, create_table: bool = True) -> bool:
+        """Alias para ingest_csv()."""
+        return await self.ingest_csv(file_path, table_name, create_table)
+
+    async def ingest_parquet(self, file_path: FileSource, table_name: str, create_table: bool = True,
+                             threads: Optional[int] = None, hive_partitioning: Optional[bool] = None,
+                             incremental: bool = False,
+                             cluster_by: Optional[Sequence[str]] = None) -> bool:
+        """Ingere dados de um ou mais arquivos Parquet para uma tabela DuckDB."""
+        return await self._run(self.analytics.ingest_parquet, file_path, table_name, create_table, threads,
+                               hive_partitioning, incremental, cluster_by)
+
+    async def ingest_json(self, file_path: FileSource, table_name: str, create_table: bool = True,
+                          threads: Optional[int] = None, hive_partitioning: Optional[bool] = None,
+                          incremental: bool = False,
+                          cluster_by: Optional[Sequence[str]] = None) -> bool:
+        """Ingere dados de um ou mais arquivos JSON para uma tabela DuckDB."""
+        return await self._run(self.analytics.ingest_json, file_path, table_name, create_table, threads,
+                               hive_partitioning, incremental, cluster_by)
+
+    async def ingest_dataframe(self, df: Any, table_name: str, materialize: bool = False) -> bool:
+        """Disponibiliza um DataFrame pandas ou Polars como tabela DuckDB."""
+        return await self._run(self.analytics.ingest_dataframe, df, table_name, materialize)
+
+    async def register_arrow(self, arrow_obj: Any, table_name: str, materialize: bool = False) -> bool:
+        """Disponibiliza um objeto PyArrow como tabela DuckDB."""
+        return await self._run(self.analytics.register_arrow, arrow_obj, table_name, materialize)
+
+    async def unregister(self, table_name: str) -> bool:
+        """Remove uma tabela virtual registrada."""
+        return await self._run(self.analytics.unregister, table_name)
+
+    async def create_view(self, view_name: str, query: str) -> bool:
+        """Cria uma view a partir de uma query."""
+        return await self._run(self.analytics.create_view, view_name, query)
+
+    async def create_materialized_view(self, view_name: str, query: Optional[str] = None,
+                                       source_table: Optional[str] = None, group_by: Optional[Sequence[str]] = None,
+                                       aggregates: Optional[Mapping[str, str]] = None) -> bool:
+        """Cria uma view materializada a partir de uma query ou de uma agregação."""
+        return await self._run(self.analytics.create_materialized_view, view_name, query, source_table,
+                               group_by, aggregates)
+
+    async def refresh_materialized_view(self, view_name: str, incremental: bool = True) -> bool:
+        """Atualiza uma view materializada, incrementalmente quando possível."""
+        return await self._run(self.analytics.refresh_materialized_view, view_name, incremental)
+
+    async def materialized_view_status(self, view_name: str) -> Dict[str, Any]:
+        """Indica se uma view materializada está desatualizada."""
+        return await self._run(self.analytics.materialized_view_status, view_name)
+
+    async def create_rollup(self, rollup_name: str, source_table: str, dimensions: Sequence[str],
+                            measures: Union[Sequence[str], Mapping[str, str]]) -> bool:
+        """Cria um rollup usado automaticamente por fetch_data (ver DuckDBAnalytics.create_rollup)."""
+        return await self._run(self.analytics.create_rollup, rollup_name, source_table, dimensions, measures)
+
+    async def create_sample(self, table_name: str, strata: Sequence[str] = (), rows_per_stratum: int = 10_000,
+                            seed: int = 42) -> bool:
+        """Cria a amostra estratificada persistida usada por fetch_approximate."""
+        return await self._run(self.analytics.create_sample, table_name, strata, rows_per_stratum, seed)
+
+    async def create_sharded_table(self, table_name: str, shard_paths: Sequence[str],
+                                   shard_key: Union[str, Sequence[str]], method: str = "hash",
+                                   boundaries: Optional[Sequence[Any]] = None) -> bool:
+        """Declara uma tabela particionada em vários arquivos DuckDB (ver DuckDBAnalytics.create_sharded_table)."""
+        return await self._run(self.analytics.create_sharded_table, table_name, shard_paths, shard_key, method, boundaries)
+
+    async def ingest_sharded(self, table_name: str, source: Any, file_format: Optional[str] = None) -> bool:
+        """Ingere arquivos ou um DataFrame/tabela Arrow roteando as linhas para os shards."""
+        return await self._run(self.analytics.ingest_sharded, table_name, source, file_format)
+
+    async def shard_plan(self, query: str, params: Optional[Params] = None) -> Dict[str, Any]:
+        """Plano de execução em shards que fetch_data usaria para a query."""
+        return await self._run(self.analytics.shard_plan, query, params)
+
+    async def list_rollups(self) -> Dict[str, Dict[str, Any]]:
+        """Lista os rollups, se estão atualizados e quantas consultas cada um atendeu."""
+        return await self._run(self.analytics.list_rollups)
+
+    async def rollup_for(self, query: str, params: Optional[Params] = None) -> Dict[str, Any]:
+        """Rollup e SQL reescrito que fetch_data usaria para a query."""
+        return await self._run(self.analytics.rollup_for, query, params)
+
+    async def export_to_csv(self, query: str, output_file: str) -> bool:
+        """Exporta os resultados de uma query para um arquivo CSV."""
+        return await self._run(self.analytics.export_to_csv, query, output_file)
+
+    async def export_to_parquet(self, query: str, output_path: str, compression: str = "zstd",
+                                compression_level: Optional[int] = None, row_group_size: Optional[int] = None,
+                                partition_by: Optional[Sequence[str]] = None, per_thread_output: bool = False,
+                                overwrite: bool = True) -> Optional[Dict[str, Any]]:
+        """Exporta os resultados de uma query para Parquet e retorna as estatísticas."""
+        return await self._run(self.analytics.export_to_parquet, query, output_path, compression, compression_level,
+                               row_group_size, partition_by, per_thread_output, overwrite)
+
+    async def export_to_arrow_ipc(self, query: str, output_file: str, compression: Optional[str] = None,
+                                  batch_size: int = 1_000_000) -> Optional[Dict[str, Any]]:
+        """Exporta os resultados de uma query para um arquivo Arrow IPC (Feather v2)."""
+        return await self._run(self.analytics.export_to_arrow_ipc, query, output_file, compression, batch_size)
+
+    async def run_sql_script(self, script_path: str, max_workers: Optional[int] = None, resume: bool = False) -> bool:
+        """Executa um script SQL, com instruções independentes em paralelo (ver DuckDBAnalytics.run_sql_script)."""
+        return await self._run(self.analytics.run_sql_script, script_path, max_workers, resume)
+
+    async def recluster_table(self, table_name: str, cluster_by: Sequence[str]) -> bool:
+        """Regrava uma tabela ordenada por cluster_by e atualiza as estatísticas."""
+        return await self._run(self.analytics.recluster_table, table_name, cluster_by)
+
+    async def analyze_table(self, table_name: Optional[str] = None) -> bool:
+        """Atualiza as estatísticas do otimizador (ANALYZE)."""
+        return await self._run(self.analytics.analyze_table, table_name)
+
+    async def pruning_report(self, table_name: str, predicate: str) -> Dict[str, Any]:
+        """Mede quantas linhas e row groups um filtro realmente lê."""
+        return await self._run(self.analytics.pruning_report, table_name, predicate)
+
+    async def vacuum_database(self) -> bool:
+        """Otimiza o banco de dados DuckDB."""
+        return await self._run(self.analytics.vacuum_database)
+
+    async def get_table_schema(self, table_name: str) -> List[Tuple[str, str]]:
+        """Retorna o esquema de uma tabela ou view."""
+        return await self._run(self.analytics.get_table_schema, table_name)
+
+    def list_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """Lista todos os metadados de tabelas e views gerenciadas (leitura rápida do catálogo)."""
+        return self.analytics.list_metadata()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Retorna as estatísticas do cache de resultados (não acessa o banco)."""
+        return self.analytics.cache_stats()
+
+    async def set_profiling(self, enabled: bool):
+        """Ativa ou desativa a captura de profiling das queries."""
+        await self._run(self.analytics.set_profiling, enabled)
+
+    async def explain_analyze(self, query: str) -> str:
+        """Executa EXPLAIN ANALYZE e retorna o plano com métricas reais."""
+        return await self._run(self.analytics.explain_analyze, query)
+
+    def query_profiles(self) -> List[Dict[str, Any]]:
+        """Perfis das últimas queries executadas com profiling ativo (não acessa o banco)."""
+        return self.analytics.query_profiles()
+
+    def slowest_operators(self, limit: int = 10, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Operadores mais lentos entre os perfis capturados (não acessa o banco)."""
+        return self.analytics.slowest_operators(limit, query)
+
+    def query_plan(self, query: Optional[str] = None, as_text: bool = False) -> Any:
+        """Árvore de operadores do perfil mais recente (não acessa o banco)."""
+        return self.analytics.query_plan(query, as_text)
+
+    def scheduler_metrics(self) -> Dict[str, Any]:
+        """Profundidade das filas de admissão e tempos de espera (não acessa o banco)."""
+        return self.analytics.scheduler_metrics()
+
+    async def fetch_record_batches(self, query: str, batch_size: int = 100_000) -> AsyncIterator[pa.RecordBatch]:
+        """
+        Itera de forma assíncrona sobre os lotes Arrow do resultado de uma query.
+        Cada lote é lido no executor; encerrar ou cancelar a iteração fecha o
+        stream (após o lote em leitura, se houver), o que cancela a query.
+        """
+        reader = await self._run(self.analytics.fetch_record_batches, query, batch_size)
+        if reader is None:
+            return
+        pending = None
+        try:
+            while True:
+                pending = self._executor.submit(_read_next_batch, reader)
+                batch = await asyncio.wrap_future(pending)
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            # O reader não pode ser fechado enquanto outra thread lê dele
+            if pending is not None and not pending.done():
+                pending.add_done_callback(lambda _: reader.close())
+            else:
+                reader.close()
+
+    async def fetch_data_chunks(self, query: str, chunk_size: int = 100_000) -> AsyncIterator[pd.DataFrame]:
+        """Itera de forma assíncrona sobre DataFrames de até chunk_size linhas."""
+        async for batch in self.fetch_record_batches(query, chunk_size):
+            yield batch.to_pandas()
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Executa func no executor. Se a corrotina for cancelada durante a execução,
+        interrompe a query no cursor emprestado à thread de trabalho.
+        """
+        worker: Dict[str, int] = {}
+
+        def call() -> Any:
+            worker["thread_id"] = threading.get_ident()
+            return func(*args)
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if "thread_id" in worker and self.analytics.pool:
+                self.analytics.pool.interrupt(worker["thread_id"])
+            raise
+
+
+def _read_next_batch(reader: pa.RecordBatchReader) -> Optional[pa.RecordBatch]:
+    """Lê o próximo lote do reader, ou None ao fim do stream."""
+    try:
+        return reader.read_next_batch()
+    except StopIteration:
+        return None
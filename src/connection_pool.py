@@ -0,0 +1,124 @@
+"""
+DuckDB Embedded Analytics Engine - Pool de Conexões
+
+Pool thread-safe de cursores DuckDB criados a partir de uma única instância de
+banco de dados. Cada cursor é uma conexão independente (com sua própria
+transação), então threads distintas podem executar queries em paralelo sem
+compartilhar estado.
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import duckdb
+
+
+class PoolTimeoutError(duckdb.Error):
+    """Nenhum cursor do pool ficou disponível dentro do tempo limite."""
+
+
+class ConnectionPool:
+    """
+    Pool de até `size` cursores de uma mesma conexão DuckDB. Os cursores são
+    criados sob demanda e devolvidos ao pool ao fim de cada uso.
+
+    Uma thread que já possui um cursor recebe o mesmo cursor em aquisições
+    aninhadas, evitando deadlocks quando um método chama outro internamente.
+    on_create, se informado, é chamado com cada cursor novo antes do primeiro uso.
+    """
+    def __init__(self, conn: duckdb.DuckDBPyConnection, size: int, timeout: float = 30.0,
+                 on_create: Optional[Callable[[duckdb.DuckDBPyConnection], None]] = None):
+        if size < 1:
+            raise ValueError("O tamanho do pool deve ser pelo menos 1.")
+        self.size = size
+        self.timeout = timeout
+        self._conn = conn
+        self._on_create = on_create
+        self._idle: "queue.LifoQueue[duckdb.DuckDBPyConnection]" = queue.LifoQueue()
+        self._cursors: List[duckdb.DuckDBPyConnection] = []
+        self._in_use: Dict[int, duckdb.DuckDBPyConnection] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        Context manager que empresta um cursor à thread atual.
+        Lança PoolTimeoutError se nenhum cursor ficar livre em `timeout` segundos.
+        """
+        held = getattr(self._local, "cursor", None)
+        if held is not None:
+            yield held
+            return
+        cursor = self._checkout(self.timeout if timeout is None else timeout)
+        thread_id = threading.get_ident()
+        self._local.cursor = cursor
+        with self._lock:
+            self._in_use[thread_id] = cursor
+        try:
+            yield cursor
+        finally:
+            self._local.cursor = None
+            with self._lock:
+                self._in_use.pop(thread_id, None)
+            if self._closed:
+                cursor.close()
+            else:
+                self._idle.put(cursor)
+
+    def interrupt(self, thread_id: int) -> bool:
+        """Interrompe a query em execução no cursor emprestado à thread informada."""
+        with self._lock:
+            cursor = self._in_use.get(thread_id)
+        if cursor is None:
+            return False
+        cursor.interrupt()
+        return True
+
+    def connections(self) -> List[duckdb.DuckDBPyConnection]:
+        """Todos os cursores já criados pelo pool (livres ou em uso)."""
+        with self._lock:
+            return list(self._cursors)
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamanho máximo, cursores criados, livres e em uso."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": len(self._cursors),
+                "idle": self._idle.qsize(),
+                "in_use": len(self._in_use),
+            }
+
+    def close(self):
+        """Fecha os cursores livres; os emprestados são fechados ao serem devolvidos."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _checkout(self, timeout: float) -> duckdb.DuckDBPyConnection:
+        if self._closed:
+            raise duckdb.ConnectionException("O pool de conexões foi fechado.")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        cursor = None
+        with self._lock:
+            if len(self._cursors) < self.size:
+                cursor = self._conn.cursor()
+                self._cursors.append(cursor)
+        if cursor is not None:
+            if self._on_create:
+                self._on_create(cursor)
+            return cursor
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise PoolTimeoutError(f"Nenhuma conexão disponível no pool após {timeout}s.")
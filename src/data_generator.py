@@ -0,0 +1,171 @@
+"""
+DuckDB Embedded Analytics Engine - Gerador Vetorizado de Dados Sintéticos
+
+Gera clientes, produtos e vendas (mesmo esquema de scripts/generate_data.py)
+dentro do DuckDB a partir de range(), sem montar linhas no Python. Nomes,
+cidades e palavras vêm de vocabulários amostrados uma única vez com o Faker;
+os demais valores saem de hash(linha, seed, coluna), de modo que a mesma seed
+produz exatamente os mesmos dados, em qualquer ordem e em qualquer lote.
+Os dados são gravados em lotes de linhas, em tabelas ou em arquivos Parquet
+(opcionalmente particionados), com memória limitada ao tamanho do lote.
+"""
+
+import os
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import duckdb
+from faker import Faker
+
+DEFAULT_BATCH_SIZE = 10_000_000
+# Data final padrão fixa: com date.today() a mesma seed geraria dados diferentes a cada dia
+DEFAULT_END_DATE = date(2025, 12, 31)
+TABLES = ("customers", "products", "sales")
+
+_CATEGORIES = ["Eletrônicos", "Livros", "Roupas", "Alimentos", "Casa e Jardim", "Esportes"]
+_REGIONS = ["North", "South", "East", "West", "Central"]
+
+
+def _sql_list(values: Sequence[str]) -> str:
+    """Literal de lista SQL de strings."""
+    return "[" + ", ".join("'" + value.replace("'", "''") + "'" for value in values) + "]"
+
+
+class SyntheticDataGenerator:
+    """
+    Gera num_customers clientes, num_products produtos e num_sales vendas com
+    seed fixa. As datas de cadastro cobrem os 2 anos e as de venda os 365 dias
+    anteriores a end_date (padrão: DEFAULT_END_DATE, 31/12/2025, para que a
+    mesma seed gere os mesmos dados em qualquer dia).
+    """
+    def __init__(self, conn: duckdb.DuckDBPyConnection, num_customers: int = 100, num_products: int = 50,
+                 num_sales: int = 1000, seed: int = 42, vocabulary_size: int = 1000,
+                 locale: str = "pt_BR", end_date: date = DEFAULT_END_DATE):
+        self.conn = conn
+        self.counts = {"customers": num_customers, "products": num_products, "sales": num_sales}
+        self.seed = seed
+        self.end_date = end_date
+        self.vocabularies = self._sample_vocabularies(vocabulary_size, locale)
+
+    def _sample_vocabularies(self, size: int, locale: str) -> Dict[str, List[str]]:
+        """Amostra com o Faker os vocabulários usados nas colunas de texto."""
+        fake = Faker(locale)
+        fake.seed_instance(self.seed)
+        return {
+            "first_names": [fake.first_name() for _ in range(size)],
+            "last_names": [fake.last_name() for _ in range(size)],
+            "cities": [fake.city() for _ in range(size)],
+            "states": [fake.state_abbr() for _ in range(size)],
+            "words": [fake.word() for _ in range(size)],
+            "domains": [fake.free_email_domain() for _ in range(max(1, size // 100))],
+            "categories": _CATEGORIES,
+            "regions": _REGIONS,
+        }
+
+    def _random(self, column: str, modulo: int) -> str:
+        """Inteiro pseudoaleatório em [0, modulo) para a linha atual, fixo para (seed, coluna)."""
+        return f"(hash(range, {self.seed}, '{column}') % {modulo})::BIGINT"
+
+    def _pick(self, vocabulary: str, column: str) -> str:
+        """Elemento pseudoaleatório de um vocabulário (o tamanho vai como constante, não len() por linha)."""
+        values = self.vocabularies[vocabulary]
+        return f"{_sql_list(values)}[{self._random(column, len(values))} + 1]"
+
+    def query(self, table: str, start: int = 0, end: Optional[int] = None) -> str:
+        """SELECT que gera as linhas [start, end) de uma das tabelas (customers, products ou sales)."""
+        if table not in TABLES:
+            raise ValueError(f"Tabela desconhecida: {table}. Use uma de {TABLES}")
+        end = self.counts[table] if end is None else min(end, self.counts[table])
+        if table == "customers":
+            first_name = self._pick('first_names', 'first_name')
+            last_name = self._pick('last_names', 'last_name')
+            registration_start = self.end_date - timedelta(days=730)
+            columns = f"""
+                printf('C%04d', range + 1) AS customer_id,
+                {first_name} || ' ' || {last_name} AS name,
+                lower(replace(strip_accents({first_name}), ' ', '')) || '.'
+                    || lower(replace(strip_accents({last_name}), ' ', '')) || (range + 1)
+                    || '@' || {self._pick('domains', 'domain')} AS email,
+                {self._pick('cities', 'city')} AS city,
+                {self._pick('states', 'state')} AS state,
+                (DATE '{registration_start}' + {self._random('registration_date', 731)}::INTEGER)::VARCHAR AS registration_date
+            """
+        elif table == "products":
+            columns = f"""
+                printf('P%04d', range + 1) AS product_id,
+                upper(left({self._pick('words', 'word_1')}, 1))
+                    || substr({self._pick('words', 'word_1')}, 2)
+                    || ' ' || {self._pick('words', 'word_2')} AS product_name,
+                {self._pick('categories', 'category')} AS category,
+                round(10 + {self._random('price', 99001)} / 100.0, 2) AS price,
+                {self._random('stock_quantity', 501)}::INTEGER AS stock_quantity
+            """
+        else:
+            sales_start = self.end_date - timedelta(days=365)
+            columns = f"""
+                range + 1 AS transaction_id,
+                printf('C%04d', {self._random('customer_id', self.counts['customers'])} + 1) AS customer_id,
+                printf('P%04d', {self._random('product_id', self.counts['products'])} + 1) AS product_id,
+                ({self._random('quantity', 5)} + 1)::INTEGER AS quantity,
+                round(10 + {self._random('amount', 199001)} / 100.0, 2) AS amount,
+                (DATE '{sales_start}' + {self._random('sale_date', 366)}::INTEGER)::VARCHAR AS sale_date,
+                {self._pick('regions', 'region')} AS region
+            """
+        return f"SELECT {columns.strip()} FROM range({start}, {end})"
+
+    def _batches(self, table: str, batch_size: int) -> List[tuple]:
+        total = self.counts[table]
+        return [(start, min(start + batch_size, total)) for start in range(0, max(total, 1), batch_size)]
+
+    def to_tables(self, tables: Sequence[str] = TABLES, table_names: Optional[Mapping[str, str]] = None,
+                  batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Dict[str, Any]]:
+        """
+        Cria (substituindo) as tabelas informadas, inserindo batch_size linhas
+        por vez. table_names renomeia tabelas (ex.: {"sales": "transactions"}).
+        Retorna, por tabela, o nome criado, as linhas e os segundos gastos.
+        """
+        table_names = table_names or {}
+        report = {}
+        for table in tables:
+            name = table_names.get(table, table)
+            start_time = time.perf_counter()
+            for number, (start, end) in enumerate(self._batches(table, batch_size)):
+                if number == 0:
+                    self.conn.execute(f"CREATE OR REPLACE TABLE {name} AS {self.query(table, start, end)}")
+                else:
+                    self.conn.execute(f"INSERT INTO {name} {self.query(table, start, end)}")
+            report[table] = {"table": name, "rows": self.counts[table], "seconds": time.perf_counter() - start_time}
+        return report
+
+    def to_parquet(self, output_dir: str, tables: Sequence[str] = TABLES, batch_size: int = DEFAULT_BATCH_SIZE,
+                   partition_by: Optional[Mapping[str, Sequence[str]]] = None,
+                   compression: str = "zstd") -> Dict[str, Dict[str, Any]]:
+        """
+        Grava cada tabela em output_dir/<tabela>/ como um arquivo Parquet por
+        lote (part-00000.parquet, ...). partition_by define colunas de
+        particionamento hive por tabela (ex.: {"sales": ["region"]}).
+        Retorna, por tabela, o diretório, as linhas e os segundos gastos.
+        """
+        partition_by = partition_by or {}
+        report = {}
+        for table in tables:
+            table_dir = os.path.join(output_dir, table)
+            os.makedirs(table_dir, exist_ok=True)
+            start_time = time.perf_counter()
+            for number, (start, end) in enumerate(self._batches(table, batch_size)):
+                if partition_by.get(table):
+                    target = table_dir
+                    options = (f"PARTITION_BY ({', '.join(partition_by[table])}), "
+                               f"FILENAME_PATTERN 'part-{number:05d}-{{i}}', "
+                               # O primeiro lote limpa o diretório; os seguintes acrescentam arquivos
+                               f"{'OVERWRITE' if number == 0 else 'OVERWRITE_OR_IGNORE'} true")
+                else:
+                    target = os.path.join(table_dir, f"part-{number:05d}.parquet")
+                    options = ""
+                self.conn.execute(
+                    f"COPY ({self.query(table, start, end)}) TO '{target}' "
+                    f"(FORMAT parquet, COMPRESSION {compression}{', ' + options if options else ''})"
+                )
+            report[table] = {"path": table_dir, "rows": self.counts[table], "seconds": time.perf_counter() - start_time}
+        return report
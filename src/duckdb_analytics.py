@@ -10,9 +10,150 @@ com funcionalidades aprimoradas para ingestão de dados, consultas avançadas e
 
 import duckdb
 import pandas as pd
+import pyarrow as pa
+import glob
+import hashlib
 import os
-from typing import List, Tuple, Any, Optional, Dict
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import List, Tuple, Any, Callable, Optional, Dict, Hashable, Iterable, Iterator, Mapping, Sequence, Set, Union
 from datetime import datetime
+from statistics import NormalDist
+
+try:
+    from .approximate_query import SAMPLE_METHODS, rewrite_approximate, sample_source, stratified_sample_query
+    from .connection_pool import ConnectionPool
+    from .lazy_frame import LazyFrame
+    from .materialized_views import build_aggregate_query, build_merge_query, parse_aggregates
+    from .metadata_catalog import MetadataCatalog
+    from .query_profiler import QueryProfiler, disable_connection_profiling, enable_connection_profiling, format_plan, iter_operators, parse_profile
+    from .prepared_statements import Params, PreparedStatementCache
+    from .process_pool import ProcessPoolAnalytics
+    from .query_cache import QueryCache
+    from .query_scheduler import QueryScheduler
+    from .rollups import index_measures, is_identifier, rewrite_for_rollup, rollup_measures
+    from .script_runner import plan_script, run_plan
+    from .sharding import PARTIALS_TABLE, SHARD_COLUMN, SHARD_METHODS, plan_sharded_query, shard_expression
+    from .sql_utils import aggregate_functions, normalize_sql, parse_select, extract_read_tables, is_deterministic, extract_written_tables, extract_ddl_tables, unqualify
+    from .stream_ingest import TailingIngestor
+except ImportError:
+    from approximate_query import SAMPLE_METHODS, rewrite_approximate, sample_source, stratified_sample_query
+    from connection_pool import ConnectionPool
+    from lazy_frame import LazyFrame
+    from materialized_views import build_aggregate_query, build_merge_query, parse_aggregates
+    from metadata_catalog import MetadataCatalog
+    from query_profiler import QueryProfiler, disable_connection_profiling, enable_connection_profiling, format_plan, iter_operators, parse_profile
+    from prepared_statements import Params, PreparedStatementCache
+    from process_pool import ProcessPoolAnalytics
+    from query_cache import QueryCache
+    from query_scheduler import QueryScheduler
+    from rollups import index_measures, is_identifier, rewrite_for_rollup, rollup_measures
+    from script_runner import plan_script, run_plan
+    from sharding import PARTIALS_TABLE, SHARD_COLUMN, SHARD_METHODS, plan_sharded_query, shard_expression
+    from sql_utils import aggregate_functions, normalize_sql, parse_select, extract_read_tables, is_deterministic, extract_written_tables, extract_ddl_tables, unqualify
+    from stream_ingest import TailingIngestor
+
+
+FileSource = Union[str, Sequence[str]]
+
+_SOURCE_FILE_COLUMN = "_source_file"
+# Marca entradas ausentes nos caches por SQL normalizado, cujo valor pode ser None
+_NOT_CACHED = object()
+_INGEST_LEDGER_TABLE = "__ingest_ledger"
+_SCRIPT_LEDGER_TABLE = "__script_ledger"
+_INGEST_STAGING_TABLE = "__ingest_staging"
+_REGISTER_STAGING_VIEW = "__register_staging"
+_FILE_FORMAT_LABELS = {"csv": "CSV", "parquet": "Parquet", "json": "JSON"}
+_FILE_FORMAT_READERS = {"csv": "read_csv_auto", "parquet": "read_parquet", "json": "read_json_auto"}
+_FILE_FORMAT_EXTENSIONS = {
+    "csv": (".csv", ".tsv", ".txt", ".csv.gz", ".tsv.gz", ".csv.zst"),
+    "parquet": (".parquet", ".parq"),
+    "json": (".json", ".jsonl", ".ndjson", ".json.gz", ".jsonl.gz", ".ndjson.gz"),
+}
+
+
+def _sql_string(value: str) -> str:
+    """Literal de string SQL com aspas simples escapadas."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _resolve_files(file_path: FileSource, extensions: Tuple[str, ...]) -> List[str]:
+    """
+    Expande um arquivo, padrão glob, diretório (recursivo, filtrado pelas
+    extensões) ou lista desses em uma lista ordenada de arquivos. Retorna lista
+    vazia se algum caminho explícito não existir ou nada for encontrado.
+    """
+    paths = [file_path] if isinstance(file_path, str) else list(file_path)
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in names if n.lower().endswith(extensions))
+        elif glob.has_magic(path):
+            files.extend(f for f in glob.glob(path, recursive=True) if os.path.isfile(f))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            return []
+    return sorted(dict.fromkeys(files))
+
+
+def _file_hash(path: str) -> str:
+    """Hash BLAKE2b do conteúdo de um arquivo, lido em blocos."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _threads_setting(conn: duckdb.DuckDBPyConnection, threads: Optional[int]) -> Iterator[None]:
+    """Ajusta temporariamente o número de threads do DuckDB (configuração global do banco)."""
+    if not threads:
+        yield
+        return
+    previous = conn.execute("SELECT current_setting('threads')").fetchone()[0]
+    conn.execute(f"SET threads = {int(threads)}")
+    try:
+        yield
+    finally:
+        conn.execute(f"SET threads = {previous}")
+
+
+def _to_arrow_table(result: duckdb.DuckDBPyConnection) -> pa.Table:
+    """Materializa o resultado pendente como pa.Table (compatível com duckdb < 1.5)."""
+    if hasattr(result, "to_arrow_table"):
+        return result.to_arrow_table()
+    return result.fetch_arrow_table()
+
+
+def _to_arrow_reader(result: duckdb.DuckDBPyConnection, batch_size: int) -> pa.RecordBatchReader:
+    """Retorna o resultado pendente como pa.RecordBatchReader (compatível com duckdb < 1.5)."""
+    if hasattr(result, "to_arrow_reader"):
+        return result.to_arrow_reader(batch_size)
+    return result.fetch_record_batch(batch_size)
+
+
+def _export_report(output_path: str, files: List[Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+    """Estatísticas de uma exportação: arquivos escritos, totais e vazão."""
+    total_rows = sum(f["rows"] for f in files)
+    total_bytes = sum(f["bytes"] for f in files)
+    return {
+        "path": output_path,
+        "files": files,
+        "file_count": len(files),
+        "total_rows": total_rows,
+        "total_bytes": total_bytes,
+        "seconds": seconds,
+        "rows_per_second": total_rows / seconds if seconds > 0 else 0.0,
+        "mb_per_second": total_bytes / (1024 * 1024) / seconds if seconds > 0 else 0.0,
+    }
+
 
 class DuckDBAnalytics:
     """
@@ -20,170 +161,1650 @@ class DuckDBAnalytics:
     Oferece funcionalidades para conexão, execução de queries, ingestão de dados
     de diferentes formatos (CSV, Parquet, JSON), criação de views, exportação
     e gerenciamento de metadados básicos.
+
+    Opcionalmente mantém um cache de resultados (enable_cache=True) para
+    fetch_data/execute_query, chaveado pelo SQL normalizado e pela versão de
+    cada tabela consultada. Toda escrita feita pela classe incrementa a versão
+    das tabelas afetadas e invalida apenas as entradas que dependem delas.
+
+    Com pool_size > 0 a instância é thread-safe para execução concorrente: cada
+    chamada empresta um cursor (conexão independente sobre o mesmo banco) de um
+    pool limitado, esperando até pool_timeout segundos por um cursor livre.
+    Sem pool, as chamadas de threads diferentes são serializadas na conexão única.
+
+    execute_query, fetch_data e fetch_arrow aceitam parâmetros (`?`/`$nome`).
+    Queries parametrizadas são analisadas uma vez por conexão e reutilizadas
+    com o binding nativo (cache LRU de até max_prepared_statements instruções).
+
+    Com enable_profiling=True (ou set_profiling(True)), o profiling JSON do
+    DuckDB de cada query é guardado (últimas max_profiles) e consultado com
+    slowest_operators, query_plan e query_profiles.
+
+    Com enable_scheduler=True, cada chamada passa por uma fila de admissão com
+    classes de prioridade (padrão: interactive para consultas, batch, limitada
+    a uma por vez, para CTAS, ingestão, exportação e scripts), com limites de
+    concorrência, timeout de fila (admission_timeout) e threads/memory_limit
+    por classe. Use query_class("batch") para reclassificar chamadas e
+    scheduler_metrics() para a profundidade das filas e os tempos de espera.
+
+    Com read_only=True o arquivo é aberto em modo somente leitura, o que
+    permite que vários processos o abram ao mesmo tempo (desde que nenhum o
+    tenha aberto para escrita); escritas falham com a convenção usual de erro
+    (ver ProcessPoolAnalytics).
     """
-    def __init__(self, db_path: str = ":memory:"):
+    def __init__(self, db_path: str = ":memory:", enable_cache: bool = False,
+                 cache_max_bytes: int = 256 * 1024 * 1024, cache_ttl: Optional[float] = None,
+                 pool_size: int = 0, pool_timeout: float = 30.0, max_prepared_statements: int = 128,
+                 enable_profiling: bool = False, max_profiles: int = 100, enable_scheduler: bool = False,
+                 priority_classes: Optional[Mapping[str, Mapping[str, Any]]] = None,
+                 max_concurrent_queries: Optional[int] = None, admission_timeout: float = 60.0,
+                 read_only: bool = False):
         self.db_path = db_path
+        self.read_only = read_only
         self.conn: Optional[duckdb.DuckDBPyConnection] = None
-        self.metadata: Dict[str, Dict[str, Any]] = {}
+        self.metadata = MetadataCatalog(self.cursor)
+        self.cache: Optional[QueryCache] = QueryCache(cache_max_bytes, cache_ttl) if enable_cache else None
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.pool: Optional[ConnectionPool] = None
+        self.max_prepared_statements = max_prepared_statements
+        self._prepared: Dict[int, PreparedStatementCache] = {}
+        self._table_versions: Dict[str, int] = {}
+        self._query_dependencies: Dict[str, Optional[Set[str]]] = {}
+        self._connect_lock = threading.Lock()
+        self._conn_lock = threading.RLock()
+        self._versions_lock = threading.Lock()
+        self.last_ingest_report: Optional[Dict[str, Any]] = None
+        self.last_script_report: Optional[Dict[str, Any]] = None
+        self._registered: Dict[str, Any] = {}
+        self._registered_lock = threading.Lock()
+        self.profiling = enable_profiling
+        self.profiler = QueryProfiler(max_profiles)
+        self.scheduler: Optional[QueryScheduler] = QueryScheduler(
+            priority_classes, max_concurrent_queries, admission_timeout, apply_settings=self._apply_global_settings
+        ) if enable_scheduler else None
+        self._query_class = threading.local()
+        self.rollup_routing = True
+        self._rollups: Optional[Dict[str, Dict[str, Any]]] = None
+        self._rollup_routes: Dict[str, List[Tuple[str, str]]] = {}
+        self._rollup_hits: Dict[str, int] = {}
+        self._aggregate_functions: Optional[Set[str]] = None
+        self._samples: Optional[Dict[str, Dict[str, Any]]] = None
+        self._planning_conn: Optional[duckdb.DuckDBPyConnection] = None
+        self._planning_lock = threading.RLock()
+        self._sharded: Optional[Dict[str, Dict[str, Any]]] = None
+        self._shard_plans: Dict[str, Optional[Tuple[str, Dict[str, Any]]]] = {}
+        self._shard_pools: Dict[str, List[ProcessPoolAnalytics]] = {}
+        self._shard_lock = threading.RLock()
+        self._ingestors: List[TailingIngestor] = []
 
     def connect(self):
         """Conecta ao banco de dados DuckDB."""
-        if self.conn is None:
-            try:
-                self.conn = duckdb.connect(database=self.db_path, read_only=False)
-                print(f"✓ Conectado ao DuckDB em {self.db_path}")
-            except duckdb.Error as e:
-                print(f"✗ Erro ao conectar ao DuckDB: {e}")
-                self.conn = None
+        with self._connect_lock:
+            if self.conn is None:
+                try:
+                    self.conn = duckdb.connect(database=self.db_path, read_only=self.read_only)
+                    self._prepare_connection(self.conn)
+                    if self.scheduler:
+                        # None = valor padrão do DuckDB (RESET), sem perda de precisão ao restaurar
+                        self.scheduler.capture_baseline({"threads": None, "memory_limit": None})
+                    if self.pool_size > 0:
+                        self.pool = ConnectionPool(self.conn, self.pool_size, self.pool_timeout,
+                                                   on_create=self._prepare_connection)
+                    print(f"✓ Conectado ao DuckDB em {self.db_path}")
+                except duckdb.Error as e:
+                    print(f"✗ Erro ao conectar ao DuckDB: {e}")
+                    self.conn = None
 
     def disconnect(self):
-        """Desconecta do banco de dados DuckDB."""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-            print(f"✓ Desconectado do DuckDB em {self.db_path}")
+        """Desconecta do banco de dados DuckDB (encerrando as ingestões contínuas, com o último lote gravado)."""
+        ingestors, self._ingestors = self._ingestors, []
+        for ingestor in ingestors:
+            ingestor.stop()
+        with self._connect_lock:
+            if self.conn:
+                self._close_shard_pools()
+                if self.pool:
+                    self.pool.close()
+                    self.pool = None
+                with self._planning_lock:
+                    if self._planning_conn is not None:
+                        self._planning_conn.close()
+                        self._planning_conn = None
+                self.conn.close()
+                self.conn = None
+                self._prepared.clear()
+                self.metadata.reset()
+                self._rollups = None
+                self._rollup_routes.clear()
+                self._samples = None
+                self._sharded = None
+                self._shard_plans.clear()
+                print(f"✓ Desconectado do DuckDB em {self.db_path}")
 
-    def execute_query(self, query: str) -> Optional[List[Tuple[Any, ...]]]:
-        """Executa uma query SQL e retorna os resultados, se houver."""
+    @contextmanager
+    def cursor(self, timeout: Optional[float] = None,
+               query_class: Optional[str] = None) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        Context manager que fornece uma conexão para uso exclusivo da thread atual:
+        um cursor do pool (modo pool) ou a conexão principal sob lock.
+        Com o agendador ativo, espera antes a admissão na classe query_class.
+        Lança PoolTimeoutError ou AdmissionTimeoutError (subclasses de duckdb.Error)
+        se o pool ou a fila de admissão esgotarem o tempo limite, e
+        UnknownQueryClassError se a classe não estiver configurada.
+        """
         if not self.conn:
             self.connect()
         if not self.conn:
-            return None
+            raise duckdb.ConnectionException(f"Não foi possível conectar ao DuckDB em {self.db_path}")
+        with self._admission(query_class):
+            if self.pool:
+                with self.pool.acquire(timeout) as conn:
+                    yield conn
+            else:
+                with self._conn_lock:
+                    yield self.conn
+
+    @contextmanager
+    def query_class(self, name: str) -> Iterator[None]:
+        """
+        Classifica as chamadas feitas pela thread atual dentro do bloco na
+        classe de prioridade informada (ex.: "batch"), em vez da classe padrão
+        de cada método.
+        """
+        previous = getattr(self._query_class, "name", None)
+        self._query_class.name = name
         try:
-            result = self.conn.execute(query)
-            if result.description:
-                return result.fetchall()
+            yield
+        finally:
+            self._query_class.name = previous
+
+    def scheduler_metrics(self) -> Dict[str, Any]:
+        """
+        Métricas da fila de admissão (por classe: em execução, na fila,
+        admitidas, timeouts e tempos de espera), ou {} sem agendador.
+        """
+        return self.scheduler.metrics() if self.scheduler else {}
+
+    def _admission(self, query_class: Optional[str] = None):
+        """Vaga na fila de admissão para a classe da chamada (sem agendador, não faz nada)."""
+        if not self.scheduler:
+            return nullcontext()
+        return self.scheduler.admit(getattr(self._query_class, "name", None) or query_class)
+
+    def _detached_admission(self, query_class: Optional[str] = None) -> Callable[[], None]:
+        """Vaga na fila de admissão que segue ocupada até a função retornada ser chamada."""
+        if not self.scheduler:
+            return lambda: None
+        return self.scheduler.admit_detached(getattr(self._query_class, "name", None) or query_class)
+
+    def _apply_global_settings(self, settings: Dict[str, Any]):
+        """
+        Aplica configurações globais do DuckDB (threads, memory_limit) em um
+        cursor próprio; None restaura o valor padrão.
+        """
+        if not self.conn:
+            return
+        cursor = self.conn.cursor()
+        try:
+            for name, value in settings.items():
+                cursor.execute(f"RESET {name}" if value is None else f"SET {name} = {_sql_string(str(value))}")
+        finally:
+            cursor.close()
+
+    def execute_query(self, query: str, params: Optional[Params] = None) -> Optional[List[Tuple[Any, ...]]]:
+        """Executa uma query SQL (opcionalmente parametrizada) e retorna os resultados, se houver."""
+        if not self.conn:
+            self.connect()
+        if not self.conn:
             return None
+        cache_key = self._cache_key("rows", query, params)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key[0])
+            if cached is not None:
+                return list(cached)
+        try:
+            with self.cursor() as conn:
+                rows = self._fetch(conn, query, params, lambda result: result.fetchall() if result.description else None,
+                                   "execute_query")
         except duckdb.Error as e:
             print(f"✗ Erro ao executar query: {e}")
             return None
+        finally:
+            self._invalidate_written_tables(query)
+        if cache_key is not None and rows is not None:
+            self.cache.put(cache_key[0], rows, cache_key[1])
+        return rows
 
-    def fetch_data(self, query: str) -> pd.DataFrame:
-        """Executa uma query e retorna os resultados como um DataFrame Pandas."""
+    def fetch_data(self, query: str, params: Optional[Params] = None, approximate: bool = False) -> pd.DataFrame:
+        """
+        Executa uma query (opcionalmente parametrizada) e retorna os resultados como um DataFrame Pandas.
+        Consultas de agregação que um rollup atualizado responde são lidas dele (ver create_rollup);
+        consultas sobre uma tabela em shards rodam em paralelo nos shards (ver create_sharded_table).
+        Com approximate=True, equivale a fetch_approximate(query, params).
+        """
+        if approximate:
+            return self.fetch_approximate(query, params)
         if not self.conn:
             self.connect()
         if not self.conn:
             return pd.DataFrame()
+        query = self._route_query(query, params)
+        cache_key = self._cache_key("df", query, params)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key[0])
+            if cached is not None:
+                return cached.copy()
         try:
-            return self.conn.execute(query).fetchdf()
+            df = self._fetch_sharded(query, params, lambda result: result.fetchdf())
+            if df is None:
+                with self.cursor() as conn:
+                    df = self._fetch(conn, query, params, lambda result: result.fetchdf(), "fetch_data")
         except duckdb.Error as e:
             print(f"✗ Erro ao buscar dados: {e}")
             return pd.DataFrame()
+        finally:
+            self._invalidate_written_tables(query)
+        if cache_key is not None:
+            self.cache.put(cache_key[0], df.copy(), cache_key[1])
+        return df
 
-    def create_table_from_query(self, table_name: str, query: str) -> bool:
+    def fetch_approximate(self, query: str, params: Optional[Params] = None, method: str = "auto",
+                          sample_percent: float = 1.0, sample_rows: int = 100_000, confidence: float = 0.95,
+                          seed: Optional[int] = None) -> pd.DataFrame:
         """
-        Cria uma nova tabela a partir dos resultados de uma query.
+        Executa uma consulta de agregação sobre uma amostra da tabela do FROM e
+        retorna as estimativas (SUM e COUNT escalados pelo peso de cada linha)
+        e, para cada coluna SUM, COUNT ou AVG, as colunas <coluna>_low e
+        <coluna>_high com o intervalo de confiança (confidence).
+
+        method: "stratified" (amostra persistida com create_sample), "system"
+        ou "bernoulli" (sample_percent % das linhas, sorteadas por bloco ou por
+        linha), "reservoir" (sample_rows linhas) ou "auto" (a amostra
+        estratificada, se houver uma atualizada, senão system). Quantis
+        (median, quantile_*) usam approx_quantile; consultas com COUNT(DISTINCT)
+        rodam sobre a tabela inteira com approx_count_distinct, sem intervalos.
+        Consultas sem agregados, com junções, CTEs ou funções de janela são
+        executadas de forma exata.
+
+        df.attrs["approximate"] descreve a execução: mode ("sample",
+        "approx_functions" ou "exact"), method, confidence, source_rows,
+        intervals ({coluna: (coluna_low, coluna_high)}) e query (o SQL executado).
+        """
+        if method != "auto" and method not in SAMPLE_METHODS:
+            print(f"✗ Erro: método de amostragem inválido '{method}'. Use 'auto' ou um de {SAMPLE_METHODS}.")
+            return pd.DataFrame()
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return pd.DataFrame()
+        plan, chosen, source_rows = None, None, None
+        try:
+            self._sample_definitions()
+            with self.cursor() as conn:
+                tree = parse_select(conn, query)
+                from_table = (tree or {}).get("node", {}).get("from_table") or {}
+                if from_table.get("type") == "BASE_TABLE":
+                    table_name = from_table["table_name"]
+                    size = conn.execute(
+                        "SELECT estimated_size FROM duckdb_tables() WHERE lower(table_name) = ?", [table_name.lower()]
+                    ).fetchone()
+                    source_rows = size[0] if size else None
+                    sample = self._fresh_sample(table_name) if method in ("auto", "stratified") else None
+                    if method == "stratified" and sample is None:
+                        raise duckdb.InvalidInputException(
+                            f"não há amostra estratificada atualizada de '{table_name}' (use create_sample)"
+                        )
+                    chosen = "stratified" if sample else ("system" if method == "auto" else method)
+                    if chosen == "reservoir" and source_rows is None:
+                        source_rows = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+                    source_sql = (f"(SELECT * FROM {sample['sample_table']})" if sample else
+                                  sample_source(table_name, chosen, sample_percent, sample_rows, source_rows, seed))
+                    if self._aggregate_functions is None:
+                        self._aggregate_functions = aggregate_functions(conn)
+                    output_names = [row[0] for row in conn.execute(f"DESCRIBE {query}", params).fetchall()]
+                    z = NormalDist().inv_cdf((1 + confidence) / 2)
+                    plan = rewrite_approximate(conn, tree, source_sql, output_names, z, self._aggregate_functions)
+                if plan is not None:
+                    df = self._fetch(conn, plan[0], params, lambda result: result.fetchdf(), "fetch_approximate")
+        except (duckdb.Error, ValueError) as e:
+            print(f"✗ Erro ao executar a consulta aproximada: {e}")
+            return pd.DataFrame()
+        if plan is None:
+            df = self.fetch_data(query, params)
+            plan = (query, "exact", {})
+        df.attrs["approximate"] = {
+            "mode": plan[1],
+            "method": chosen if plan[1] == "sample" else None,
+            "confidence": confidence,
+            "source_rows": source_rows,
+            "intervals": plan[2],
+            "query": plan[0],
+        }
+        return df
+
+    def create_sample(self, table_name: str, strata: Sequence[str] = (), rows_per_stratum: int = 10_000,
+                      seed: int = 42) -> bool:
+        """
+        Cria (ou recria) a amostra estratificada persistida de uma tabela
+        (__sample_<tabela>), usada por fetch_approximate: cerca de
+        rows_per_stratum linhas de cada combinação das colunas de strata
+        (estratos menores entram inteiros) e a coluna __weight com o peso de
+        cada linha. Estratificar pelas dimensões mais usadas nos filtros e
+        GROUP BY garante estimativas para grupos pequenos. A amostra é recriada
+        a cada ingestão na tabela.
         """
         if not self.conn:
             self.connect()
         if not self.conn:
             return False
+        sample_table = f"__sample_{unqualify(table_name)}"
         try:
-            self.conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS {query}")
-            self._update_metadata(table_name, "table", query)
-            print(f"✓ Tabela \'{table_name}\' criada com sucesso a partir da query.")
+            samples = self._sample_definitions()
+            version = self._table_versions.get(unqualify(table_name), 0)
+            with self.cursor(query_class="batch") as conn:
+                watermark, source_rows = conn.execute(
+                    f"SELECT COALESCE(MAX(rowid) + 1, 0), COUNT(*) FROM {table_name}"
+                ).fetchone()
+                conn.execute(f"CREATE OR REPLACE TABLE {sample_table} AS "
+                             f"{stratified_sample_query(table_name, list(strata), rows_per_stratum, seed)}")
+                rows = conn.execute(f"SELECT COUNT(*) FROM {sample_table}").fetchone()[0]
+            definition = {
+                "source_table": table_name,
+                "sample_table": sample_table,
+                "strata": list(strata),
+                "rows_per_stratum": rows_per_stratum,
+                "seed": seed,
+                "rows": rows,
+                "source_rows": source_rows,
+                "watermark": watermark,
+                "version": version,
+            }
+            self._bump_table_versions([sample_table])
+            self._update_metadata(sample_table, "table", f"Amostra estratificada de {table_name}", sample=definition)
+            samples[unqualify(table_name)] = definition
+            print(f"✓ Amostra estratificada '{sample_table}' criada com {rows} de {source_rows} linha(s) de '{table_name}'.")
             return True
         except duckdb.Error as e:
-            print(f"✗ Erro ao criar tabela \'{table_name}\' a partir da query: {e}")
+            print(f"✗ Erro ao criar a amostra de '{table_name}' : {e}")
             return False
 
-    def ingest_csv(self, file_path: str, table_name: str, create_table: bool = True) -> bool:
+    def _sample_definitions(self) -> Dict[str, Dict[str, Any]]:
         """
-        Ingere dados de um arquivo CSV para uma tabela DuckDB.
-        Se create_table for True, cria a tabela. Caso contrário, insere na tabela existente.
+        Amostras estratificadas do catálogo por tabela de origem, carregadas uma
+        vez por conexão (como em _rollup_definitions, uma amostra de sessão
+        anterior só vale se a origem não mudou desde que foi criada).
+        """
+        if self._samples is not None:
+            return self._samples
+        samples = {}
+        definitions = self.metadata.find("sample")
+        with self.cursor() as conn:
+            for definition in definitions.values():
+                source = unqualify(definition["source_table"])
+                definition["version"] = None
+                try:
+                    state = conn.execute(
+                        f"SELECT COALESCE(MAX(rowid) + 1, 0), COUNT(*) FROM {definition['source_table']}"
+                    ).fetchone()
+                except duckdb.Error:
+                    continue
+                if state == (definition["watermark"], definition["source_rows"]):
+                    definition["version"] = self._table_versions.get(source, 0)
+                samples[source] = definition
+        self._samples = samples
+        return samples
+
+    def _fresh_sample(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """Definição da amostra estratificada da tabela, se existir e a tabela não tiver mudado desde então."""
+        sample = self._sample_definitions().get(unqualify(table_name))
+        if sample is None or sample["version"] != self._table_versions.get(unqualify(table_name), 0):
+            return None
+        return sample
+
+    def fetch_arrow(self, query: str, params: Optional[Params] = None) -> pa.Table:
+        """
+        Executa uma query e retorna os resultados como uma tabela PyArrow, sem
+        conversão para pandas nem criação de objetos Python por linha. Como em
+        fetch_data, consultas de agregação podem ser lidas de um rollup.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return pa.table({})
+        try:
+            return self._fetch_arrow(query, params)
+        except duckdb.Error as e:
+            print(f"✗ Erro ao buscar dados em Arrow: {e}")
+            return pa.table({})
+
+    def _fetch_arrow(self, query: str, params: Optional[Params] = None) -> pa.Table:
+        """fetch_arrow sem o tratamento de erros: duckdb.Error é propagado (usado pelo servidor de queries)."""
+        query = self._route_query(query, params)
+        cache_key = self._cache_key("arrow", query, params)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key[0])
+            if cached is not None:
+                return cached
+        try:
+            table = self._fetch_sharded(query, params, _to_arrow_table)
+            if table is None:
+                with self.cursor() as conn:
+                    table = self._fetch(conn, query, params, _to_arrow_table, "fetch_arrow")
+        finally:
+            self._invalidate_written_tables(query)
+        if cache_key is not None:
+            self.cache.put(cache_key[0], table, cache_key[1])
+        return table
+
+    def executemany(self, query: str, params_seq: Iterable[Params]) -> bool:
+        """
+        Executa a mesma instrução para cada conjunto de parâmetros (ex.: INSERT em
+        lote), preparando-a uma única vez.
         """
         if not self.conn:
             self.connect()
         if not self.conn:
-            return False
-        if not os.path.exists(file_path):
-            print(f"✗ Erro: Arquivo CSV \'{file_path}\' não encontrado.")
             return False
         try:
-            if create_table:
-                self.conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM \'{file_path}\'")
-                self._update_metadata(table_name, "table", f"Ingestão de CSV: {file_path}")
-                print(f"✓ Dados importados de \'{file_path}\' para a nova tabela \'{table_name}\' com sucesso.")
-            else:
-                self.conn.execute(f"INSERT INTO {table_name} SELECT * FROM \'{file_path}\'")
-                print(f"✓ Dados inseridos de \'{file_path}\' na tabela existente \'{table_name}\' com sucesso.")
+            with self.cursor() as conn:
+                conn.executemany(query, list(params_seq))
             return True
         except duckdb.Error as e:
-            print(f"✗ Erro ao ingerir CSV para \'{table_name}\' de \'{file_path}\' : {e}")
+            print(f"✗ Erro ao executar query em lote: {e}")
             return False
+        finally:
+            self._invalidate_written_tables(query)
 
-    def import_from_csv(self, file_path: str, table_name: str, create_table: bool = True) -> bool:
+    def prepared_statement_stats(self) -> Dict[str, int]:
+        """
+        Retorna as estatísticas agregadas do cache de prepared statements de todas as conexões.
+        """
+        totals = {"hits": 0, "misses": 0, "evictions": 0, "fallbacks": 0, "statements": 0}
+        for prepared in list(self._prepared.values()):
+            for key, value in prepared.stats().items():
+                totals[key] += value
+        return totals
+
+    def fetch_record_batches(self, query: str, batch_size: int = 1_000_000) -> Optional[pa.RecordBatchReader]:
+        """
+        Executa uma query e retorna um RecordBatchReader que produz lotes de até
+        batch_size linhas sob demanda. A query roda em um cursor próprio, então
+        outras chamadas na mesma instância não interrompem a leitura. Com o
+        agendador ativo, a leitura ocupa uma vaga na fila de admissão; a vaga e
+        o cursor são liberados quando o reader chega ao fim ou é descartado
+        (o close() do PyArrow não libera o iterador: use del reader para
+        encerrar uma leitura incompleta).
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return None
+        try:
+            release = self._detached_admission()
+        except duckdb.Error as e:
+            print(f"✗ Erro ao buscar lotes em Arrow: {e}")
+            return None
+        cursor = self._new_cursor()
+        try:
+            reader = _to_arrow_reader(cursor.execute(query), batch_size)
+        except duckdb.Error as e:
+            cursor.close()
+            release()
+            self._invalidate_written_tables(query)
+            print(f"✗ Erro ao buscar lotes em Arrow: {e}")
+            return None
+
+        def batches() -> Iterator[pa.RecordBatch]:
+            try:
+                yield from reader
+            finally:
+                try:
+                    cursor.interrupt()
+                    cursor.close()
+                except duckdb.Error:
+                    # Reader descartado depois de disconnect(): o cursor já foi fechado
+                    pass
+                release()
+                self._invalidate_written_tables(query)
+
+        return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+    @contextmanager
+    def _stream_record_batches(self, query: str, params: Optional[Params] = None,
+                               batch_size: int = 1_000_000) -> Iterator[pa.RecordBatchReader]:
+        """
+        RecordBatchReader da query em um cursor próprio, válido dentro do bloco,
+        que ocupa uma vaga na fila de admissão até o fim da leitura. Erros são
+        propagados (usado pelo servidor de queries); ao sair, a query é
+        cancelada se ainda estiver em andamento.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            raise duckdb.ConnectionException(f"Não foi possível conectar ao DuckDB em {self.db_path}")
+        with self._admission():
+            cursor = self._new_cursor()
+            try:
+                yield _to_arrow_reader(cursor.execute(query, params or []), batch_size)
+            finally:
+                cursor.interrupt()
+                cursor.close()
+                self._invalidate_written_tables(query)
+
+    def fetch_data_chunks(self, query: str, chunk_size: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        Executa uma query e produz os resultados em DataFrames de até chunk_size
+        linhas, usando o fetch em streaming do DuckDB: a memória fica limitada ao
+        chunk corrente, qualquer que seja o tamanho total do resultado.
+        Encerrar a iteração antes do fim (break, close()) cancela a query.
+        Com o agendador ativo, a iteração ocupa uma vaga na fila de admissão
+        até terminar. Em caso de erro nenhum novo chunk é produzido.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return
+        try:
+            release = self._detached_admission()
+        except duckdb.Error as e:
+            print(f"✗ Erro ao buscar dados em chunks: {e}")
+            return
+        cursor = self._new_cursor()
+        try:
+            for batch in _to_arrow_reader(cursor.execute(query), chunk_size):
+                yield batch.to_pandas()
+        except (duckdb.Error, OSError) as e:
+            # Erros durante o streaming chegam do reader Arrow como OSError
+            print(f"✗ Erro ao buscar dados em chunks: {e}")
+        finally:
+            try:
+                cursor.interrupt()
+                cursor.close()
+            except duckdb.Error:
+                # Iterador descartado depois de disconnect(): o cursor já foi fechado
+                pass
+            release()
+            self._invalidate_written_tables(query)
+
+    def create_table_from_query(self, table_name: str, query: str) -> bool:
+        """
+        Cria uma nova tabela a partir dos resultados de uma query.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return False
+        try:
+            with self.cursor(query_class="batch") as conn:
+                conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS {query}")
+                self._bump_table_versions([table_name])
+                self._update_metadata(table_name, "table", query)
+                print(f"✓ Tabela \'{table_name}\' criada com sucesso a partir da query.")
+                return True
+        except duckdb.Error as e:
+            print(f"✗ Erro ao criar tabela \'{table_name}\' a partir da query: {e}")
+            return False
+
+    def ingest_csv(self, file_path: FileSource, table_name: str, create_table: bool = True,
+                   threads: Optional[int] = None, hive_partitioning: Optional[bool] = None,
+                   incremental: bool = False, cluster_by: Optional[Sequence[str]] = None) -> bool:
+        """
+        Ingere dados de um ou mais arquivos CSV para uma tabela DuckDB.
+        Se create_table for True, cria a tabela. Caso contrário, insere na tabela existente.
+        file_path pode ser um arquivo, um padrão glob, um diretório ou uma lista de arquivos;
+        todos são lidos em uma única varredura paralela. Com incremental=True, apenas
+        arquivos novos ou alterados desde a última carga são ingeridos (ver _ingest_files).
+        """
+        return self._ingest_files("csv", file_path, table_name, create_table, threads, hive_partitioning, incremental,
+                                  cluster_by)
+
+    def import_from_csv(self, file_path: FileSource, table_name: str, create_table: bool = True) -> bool:
         """
         Alias para ingest_csv() para manter compatibilidade com a documentação.
         Ingere dados de um arquivo CSV para uma tabela DuckDB.
         """
         return self.ingest_csv(file_path, table_name, create_table)
 
-    def ingest_parquet(self, file_path: str, table_name: str, create_table: bool = True) -> bool:
+    def ingest_parquet(self, file_path: FileSource, table_name: str, create_table: bool = True,
+                       threads: Optional[int] = None, hive_partitioning: Optional[bool] = None,
+                       incremental: bool = False, cluster_by: Optional[Sequence[str]] = None) -> bool:
+        """
+        Ingere dados de um ou mais arquivos Parquet para uma tabela DuckDB.
+        """
+        return self._ingest_files("parquet", file_path, table_name, create_table, threads, hive_partitioning, incremental,
+                                  cluster_by)
+
+    def ingest_json(self, file_path: FileSource, table_name: str, create_table: bool = True,
+                    threads: Optional[int] = None, hive_partitioning: Optional[bool] = None,
+                    incremental: bool = False, cluster_by: Optional[Sequence[str]] = None) -> bool:
+        """
+        Ingere dados de um ou mais arquivos JSON para uma tabela DuckDB.
+        """
+        return self._ingest_files("json", file_path, table_name, create_table, threads, hive_partitioning, incremental,
+                                  cluster_by)
+
+    def _ingest_files(self, file_format: str, file_path: FileSource, table_name: str, create_table: bool,
+                      threads: Optional[int], hive_partitioning: Optional[bool], incremental: bool = False,
+                      cluster_by: Optional[Sequence[str]] = None) -> bool:
         """
-        Ingere dados de um arquivo Parquet para uma tabela DuckDB.
+        Implementação comum dos métodos ingest_*. Resolve globs, diretórios e listas
+        de arquivos e os lê em uma única varredura do DuckDB, com union_by_name
+        (esquemas diferentes são unificados pelo nome das colunas) e extração das
+        colunas de particionamento hive (`ano=2025/`). threads ajusta temporariamente
+        o paralelismo do banco durante a carga.
+
+        Com incremental=True, consulta o ledger de ingestão (tabela __ingest_ledger)
+        e carrega apenas arquivos novos ou alterados (tamanho/mtime e hash do
+        conteúdo); as linhas de arquivos alterados são substituídas. A tabela
+        mantém a coluna _source_file com a origem de cada linha e é criada se
+        ainda não existir.
+
+        Com cluster_by, as linhas de cada carga são gravadas ordenadas por essas
+        colunas (ex.: ["sale_date"]), o que estreita o min/max de cada row group
+        e permite ao DuckDB pular row groups em filtros por faixa; as
+        estatísticas da tabela são atualizadas com ANALYZE ao final.
+
+        As contagens de linhas por arquivo e a vazão ficam em self.last_ingest_report
+        (e em metadata[table_name]["last_ingest"]).
         """
+        label = _FILE_FORMAT_LABELS[file_format]
         if not self.conn:
             self.connect()
         if not self.conn:
             return False
-        if not os.path.exists(file_path):
-            print(f"✗ Erro: Arquivo Parquet \'{file_path}\' não encontrado.")
+        files = _resolve_files(file_path, _FILE_FORMAT_EXTENSIONS[file_format])
+        if not files:
+            print(f"✗ Erro: Arquivo {label} \'{file_path}\' não encontrado.")
             return False
+        source = file_path if isinstance(file_path, str) else f"{len(files)} arquivos"
+        options = f"union_by_name=true, filename='{_SOURCE_FILE_COLUMN}'"
+        if hive_partitioning is not None:
+            options += f", hive_partitioning={str(hive_partitioning).lower()}"
+
+        def reader(paths: List[str]) -> str:
+            return f"{_FILE_FORMAT_READERS[file_format]}([{', '.join(_sql_string(p) for p in paths)}], {options})"
+
+        start = time.perf_counter()
+        try:
+            with self.cursor(query_class="batch") as conn, _threads_setting(conn, threads):
+                order_by = f" ORDER BY {', '.join(cluster_by)}" if cluster_by else ""
+                if incremental:
+                    files, rows_per_file, skipped, created = self._load_incremental(conn, reader, files, table_name, order_by)
+                else:
+                    rows_per_file = self._load_files(conn, reader(files), table_name, create_table, order_by)
+                    skipped, created = 0, create_table
+                if files:
+                    if cluster_by:
+                        conn.execute(f"ANALYZE {table_name}")
+                    self._bump_table_versions([table_name])
+                if created:
+                    self._update_metadata(table_name, "table", f"Ingestão de {label}: {source}")
+                if cluster_by:
+                    self.metadata.update(table_name, cluster_by=list(cluster_by))
+                self._record_ingest_report(table_name, files, rows_per_file, time.perf_counter() - start, threads)
+                if incremental:
+                    print(f"✓ {len(files)} arquivo(s) novo(s) ou alterado(s) de \'{source}\' carregado(s) em \'{table_name}\' ({skipped} inalterado(s)).")
+                elif create_table:
+                    print(f"✓ Dados importados de \'{source}\' para a nova tabela \'{table_name}\' com sucesso.")
+                else:
+                    print(f"✓ Dados inseridos de \'{source}\' na tabela existente \'{table_name}\' com sucesso.")
+        except (duckdb.Error, OSError) as e:
+            print(f"✗ Erro ao ingerir {label} para \'{table_name}\' de \'{source}\' : {e}")
+            return False
+        if files:
+            self._refresh_derived_tables(table_name, replaced=create_table and not incremental)
+        return True
+
+    def _load_files(self, conn: duckdb.DuckDBPyConnection, reader: str, table_name: str, create_table: bool,
+                    order_by: str = "") -> Dict[str, int]:
+        """
+        Carrega os arquivos em uma tabela nova ou existente, sem a coluna de origem
+        e na ordem de order_by (cláusula ORDER BY ou vazio).
+        Retorna o número de linhas lidas de cada arquivo.
+        """
+        if create_table:
+            conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {reader}{order_by}")
+            rows_per_file = conn.execute(f"SELECT {_SOURCE_FILE_COLUMN}, COUNT(*) FROM {table_name} GROUP BY 1").fetchall()
+            conn.execute(f"ALTER TABLE {table_name} DROP COLUMN {_SOURCE_FILE_COLUMN}")
+            return dict(rows_per_file)
+        conn.execute(f"CREATE OR REPLACE TEMP TABLE {_INGEST_STAGING_TABLE} AS SELECT * FROM {reader}")
         try:
-            if create_table:
-                self.conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM \'{file_path}\'")
-                self._update_metadata(table_name, "table", f"Ingestão de Parquet: {file_path}")
-                print(f"✓ Dados importados de \'{file_path}\' para a nova tabela \'{table_name}\' com sucesso.")
+            rows_per_file = conn.execute(f"SELECT {_SOURCE_FILE_COLUMN}, COUNT(*) FROM {_INGEST_STAGING_TABLE} GROUP BY 1").fetchall()
+            conn.execute(f"INSERT INTO {table_name} SELECT * EXCLUDE ({_SOURCE_FILE_COLUMN}) FROM {_INGEST_STAGING_TABLE}{order_by}")
+        finally:
+            conn.execute(f"DROP TABLE IF EXISTS {_INGEST_STAGING_TABLE}")
+        return dict(rows_per_file)
+
+    def _load_incremental(self, conn: duckdb.DuckDBPyConnection, reader: Callable[[List[str]], str],
+                          files: List[str], table_name: str,
+                          order_by: str = "") -> Tuple[List[str], Dict[str, int], int, bool]:
+        """
+        Carrega somente os arquivos novos ou alterados segundo o ledger, substituindo
+        as linhas de arquivos alterados, em uma única transação. Retorna os arquivos
+        carregados, as linhas por arquivo, a quantidade de arquivos inalterados e se
+        a tabela foi criada.
+        """
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {_INGEST_LEDGER_TABLE} (
+                table_name VARCHAR, file_path VARCHAR, file_size BIGINT, file_mtime DOUBLE,
+                content_hash VARCHAR, row_count BIGINT, ingested_at TIMESTAMP,
+                PRIMARY KEY (table_name, file_path)
+            )
+        """)
+        ledger = {
+            row[0]: row[1:] for row in conn.execute(
+                f"SELECT file_path, file_size, file_mtime, content_hash FROM {_INGEST_LEDGER_TABLE} WHERE table_name = ?",
+                [table_name],
+            ).fetchall()
+        }
+        columns = [row[0] for row in conn.execute(
+            "SELECT column_name FROM duckdb_columns() WHERE table_name = ? AND NOT internal", [table_name]
+        ).fetchall()]
+        exists = bool(columns)
+        if exists and _SOURCE_FILE_COLUMN not in columns:
+            raise duckdb.InvalidInputException(
+                f"a tabela \'{table_name}\' não tem a coluna {_SOURCE_FILE_COLUMN}; recrie-a com incremental=True"
+            )
+
+        to_load, changed, touched, fingerprints = [], [], [], {}
+        for path in (os.path.abspath(f) for f in files):
+            stat = os.stat(path)
+            previous = ledger.get(path) if exists else None
+            if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime:
+                continue
+            content_hash = _file_hash(path)
+            fingerprints[path] = (stat.st_size, stat.st_mtime, content_hash)
+            if previous and previous[2] == content_hash:
+                touched.append(path)
+                continue
+            to_load.append(path)
+            if previous:
+                changed.append(path)
+
+        row_counts: Dict[str, int] = {}
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            if to_load:
+                conn.execute(f"CREATE OR REPLACE TEMP TABLE {_INGEST_STAGING_TABLE} AS SELECT * FROM {reader(to_load)}")
+                if exists:
+                    if changed:
+                        conn.execute(f"DELETE FROM {table_name} WHERE {_SOURCE_FILE_COLUMN} IN ({', '.join('?' * len(changed))})", changed)
+                    conn.execute(f"INSERT INTO {table_name} BY NAME SELECT * FROM {_INGEST_STAGING_TABLE}{order_by}")
+                else:
+                    conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM {_INGEST_STAGING_TABLE}{order_by}")
+                row_counts = dict(conn.execute(
+                    f"SELECT {_SOURCE_FILE_COLUMN}, COUNT(*) FROM {_INGEST_STAGING_TABLE} GROUP BY 1"
+                ).fetchall())
+                conn.execute(f"DROP TABLE {_INGEST_STAGING_TABLE}")
+            for path in to_load + touched:
+                size, mtime, content_hash = fingerprints[path]
+                if path in touched:
+                    conn.execute(
+                        f"UPDATE {_INGEST_LEDGER_TABLE} SET file_size = ?, file_mtime = ? WHERE table_name = ? AND file_path = ?",
+                        [size, mtime, table_name, path],
+                    )
+                else:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {_INGEST_LEDGER_TABLE} VALUES (?, ?, ?, ?, ?, ?, now()::TIMESTAMP)",
+                        [table_name, path, size, mtime, content_hash, row_counts.get(path, 0)],
+                    )
+            conn.execute("COMMIT")
+        except (duckdb.Error, OSError):
+            conn.execute("ROLLBACK")
+            raise
+        return to_load, row_counts, len(files) - len(to_load), bool(to_load) and not exists
+
+    def _record_ingest_report(self, table_name: str, files: List[str], rows_per_file: Dict[str, int],
+                              seconds: float, threads: Optional[int]):
+        """
+        Registra as contagens por arquivo e a vazão da última ingestão.
+        """
+        file_reports = [
+            {"path": f, "rows": rows_per_file.get(f, 0), "bytes": os.path.getsize(f)} for f in files
+        ]
+        total_rows = sum(r["rows"] for r in file_reports)
+        total_bytes = sum(r["bytes"] for r in file_reports)
+        self.last_ingest_report = {
+            "table": table_name,
+            "files": file_reports,
+            "file_count": len(files),
+            "total_rows": total_rows,
+            "total_bytes": total_bytes,
+            "seconds": seconds,
+            "rows_per_second": total_rows / seconds if seconds > 0 else 0.0,
+            "mb_per_second": total_bytes / (1024 * 1024) / seconds if seconds > 0 else 0.0,
+            "threads": threads,
+        }
+        self.metadata.update(table_name, last_ingest=self.last_ingest_report)
+
+    def ingest_dataframe(self, df: Any, table_name: str, materialize: bool = False) -> bool:
+        """
+        Disponibiliza um DataFrame pandas ou Polars como tabela DuckDB, sem passar
+        por arquivos. Por padrão o objeto é registrado como tabela virtual sem cópia
+        (as queries leem diretamente a memória do DataFrame); com materialize=True
+        os dados são copiados para uma tabela do banco.
+        """
+        return self._register_object(df, table_name, materialize)
+
+    def register_arrow(self, arrow_obj: Any, table_name: str, materialize: bool = False) -> bool:
+        """
+        Disponibiliza uma Table, RecordBatch, Dataset ou RecordBatchReader PyArrow
+        como tabela DuckDB (ver ingest_dataframe). Um RecordBatchReader só pode ser
+        lido uma vez e por isso é sempre materializado.
+        """
+        if isinstance(arrow_obj, pa.RecordBatchReader):
+            materialize = True
+        return self._register_object(arrow_obj, table_name, materialize)
+
+    def unregister(self, table_name: str) -> bool:
+        """
+        Remove uma tabela virtual registrada com ingest_dataframe/register_arrow.
+        """
+        with self._registered_lock:
+            registered = self._registered.pop(table_name, None) is not None
+        if not registered:
+            print(f"✗ Erro: '{table_name}' não é um objeto registrado.")
+            return False
+        try:
+            for conn in self._connections():
+                conn.unregister(table_name)
+            self._bump_table_versions([table_name])
+            self.metadata.remove(table_name)
+            print(f"✓ Objeto '{table_name}' removido com sucesso.")
+            return True
+        except duckdb.Error as e:
+            print(f"✗ Erro ao remover o objeto '{table_name}' : {e}")
+            return False
+
+    def _register_object(self, obj: Any, table_name: str, materialize: bool) -> bool:
+        """
+        Implementação comum de ingest_dataframe e register_arrow. Tabelas virtuais
+        são registradas na conexão principal e em todos os cursores (os do pool,
+        inclusive os criados depois, e os de streaming), pois o registro do DuckDB
+        vale apenas para a conexão em que foi feito. Alterações in-place no objeto
+        não invalidam o cache de resultados; registre-o novamente nesse caso.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return False
+        kind = f"{type(obj).__module__.split('.')[0]}.{type(obj).__name__}"
+        rows = getattr(obj, "num_rows", None)
+        if rows is None and hasattr(obj, "__len__"):
+            rows = len(obj)
+        source = kind if rows is None else f"{kind} ({rows} linhas)"
+        try:
+            if materialize:
+                with self._registered_lock:
+                    was_registered = self._registered.pop(table_name, None) is not None
+                if was_registered:
+                    for conn in self._connections():
+                        conn.unregister(table_name)
+                with self.cursor(query_class="batch") as conn:
+                    conn.register(_REGISTER_STAGING_VIEW, obj)
+                    try:
+                        conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {_REGISTER_STAGING_VIEW}")
+                    finally:
+                        conn.unregister(_REGISTER_STAGING_VIEW)
             else:
-                self.conn.execute(f"INSERT INTO {table_name} SELECT * FROM \'{file_path}\'")
-                print(f"✓ Dados inseridos de \'{file_path}\' na tabela existente \'{table_name}\' com sucesso.")
+                with self._registered_lock:
+                    self._registered[table_name] = obj
+                for conn in self._connections():
+                    conn.register(table_name, obj)
+            self._bump_table_versions([table_name])
+            if materialize:
+                self._update_metadata(table_name, "table", f"Materialização de {source}")
+                print(f"✓ {source} materializado na tabela '{table_name}' com sucesso.")
+            else:
+                self._update_metadata(table_name, "view", f"Registro zero-copy de {source}")
+                print(f"✓ {source} registrado como '{table_name}' (zero-copy) com sucesso.")
+        except duckdb.Error as e:
+            print(f"✗ Erro ao registrar {kind} como '{table_name}' : {e}")
+            return False
+        if materialize:
+            self._refresh_derived_tables(table_name, replaced=True)
+        return True
+
+    def _prepare_connection(self, conn: duckdb.DuckDBPyConnection):
+        """
+        Configura uma conexão nova: objetos registrados e, se ativo, profiling.
+        """
+        self._register_objects(conn)
+        if self.profiling:
+            enable_connection_profiling(conn)
+
+    def _register_objects(self, conn: duckdb.DuckDBPyConnection):
+        """
+        Registra na conexão todos os objetos virtuais já registrados na instância.
+        """
+        with self._registered_lock:
+            registered = list(self._registered.items())
+        for name, obj in registered:
+            conn.register(name, obj)
+
+    def _connections(self) -> List[duckdb.DuckDBPyConnection]:
+        """
+        Conexão principal, cursores do pool e o cursor de planejamento de LazyFrame.
+        """
+        planning = [self._planning_conn] if self._planning_conn is not None else []
+        return [self.conn] + (self.pool.connections() if self.pool else []) + planning
+
+    def _new_cursor(self) -> duckdb.DuckDBPyConnection:
+        """
+        Cursor dedicado (fora do pool), configurado como as demais conexões.
+        """
+        cursor = self.conn.cursor()
+        self._prepare_connection(cursor)
+        return cursor
+
+    def lazy(self, source: str) -> LazyFrame:
+        """
+        Inicia um LazyFrame a partir de uma tabela, view, table function
+        (ex.: "read_parquet('dados/*.parquet')") ou SELECT. Os passos seguintes
+        (filter, select, join, aggregate, window...) só compõem o plano; a
+        execução acontece nas operações terminais (to_df, to_arrow,
+        to_parquet, to_csv, to_table), como uma única query. Lança duckdb.Error
+        se a origem não existir.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            raise duckdb.ConnectionException(f"Não foi possível conectar ao DuckDB em {self.db_path}")
+        query = source if source.lstrip().split(None, 1)[0].upper() in ("SELECT", "WITH", "FROM", "VALUES") \
+            else f"SELECT * FROM {source}"
+        with self._planning_lock:
+            if self._planning_conn is None:
+                self._planning_conn = self._new_cursor()
+            return LazyFrame(self, self._planning_conn.sql(query))
+
+    def create_view(self, view_name: str, query: str) -> bool:
+        """
+        Cria uma view a partir de uma query.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return False
+        try:
+            with self.cursor() as conn:
+                conn.execute(f"CREATE OR REPLACE VIEW {view_name} AS {query}")
+                self._bump_table_versions([view_name])
+                self._update_metadata(view_name, "view", query)
+                print(f"✓ View \'{view_name}\' criada com sucesso.")
+                return True
+        except duckdb.Error as e:
+            print(f"✗ Erro ao criar view \'{view_name}\' : {e}")
+            return False
+
+    def create_materialized_view(self, view_name: str, query: Optional[str] = None,
+                                 source_table: Optional[str] = None, group_by: Optional[Sequence[str]] = None,
+                                 aggregates: Optional[Mapping[str, str]] = None) -> bool:
+        """
+        Cria uma view materializada: uma tabela com o resultado de uma query, cuja
+        definição e dependências ficam em metadata[view_name]["materialized"] para
+        refresh_materialized_view e materialized_view_status.
+
+        Informe query (qualquer SELECT, apenas refresh completo) ou source_table,
+        group_by e aggregates ({"total": "SUM(amount)", "n": "COUNT(*)"}). Se todos
+        os agregados forem SUM, COUNT, MIN ou MAX e a fonte for uma tabela, a view
+        admite refresh incremental, que agrega apenas as linhas anexadas desde o
+        último refresh (a fonte deve ser append-only).
+        """
+        if (query is None) == (source_table is None) or (source_table is not None and not aggregates):
+            print(f"✗ Erro: informe query ou source_table e aggregates para a view materializada '{view_name}'.")
+            return False
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return False
+        definition: Dict[str, Any] = {"query": query, "incremental": False}
+        if source_table is not None:
+            group_by, aggregates = list(group_by or []), dict(aggregates)
+            definition.update(
+                query=build_aggregate_query(source_table, group_by, aggregates),
+                source_table=source_table, group_by=group_by, aggregates=aggregates,
+            )
+        try:
+            self._create_materialized_view(view_name, definition)
+            print(f"✓ View materializada '{view_name}' criada com sucesso.")
             return True
         except duckdb.Error as e:
-            print(f"✗ Erro ao ingerir Parquet para \'{table_name}\' de \'{file_path}\' : {e}")
+            print(f"✗ Erro ao criar a view materializada '{view_name}' : {e}")
             return False
 
-    def ingest_json(self, file_path: str, table_name: str, create_table: bool = True) -> bool:
+    def _create_materialized_view(self, view_name: str, definition: Dict[str, Any]):
         """
-        Ingere dados de um arquivo JSON para uma tabela DuckDB.
+        Materializa a definição pela primeira vez e a registra no catálogo.
+        Lança duckdb.Error em caso de falha.
+        """
+        source_table = definition.get("source_table")
+        with self.cursor(query_class="batch") as conn:
+            if source_table is not None and parse_aggregates(conn, definition["aggregates"]) is not None:
+                definition["incremental"] = conn.execute(
+                    "SELECT COUNT(*) FROM duckdb_tables() WHERE lower(table_name) = ?", [unqualify(source_table)]
+                ).fetchone()[0] > 0
+            definition["dependencies"] = sorted(self._read_tables(conn, definition["query"]) - {unqualify(view_name)})
+            self._materialize(conn, view_name, definition, incremental=False)
+        self._bump_table_versions([view_name])
+        definition["version"] = self._table_versions.get(unqualify(view_name), 0)
+        self._update_metadata(view_name, "materialized_view", definition["query"], materialized=definition)
+
+    def refresh_materialized_view(self, view_name: str, incremental: bool = True) -> bool:
         """
+        Atualiza uma view materializada. Com incremental=True (e uma view que o
+        admita), apenas as linhas anexadas à fonte desde o último refresh são
+        agregadas e combinadas ao resultado existente; se a fonte tiver perdido
+        linhas (DELETE) ou sido recriada, faz um refresh completo.
+        """
+        definition = self.metadata.get(view_name, {}).get("materialized")
+        if definition is None:
+            print(f"✗ Erro: '{view_name}' não é uma view materializada.")
+            return False
         if not self.conn:
             self.connect()
         if not self.conn:
             return False
-        if not os.path.exists(file_path):
-            print(f"✗ Erro: Arquivo JSON \'{file_path}\' não encontrado.")
+        try:
+            with self.cursor(query_class="batch") as conn:
+                new_rows = self._materialize(conn, view_name, definition, incremental and definition["incremental"])
+            self._bump_table_versions([view_name])
+            definition["version"] = self._table_versions.get(unqualify(view_name), 0)
+            self.metadata.update(view_name, materialized=definition)
+            if definition["refresh_mode"] == "incremental":
+                print(f"✓ View materializada '{view_name}' atualizada incrementalmente ({new_rows} linha(s) nova(s)).")
+            else:
+                print(f"✓ View materializada '{view_name}' recalculada com sucesso.")
+            return True
+        except duckdb.Error as e:
+            print(f"✗ Erro ao atualizar a view materializada '{view_name}' : {e}")
             return False
+
+    def materialized_view_status(self, view_name: str) -> Dict[str, Any]:
+        """
+        Indica se uma view materializada está desatualizada: tabelas de origem
+        alteradas por esta instância desde o último refresh e, para views
+        incrementais, quantas linhas foram anexadas à fonte (por qualquer processo).
+        Retorna um dicionário vazio se a view não existir.
+        """
+        definition = self.metadata.get(view_name, {}).get("materialized")
+        if definition is None:
+            return {}
+        changed = sorted(
+            table for table, version in definition["dependency_versions"].items()
+            if self._table_versions.get(table, 0) != version
+        )
+        pending_rows = None
+        if definition["incremental"]:
+            try:
+                with self.cursor() as conn:
+                    pending_rows = conn.execute(
+                        f"SELECT COUNT(*) FROM {definition['source_table']} WHERE rowid >= ?", [definition["watermark"]]
+                    ).fetchone()[0]
+            except duckdb.Error as e:
+                print(f"✗ Erro ao verificar a view materializada '{view_name}' : {e}")
+        return {
+            "view": view_name,
+            "stale": bool(changed) or bool(pending_rows),
+            "changed_tables": changed,
+            "pending_rows": pending_rows,
+            "refreshed_at": definition["refreshed_at"],
+            "refresh_mode": definition["refresh_mode"],
+            "incremental": definition["incremental"],
+        }
+
+    def _materialize(self, conn: duckdb.DuckDBPyConnection, view_name: str, definition: Dict[str, Any],
+                     incremental: bool) -> int:
+        """
+        Recalcula (ou, se incremental, combina as linhas novas da fonte a) uma view
+        materializada em uma única transação e atualiza a marca d'água (rowid) e
+        as versões das dependências na definição. Retorna o número de linhas novas
+        agregadas no modo incremental.
+
+        O modo incremental só é usado se a fonte for a mesma tabela do último
+        refresh (mesmo oid, que muda quando ela é recriada e a cada conexão, então
+        o primeiro refresh de cada sessão é completo) e ainda tiver todas as
+        linhas abaixo da marca d'água; caso contrário o refresh é completo.
+        """
+        new_rows = 0
+        # Versões lidas antes do refresh: escritas concorrentes deixam a view marcada como desatualizada
+        versions = {table: self._table_versions.get(table, 0) for table in definition["dependencies"]}
+        conn.execute("BEGIN TRANSACTION")
         try:
-            if create_table:
-                self.conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_json_auto(\'{file_path}\')")
-                self._update_metadata(table_name, "table", f"Ingestão de JSON: {file_path}")
-                print(f"✓ Dados importados de \'{file_path}\' para a nova tabela \'{table_name}\' com sucesso.")
+            if definition["incremental"]:
+                source = definition["source_table"]
+                watermark, source_rows = conn.execute(f"SELECT COALESCE(MAX(rowid) + 1, 0), COUNT(*) FROM {source}").fetchone()
+                # O oid muda quando a tabela é recriada (e a cada nova conexão ao arquivo)
+                source_oid = conn.execute(
+                    "SELECT MAX(table_oid) FROM duckdb_tables() WHERE lower(table_name) = ? "
+                    "AND database_name = current_database()", [unqualify(source)],
+                ).fetchone()[0]
+                if incremental:
+                    kept = conn.execute(f"SELECT COUNT(*) FROM {source} WHERE rowid < ?", [definition["watermark"]]).fetchone()[0]
+                    incremental = (source_oid is not None and source_oid == definition.get("source_oid")
+                                   and kept == definition["source_rows"])
+            if incremental:
+                new_rows = source_rows - definition["source_rows"]
+                if new_rows:
+                    delta = build_aggregate_query(source, definition["group_by"], definition["aggregates"],
+                                                  where=f"rowid >= {definition['watermark']}")
+                    merge = build_merge_query(view_name, delta, definition["group_by"],
+                                              parse_aggregates(conn, definition["aggregates"]))
+                    conn.execute(f"CREATE OR REPLACE TABLE {view_name} AS {merge}")
             else:
-                self.conn.execute(f"INSERT INTO {table_name} SELECT * FROM read_json_auto(\'{file_path}\')")
-                print(f"✓ Dados inseridos de \'{file_path}\' na tabela existente \'{table_name}\' com sucesso.")
+                conn.execute(f"CREATE OR REPLACE TABLE {view_name} AS {definition['query']}")
+            conn.execute("COMMIT")
+        except duckdb.Error:
+            conn.execute("ROLLBACK")
+            raise
+        if definition["incremental"]:
+            definition.update(watermark=watermark, source_rows=source_rows, source_oid=source_oid)
+        definition.update(
+            refreshed_at=datetime.now().isoformat(),
+            refresh_mode="incremental" if incremental else "full",
+            dependency_versions=versions,
+        )
+        return new_rows
+
+    def create_rollup(self, rollup_name: str, source_table: str, dimensions: Sequence[str],
+                      measures: Union[Sequence[str], Mapping[str, str]]) -> bool:
+        """
+        Cria um rollup: uma view materializada incremental com source_table
+        agregada pelas colunas de dimensions (ex.: ["category", "city",
+        "sale_date"]). measures é uma lista de colunas numéricas (gera
+        sum_<coluna> e count_<coluna>) ou {"total": "SUM(amount)", ...} com
+        agregados SUM, COUNT, MIN ou MAX; COUNT(*) é sempre incluído.
+
+        fetch_data e fetch_arrow passam a ler do menor rollup atualizado as
+        consultas de agregação sobre source_table que usam apenas dimensões
+        do rollup fora dos agregados e apenas SUM, COUNT, AVG, MIN e MAX
+        cobertos pelas medidas; as ingestões em source_table atualizam os seus
+        rollups incrementalmente. Somas de colunas DOUBLE podem diferir da
+        consulta original nas últimas casas decimais.
+        """
+        invalid = [dimension for dimension in dimensions if not is_identifier(dimension)]
+        if invalid:
+            print(f"✗ Erro: as dimensões do rollup '{rollup_name}' devem ser nomes de colunas: {invalid}")
+            return False
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return False
+        aggregates = rollup_measures(measures)
+        definition: Dict[str, Any] = {
+            "query": build_aggregate_query(source_table, list(dimensions), aggregates),
+            "incremental": False,
+            "source_table": source_table,
+            "group_by": list(dimensions),
+            "aggregates": aggregates,
+            "rollup": True,
+        }
+        try:
+            rollups = self._rollup_definitions()
+            self._create_materialized_view(rollup_name, definition)
+            rollups[rollup_name] = definition
+            self._rollup_routes.clear()
+            print(f"✓ Rollup '{rollup_name}' de '{source_table}' por ({', '.join(dimensions)}) criado com sucesso.")
             return True
         except duckdb.Error as e:
-            print(f"✗ Erro ao ingerir JSON para \'{table_name}\' de \'{file_path}\' : {e}")
+            print(f"✗ Erro ao criar o rollup '{rollup_name}' : {e}")
             return False
 
-    def create_view(self, view_name: str, query: str) -> bool:
+    def list_rollups(self) -> Dict[str, Dict[str, Any]]:
         """
-        Cria uma view a partir de uma query.
+        Rollups existentes: tabela de origem, dimensões, medidas, se estão
+        atualizados, quantas consultas foram encaminhadas a cada um e o último
+        refresh.
+        """
+        try:
+            rollups = self._rollup_definitions()
+        except duckdb.Error as e:
+            print(f"✗ Erro ao listar os rollups: {e}")
+            return {}
+        return {
+            name: {
+                "source_table": definition["source_table"],
+                "dimensions": list(definition["group_by"]),
+                "measures": dict(definition["aggregates"]),
+                "fresh": self._rollup_is_fresh(name, definition),
+                "routed_queries": self._rollup_hits.get(name, 0),
+                "refreshed_at": definition.get("refreshed_at"),
+            }
+            for name, definition in rollups.items()
+        }
+
+    def rollup_for(self, query: str, params: Optional[Params] = None) -> Dict[str, Any]:
+        """
+        Rollup e SQL reescrito que fetch_data usaria para a query, ou {} se ela
+        for lida da tabela original.
+        """
+        for name, rewritten in self._rollup_routes_for(query, params):
+            if self._rollup_is_fresh(name, self._rollups.get(name)):
+                return {"rollup": name, "query": rewritten}
+        return {}
+
+    def _route_query(self, query: str, params: Optional[Params]) -> str:
+        """A query reescrita para o menor rollup atualizado que a responde, ou a própria query."""
+        if not self.rollup_routing:
+            return query
+        route = self.rollup_for(query, params)
+        if not route:
+            return query
+        self._rollup_hits[route["rollup"]] = self._rollup_hits.get(route["rollup"], 0) + 1
+        return route["query"]
+
+    def _rollup_routes_for(self, query: str, params: Optional[Params]) -> List[Tuple[str, str]]:
+        """
+        Reescritas da query para cada rollup compatível, do menor para o maior,
+        calculadas uma vez por SQL normalizado (e descartadas a cada escrita).
+        """
+        try:
+            rollups = self._rollup_definitions()
+        except duckdb.Error:
+            return []
+        if not rollups:
+            return []
+        normalized = normalize_sql(query)
+        routes = self._rollup_routes.get(normalized)
+        if routes is not None:
+            return routes
+        routes = []
+        try:
+            with self.cursor() as conn:
+                tree = parse_select(conn, query)
+                tables = extract_read_tables(tree) if tree is not None else set()
+                candidates = [name for name, definition in rollups.items()
+                              if len(tables) == 1 and unqualify(definition["source_table"]) in tables]
+                if candidates:
+                    if self._aggregate_functions is None:
+                        self._aggregate_functions = aggregate_functions(conn)
+                    output_names = [row[0] for row in conn.execute(f"DESCRIBE {query}", params).fetchall()]
+                    sizes = dict(conn.execute(
+                        "SELECT lower(table_name), estimated_size FROM duckdb_tables() WHERE list_contains(?, lower(table_name))",
+                        [[unqualify(name) for name in candidates]],
+                    ).fetchall())
+                    for name in sorted(candidates, key=lambda name: sizes.get(unqualify(name), float("inf"))):
+                        definition = rollups[name]
+                        rewritten = rewrite_for_rollup(
+                            conn, tree, definition["source_table"], name, definition["group_by"],
+                            index_measures(conn, definition["aggregates"]), output_names, self._aggregate_functions,
+                        )
+                        if rewritten is not None:
+                            routes.append((name, rewritten))
+        except duckdb.Error:
+            routes = []
+        if len(self._rollup_routes) >= 4096:
+            self._rollup_routes.clear()
+        self._rollup_routes[normalized] = routes
+        return routes
+
+    def _rollup_definitions(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Definições dos rollups do catálogo, carregadas uma vez por conexão. Um
+        rollup incremental de uma sessão anterior cuja fonte não mudou desde o
+        último refresh (mesma marca d'água e contagem de linhas) é considerado
+        atualizado; os demais só são usados depois de um refresh.
+        """
+        if self._rollups is not None:
+            return self._rollups
+        rollups = {name: definition for name, definition in self.metadata.find("materialized").items()
+                   if definition.get("rollup")}
+        with self.cursor() as conn:
+            for name, definition in rollups.items():
+                # As versões gravadas são de outra instância: sem confirmação, o rollup fica desatualizado
+                definition["version"] = None
+                if not definition["incremental"]:
+                    continue
+                try:
+                    watermark, source_rows = conn.execute(
+                        f"SELECT COALESCE(MAX(rowid) + 1, 0), COUNT(*) FROM {definition['source_table']}"
+                    ).fetchone()
+                except duckdb.Error:
+                    continue
+                if (watermark, source_rows) == (definition["watermark"], definition["source_rows"]):
+                    definition["dependency_versions"] = {
+                        table: self._table_versions.get(table, 0) for table in definition["dependencies"]
+                    }
+                    definition["version"] = self._table_versions.get(unqualify(name), 0)
+        self._rollups = rollups
+        return rollups
+
+    def _rollup_is_fresh(self, name: str, definition: Optional[Dict[str, Any]]) -> bool:
+        """Indica se nem o rollup nem suas tabelas de origem foram alterados desde o último refresh."""
+        if definition is None or definition.get("version") != self._table_versions.get(unqualify(name), 0):
+            return False
+        return all(self._table_versions.get(table, 0) == version
+                   for table, version in definition["dependency_versions"].items())
+
+    def _refresh_derived_tables(self, table_name: str, replaced: bool = False):
         """
+        Atualiza o que é derivado de uma tabela que recebeu dados: seus rollups
+        (incrementalmente, quando possível; por completo se a tabela foi
+        substituída, replaced=True) e sua amostra estratificada.
+        """
+        try:
+            rollups = self._rollup_definitions()
+            samples = self._sample_definitions()
+        except duckdb.Error:
+            return
+        for name, definition in list(rollups.items()):
+            if unqualify(definition["source_table"]) == unqualify(table_name):
+                self.refresh_materialized_view(name, incremental=not replaced)
+        sample = samples.get(unqualify(table_name))
+        if sample is not None:
+            self.create_sample(sample["source_table"], sample["strata"], sample["rows_per_stratum"], sample["seed"])
+
+    def _read_tables(self, conn: duckdb.DuckDBPyConnection, query: str) -> Set[str]:
+        """
+        Tabelas lidas por uma query, com views expandidas quando possível.
+        """
+        dependencies = self._resolve_dependencies(query)
+        if dependencies is None:
+            tree = parse_select(conn, query)
+            dependencies = extract_read_tables(tree) if tree else set()
+        return set(dependencies)
+
+    def create_sharded_table(self, table_name: str, shard_paths: Sequence[str], shard_key: Union[str, Sequence[str]],
+                             method: str = "hash", boundaries: Optional[Sequence[Any]] = None) -> bool:
+        """
+        Declara table_name como uma tabela lógica particionada em vários arquivos
+        DuckDB (shard_paths, um por shard), cada um com uma tabela de mesmo nome.
+        method "hash" distribui as linhas por hash(shard_key) % número de shards;
+        "range" usa boundaries (len(shard_paths) - 1 valores crescentes de uma
+        única coluna shard_key): o shard i recebe boundaries[i-1] <= chave <
+        boundaries[i].
+
+        ingest_sharded roteia as linhas para os shards e table_name passa a ser
+        uma view que une os shards (anexados somente leitura). fetch_data e
+        fetch_arrow executam as consultas sobre table_name em um processo por
+        shard e juntam os resultados (ver sharding.plan_sharded_query); as
+        demais consultas leem a view.
+        """
+        keys = [shard_key] if isinstance(shard_key, str) else list(shard_key)
+        error = None
+        if not is_identifier(table_name) or not keys or not all(is_identifier(key) for key in keys):
+            error = "o nome da tabela e as colunas da chave devem ser identificadores simples"
+        elif method not in SHARD_METHODS:
+            error = f"método de particionamento inválido: {method}. Use um de {SHARD_METHODS}"
+        elif not shard_paths or ":memory:" in shard_paths or len(set(shard_paths)) != len(shard_paths):
+            error = "informe um arquivo distinto para cada shard"
+        elif method == "range" and (len(keys) != 1 or len(boundaries or []) != len(shard_paths) - 1
+                                    or list(boundaries) != sorted(boundaries)):
+            error = "range exige uma única coluna e len(shard_paths) - 1 boundaries crescentes"
+        if error:
+            print(f"✗ Erro ao criar a tabela em shards '{table_name}': {error}")
+            return False
         if not self.conn:
             self.connect()
         if not self.conn:
             return False
+        definition = {
+            "shards": [os.path.abspath(path) for path in shard_paths],
+            "shard_key": keys,
+            "method": method,
+            "boundaries": list(boundaries or []),
+            "rows_per_shard": [0] * len(shard_paths),
+        }
         try:
-            self.conn.execute(f"CREATE OR REPLACE VIEW {view_name} AS {query}")
-            self._update_metadata(view_name, "view", query)
-            print(f"✓ View \'{view_name}\' criada com sucesso.")
+            with self._shard_lock:
+                sharded = self._sharded_definitions()
+                self._close_shard_pools(table_name)
+                with self.cursor() as conn:
+                    self._detach_shards(conn, table_name, sharded.get(table_name))
+                    sharded[table_name] = definition
+                    self._attach_shards(conn, table_name, definition)
+                self._shard_plans.clear()
+            print(f"✓ Tabela '{table_name}' particionada por {method}({', '.join(keys)}) em {len(shard_paths)} shards.")
             return True
         except duckdb.Error as e:
-            print(f"✗ Erro ao criar view \'{view_name}\' : {e}")
+            print(f"✗ Erro ao criar a tabela em shards '{table_name}': {e}")
             return False
 
+    def ingest_sharded(self, table_name: str, source: Any, file_format: Optional[str] = None) -> bool:
+        """
+        Ingere em uma tabela criada com create_sharded_table. source é um ou mais
+        arquivos (CSV, Parquet ou JSON, pelo file_format ou pela extensão) ou um
+        DataFrame/tabela Arrow. As linhas são particionadas em uma única leitura
+        (arquivos Parquet temporários por shard) e gravadas em todos os shards
+        em paralelo, cada um no seu arquivo; o relatório fica em
+        last_ingest_report.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return False
+        start = time.perf_counter()
+        staging = tempfile.mkdtemp(prefix="duckdb_shards_")
+        try:
+            with self._shard_lock:
+                definition = self._sharded_definitions().get(table_name)
+                if definition is None:
+                    print(f"✗ Erro: '{table_name}' não é uma tabela em shards (use create_sharded_table).")
+                    return False
+                shard_count = len(definition["shards"])
+                self._close_shard_pools(table_name)
+                with self.cursor(query_class="batch") as conn:
+                    if isinstance(source, (str, list, tuple)):
+                        paths = [source] if isinstance(source, str) else list(source)
+                        file_format = file_format or next(
+                            (name for name, extensions in _FILE_FORMAT_EXTENSIONS.items()
+                             if paths and paths[0].lower().endswith(extensions)), None
+                        )
+                        if file_format not in _FILE_FORMAT_READERS:
+                            print(f"✗ Erro: formato de arquivo não reconhecido para '{table_name}': {paths[:1]}")
+                            return False
+                        files = _resolve_files(source, _FILE_FORMAT_EXTENSIONS[file_format])
+                        if not files:
+                            print(f"✗ Erro: nenhum arquivo encontrado em {source}")
+                            return False
+                        reader = f"{_FILE_FORMAT_READERS[file_format]}([{', '.join(_sql_string(path) for path in files)}])"
+                    else:
+                        conn.register(_REGISTER_STAGING_VIEW, source)
+                        reader = _REGISTER_STAGING_VIEW
+                    try:
+                        expression = shard_expression(definition["shard_key"], definition["method"], shard_count,
+                                                      definition["boundaries"])
+                        conn.execute(
+                            f"COPY (SELECT *, {expression} AS {SHARD_COLUMN} FROM {reader}) TO {_sql_string(staging)} "
+                            f"(FORMAT parquet, PARTITION_BY ({SHARD_COLUMN}), OVERWRITE true)"
+                        )
+                        schema_file = os.path.join(staging, "schema.parquet")
+                        conn.execute(f"COPY (SELECT * FROM {reader} LIMIT 0) TO {_sql_string(schema_file)} (FORMAT parquet)")
+                    finally:
+                        if reader == _REGISTER_STAGING_VIEW:
+                            conn.unregister(_REGISTER_STAGING_VIEW)
+                    # Os shards são reanexados para escrita só durante a carga
+                    self._detach_shards(conn, table_name, definition)
+                    self._attach_shards(conn, table_name, definition, read_only=False)
+
+                def load(index: int) -> int:
+                    shard = f"{self._shard_alias(table_name, index)}.{table_name}"
+                    files = sorted(glob.glob(os.path.join(staging, f"{SHARD_COLUMN}={index}", "*.parquet")))
+                    cursor = self._new_cursor()
+                    try:
+                        cursor.execute(f"CREATE TABLE IF NOT EXISTS {shard} AS SELECT * FROM read_parquet({_sql_string(schema_file)})")
+                        if not files:
+                            return 0
+                        return cursor.execute(
+                            f"INSERT INTO {shard} BY NAME SELECT * FROM read_parquet([{', '.join(_sql_string(path) for path in files)}], hive_partitioning = false)"
+                        ).fetchone()[0]
+                    finally:
+                        cursor.close()
+
+                try:
+                    with ThreadPoolExecutor(max_workers=shard_count, thread_name_prefix="duckdb-shard") as executor:
+                        inserted = list(executor.map(load, range(shard_count)))
+                finally:
+                    with self.cursor() as conn:
+                        self._detach_shards(conn, table_name, definition)
+                        self._attach_shards(conn, table_name, definition)
+                definition["rows_per_shard"] = [
+                    total + rows for total, rows in zip(definition["rows_per_shard"], inserted)
+                ]
+                self._update_metadata(table_name, "view", f"Tabela em {shard_count} shards", sharded=definition)
+                self._shard_plans.clear()
+            self._bump_table_versions([table_name])
+        except duckdb.Error as e:
+            print(f"✗ Erro ao ingerir na tabela em shards '{table_name}': {e}")
+            return False
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        seconds = time.perf_counter() - start
+        rows = sum(inserted)
+        self.last_ingest_report = {
+            "table": table_name,
+            "rows": rows,
+            "rows_per_shard": inserted,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds > 0 else None,
+        }
+        print(f"✓ {rows} linhas ingeridas em '{table_name}' ({shard_count} shards: {inserted}) em {seconds:.2f}s.")
+        return True
+
+    def ingest_stream(self, file_path: FileSource, table_name: str, file_format: Optional[str] = None,
+                      batch_rows: int = 50_000, flush_interval: float = 1.0, poll_interval: float = 0.2,
+                      start: bool = True) -> TailingIngestor:
+        """
+        Ingestão contínua de arquivos JSONL/CSV que crescem (ver TailingIngestor):
+        só as linhas novas de cada arquivo são lidas, a partir do offset em bytes
+        gravado em __stream_offsets, e gravadas em lotes de batch_rows linhas ou
+        a cada flush_interval segundos. Com start=True a leitura roda em segundo
+        plano até ingestor.stop() ou disconnect(); métricas de atraso e vazão em
+        ingestor.metrics().
+        """
+        ingestor = TailingIngestor(self, file_path, table_name, file_format, batch_rows, flush_interval, poll_interval)
+        if start:
+            ingestor.start()
+            self._ingestors.append(ingestor)
+        return ingestor
+
+    def shard_plan(self, query: str, params: Optional[Params] = None) -> Dict[str, Any]:
+        """
+        Plano que fetch_data usaria para a query: tabela, modo
+        ("partial_aggregate" ou "scatter_gather"), SQL de cada shard e SQL da
+        junção; {} se a query não for executada nos shards.
+        """
+        planned = self._shard_plan_for(query, params)
+        if planned is None:
+            return {}
+        table_name, plan = planned
+        return {"table": table_name, **plan}
+
+    def _sharded_definitions(self) -> Dict[str, Dict[str, Any]]:
+        """Definições das tabelas em shards do catálogo, com os shards anexados (uma vez por conexão)."""
+        with self._shard_lock:
+            if self._sharded is not None:
+                return self._sharded
+            sharded = dict(self.metadata.find("sharded"))
+            with self.cursor() as conn:
+                for name, definition in sharded.items():
+                    try:
+                        self._attach_shards(conn, name, definition)
+                    except duckdb.Error as e:
+                        print(f"✗ Erro ao anexar os shards de '{name}': {e}")
+            self._sharded = sharded
+            return sharded
+
+    @staticmethod
+    def _shard_alias(table_name: str, index: int) -> str:
+        return f"__shard_{table_name.lower()}_{index}"
+
+    def _attach_shards(self, conn: duckdb.DuckDBPyConnection, table_name: str, definition: Dict[str, Any],
+                       read_only: bool = True):
+        """
+        Anexa os arquivos dos shards e, se todos já têm a tabela, (re)cria a
+        view table_name que os une. Em modo somente leitura, shards ainda sem
+        arquivo ficam de fora (são criados na primeira ingestão).
+        """
+        if read_only and not all(os.path.exists(path) for path in definition["shards"]):
+            return
+        aliases = []
+        for index, path in enumerate(definition["shards"]):
+            alias = self._shard_alias(table_name, index)
+            conn.execute(f"ATTACH {_sql_string(path)} AS {alias}{' (READ_ONLY)' if read_only else ''}")
+            aliases.append(alias)
+        present = conn.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE list_contains(?, database_name) AND lower(table_name) = ?",
+            [aliases, table_name.lower()],
+        ).fetchone()[0]
+        if read_only and present == len(aliases):
+            union = " UNION ALL ".join(f"SELECT * FROM {alias}.{table_name}" for alias in aliases)
+            conn.execute(f"CREATE OR REPLACE VIEW {table_name} AS {union}")
+
+    def _detach_shards(self, conn: duckdb.DuckDBPyConnection, table_name: str, definition: Optional[Dict[str, Any]]):
+        for index in range(len(definition["shards"]) if definition else 0):
+            conn.execute(f"DETACH DATABASE IF EXISTS {self._shard_alias(table_name, index)}")
+
+    def _close_shard_pools(self, table_name: Optional[str] = None):
+        """Encerra os processos de consulta dos shards (de uma tabela ou de todas)."""
+        with self._shard_lock:
+            names = [table_name] if table_name is not None else list(self._shard_pools)
+            for name in names:
+                for pool in self._shard_pools.pop(name, []):
+                    pool.close()
+
+    def _shard_plan_for(self, query: str, params: Optional[Params]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(tabela, plano) da query sobre uma tabela em shards, calculado uma vez por SQL normalizado."""
+        try:
+            sharded = self._sharded_definitions()
+        except duckdb.Error:
+            return None
+        if not sharded:
+            return None
+        normalized = normalize_sql(query)
+        planned = self._shard_plans.get(normalized, _NOT_CACHED)
+        if planned is not _NOT_CACHED:
+            return planned
+        planned = None
+        try:
+            with self.cursor() as conn:
+                tree = parse_select(conn, query)
+                tables = extract_read_tables(tree) if tree is not None else set()
+                names = [name for name in sharded if unqualify(name) in tables]
+                if len(tables) == 1 and names and all(os.path.exists(path) for path in sharded[names[0]]["shards"]):
+                    if self._aggregate_functions is None:
+                        self._aggregate_functions = aggregate_functions(conn)
+                    output_names = [row[0] for row in conn.execute(f"DESCRIBE {query}", params).fetchall()]
+                    columns = {row[0].lower() for row in conn.execute(f"DESCRIBE {names[0]}").fetchall()}
+                    plan = plan_sharded_query(conn, tree, names[0], columns, output_names, self._aggregate_functions)
+                    planned = (names[0], plan) if plan is not None else None
+        except duckdb.Error:
+            planned = None
+        if len(self._shard_plans) >= 4096:
+            self._shard_plans.clear()
+        self._shard_plans[normalized] = planned
+        return planned
+
+    def _fetch_sharded(self, query: str, params: Optional[Params], convert: Callable[[duckdb.DuckDBPyConnection], Any]) -> Any:
+        """
+        Executa a query nos shards (um processo por shard) e junta os resultados
+        com convert, ou retorna None se ela não tiver plano em shards ou se um
+        shard falhar (a query então roda sobre a view que une os shards).
+        """
+        planned = self._shard_plan_for(query, params)
+        if planned is None:
+            return None
+        table_name, plan = planned
+        with self._shard_lock:
+            pools = self._shard_pools.get(table_name)
+            if pools is None:
+                shards = self._sharded[table_name]["shards"]
+                threads = max(1, (os.cpu_count() or 1) // len(shards))
+                pools = [ProcessPoolAnalytics(path, max_workers=1, threads_per_worker=threads) for path in shards]
+                self._shard_pools[table_name] = pools
+        shard_params = params if plan["shard_params"] else None
+        futures = [pool.submit(plan["shard_query"], shard_params, as_arrow=True) for pool in pools]
+        results = [future.result() for future in futures]
+        if any(result.num_columns == 0 for result in results):
+            return None
+        partials = pa.concat_tables(results)
+        with self.cursor() as conn:
+            conn.register(PARTIALS_TABLE, partials)
+            try:
+                return convert(conn.execute(plan["merge_query"]))
+            finally:
+                conn.unregister(PARTIALS_TABLE)
+
     def export_to_csv(self, query: str, output_file: str) -> bool:
         """
         Exporta os resultados de uma query para um arquivo CSV.
@@ -193,16 +1814,101 @@ class DuckDBAnalytics:
         if not self.conn:
             return False
         try:
-            self.conn.execute(f"COPY ({query}) TO \'{output_file}\' (HEADER, DELIMITER \',\')")
-            print(f"✓ Dados exportados para \'{output_file}\' com sucesso.")
-            return True
+            with self.cursor(query_class="batch") as conn:
+                conn.execute(f"COPY ({query}) TO \'{output_file}\' (HEADER, DELIMITER \',\')")
+                print(f"✓ Dados exportados para \'{output_file}\' com sucesso.")
+                return True
         except duckdb.Error as e:
             print(f"✗ Erro ao exportar para CSV: {e}")
             return False
 
-    def run_sql_script(self, script_path: str) -> bool:
+    def export_to_parquet(self, query: str, output_path: str, compression: str = "zstd",
+                          compression_level: Optional[int] = None, row_group_size: Optional[int] = None,
+                          partition_by: Optional[Sequence[str]] = None, per_thread_output: bool = False,
+                          overwrite: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Exporta os resultados de uma query para Parquet com o codec (snappy, zstd,
+        gzip, lz4, brotli ou uncompressed) e o tamanho de row group informados.
+        Com partition_by, output_path é um diretório com partições hive
+        (`coluna=valor/`); com per_thread_output, cada thread escreve o próprio
+        arquivo no diretório output_path, o que maximiza a vazão de escrita (o
+        DuckDB não permite combinar as duas opções).
+        Retorna as estatísticas por arquivo (linhas, bytes, partição) e a vazão,
+        ou None em caso de erro.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return None
+        options = ["FORMAT parquet", f"COMPRESSION {compression}", "RETURN_STATS"]
+        if compression_level is not None:
+            options.append(f"COMPRESSION_LEVEL {compression_level}")
+        if row_group_size is not None:
+            options.append(f"ROW_GROUP_SIZE {row_group_size}")
+        if partition_by:
+            options.append(f"PARTITION_BY ({', '.join(partition_by)})")
+        if per_thread_output:
+            options.append("PER_THREAD_OUTPUT true")
+        if overwrite and (partition_by or per_thread_output):
+            options.append("OVERWRITE true")
+        start = time.perf_counter()
+        try:
+            with self.cursor(query_class="batch") as conn:
+                rows = conn.execute(f"COPY ({query}) TO {_sql_string(output_path)} ({', '.join(options)})").fetchall()
+                files = [
+                    {"path": path, "rows": count, "bytes": size, "partition": dict(partition or {})}
+                    for path, count, size, _, _, partition in rows
+                ]
+                report = _export_report(output_path, files, time.perf_counter() - start)
+                print(f"✓ {report['total_rows']} linhas exportadas para '{output_path}' ({report['file_count']} arquivo(s) Parquet) com sucesso.")
+                return report
+        except duckdb.Error as e:
+            print(f"✗ Erro ao exportar para Parquet: {e}")
+            return None
+
+    def export_to_arrow_ipc(self, query: str, output_file: str, compression: Optional[str] = None,
+                            batch_size: int = 1_000_000) -> Optional[Dict[str, Any]]:
+        """
+        Exporta os resultados de uma query para um arquivo Arrow IPC (Feather v2),
+        formato sem conversão de tipos e de leitura quase imediata, próprio para
+        entregar dados a outro processo local. O resultado é escrito em lotes de
+        até batch_size linhas, sem materializá-lo por inteiro na memória.
+        compression pode ser None, "lz4" ou "zstd".
+        Retorna as mesmas estatísticas de export_to_parquet, ou None em caso de erro.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return None
+        start = time.perf_counter()
+        try:
+            with self.cursor(query_class="batch") as conn:
+                reader = _to_arrow_reader(conn.execute(query), batch_size)
+                options = pa.ipc.IpcWriteOptions(compression=compression)
+                rows = 0
+                with pa.OSFile(output_file, "wb") as sink, pa.ipc.new_file(sink, reader.schema, options=options) as writer:
+                    for batch in reader:
+                        writer.write_batch(batch)
+                        rows += batch.num_rows
+                files = [{"path": output_file, "rows": rows, "bytes": os.path.getsize(output_file), "partition": {}}]
+                report = _export_report(output_file, files, time.perf_counter() - start)
+                print(f"✓ {rows} linhas exportadas para '{output_file}' (Arrow IPC) com sucesso.")
+                return report
+        except (duckdb.Error, pa.ArrowException, OSError) as e:
+            print(f"✗ Erro ao exportar para Arrow IPC: {e}")
+            return None
+
+    def run_sql_script(self, script_path: str, max_workers: Optional[int] = None, resume: bool = False) -> bool:
         """
         Executa um script SQL contendo múltiplos comandos.
+        As instruções seguem um DAG de dependências entre tabelas: as
+        independentes rodam em paralelo em cursores separados (até max_workers;
+        padrão: número de CPUs) e a falha de uma bloqueia apenas as que dependem
+        dela. Scripts com comandos de sessão (SET, BEGIN/COMMIT, PRAGMA...) rodam
+        em sequência em um único cursor, parando na primeira falha.
+        O tempo e o erro de cada instrução ficam em self.last_script_report e no
+        ledger __script_ledger; com resume=True, as instruções concluídas na
+        execução anterior do script (com o mesmo texto) não são repetidas.
         """
         if not self.conn:
             self.connect()
@@ -211,16 +1917,130 @@ class DuckDBAnalytics:
         if not os.path.exists(script_path):
             print(f"✗ Erro: Arquivo de script SQL \'{script_path}\' não encontrado.")
             return False
+        with open(script_path, 'r') as f:
+            sql_script = f.read()
+        script_key = os.path.abspath(script_path)
+        start = time.perf_counter()
         try:
-            with open(script_path, 'r') as f:
-                sql_script = f.read()
-            self.conn.execute(sql_script)
-            print(f"✓ Script SQL \'{script_path}\' executado com sucesso.")
-            return True
+            with self.cursor() as conn:
+                plan = plan_script(conn, sql_script)
+                completed = self._script_ledger(conn, script_key, plan, resume)
         except duckdb.Error as e:
             print(f"✗ Erro ao executar script SQL: {e}")
             return False
 
+        sequential = any(statement["session"] for statement in plan)
+        if sequential:
+            # Transações e configurações valem para a conexão: tudo em um cursor, em ordem
+            for statement in plan[1:]:
+                statement["depends_on"] = [statement["index"] - 1]
+            workers = 1
+            session_cursor = self._new_cursor()
+            execute = session_cursor.execute
+        else:
+            workers = max_workers or os.cpu_count() or 1
+            session_cursor = None
+
+            def execute(sql: str):
+                cursor = self._new_cursor()
+                try:
+                    cursor.execute(sql)
+                finally:
+                    cursor.close()
+
+        hashes = {statement["index"]: hashlib.sha256(statement["sql"].encode()).hexdigest() for statement in plan}
+
+        def record(result: Dict[str, Any]):
+            if result["status"] == "resumed":
+                return
+            if result["status"] == "ok":
+                self._invalidate_written_tables(result["sql"])
+            elif result["status"] == "failed":
+                print(f"✗ Instrução {result['index'] + 1} falhou: {result['error']}")
+            try:
+                with self.cursor() as conn:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {_SCRIPT_LEDGER_TABLE} VALUES (?, ?, ?, ?, ?, ?, now()::TIMESTAMP)",
+                        [script_key, result["index"], hashes[result["index"]], result["status"],
+                         result["seconds"], result["error"]],
+                    )
+            except duckdb.Error:
+                # Sem o registro, a instrução apenas é repetida em um resume
+                pass
+
+        try:
+            with self._admission("batch"):
+                results = run_plan(plan, execute, workers, completed, on_finish=record)
+        except duckdb.Error as e:
+            print(f"✗ Erro ao executar script SQL: {e}")
+            return False
+        finally:
+            if session_cursor is not None:
+                session_cursor.close()
+        if sequential and any(result["status"] == "failed" for result in results):
+            # Instruções de uma transação não confirmada foram desfeitas ao fechar o cursor
+            open_transaction = None
+            for statement, result in zip(plan, results):
+                if result["status"] == "failed":
+                    break
+                if statement["type"] == "TRANSACTION":
+                    keyword = statement["sql"].split(None, 1)[0].upper()
+                    open_transaction = statement["index"] if keyword in ("BEGIN", "START") else None
+            if open_transaction is not None:
+                with self.cursor() as conn:
+                    conn.execute(
+                        f"DELETE FROM {_SCRIPT_LEDGER_TABLE} WHERE script_path = ? AND statement_index >= ?",
+                        [script_key, open_transaction],
+                    )
+
+        for statement, result in zip(plan, results):
+            result.update(type=statement["type"], depends_on=statement["depends_on"])
+        counts = {status: sum(result["status"] == status for result in results)
+                  for status in ("ok", "failed", "blocked", "resumed")}
+        seconds = time.perf_counter() - start
+        self.last_script_report = {
+            "script": script_path,
+            "statements": results,
+            "max_workers": workers,
+            "seconds": seconds,
+            **counts,
+        }
+        if counts["failed"] or counts["blocked"]:
+            print(f"✗ Script SQL \'{script_path}\': {counts['failed']} instrução(ões) com erro e "
+                  f"{counts['blocked']} bloqueada(s); use resume=True para continuar após corrigir.")
+            return False
+        print(f"✓ Script SQL \'{script_path}\' executado com sucesso "
+              f"({len(results)} instruções em {seconds:.2f}s, até {workers} em paralelo).")
+        return True
+
+    def _script_ledger(self, conn: duckdb.DuckDBPyConnection, script_key: str,
+                       plan: List[Dict[str, Any]], resume: bool) -> Set[int]:
+        """
+        Prepara o ledger do script e retorna as instruções que podem ser puladas:
+        concluídas na execução anterior, com o mesmo texto, e cujas dependências
+        também foram puladas. Sem resume, o histórico do script é descartado.
+        """
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {_SCRIPT_LEDGER_TABLE} (
+                script_path VARCHAR, statement_index INTEGER, statement_hash VARCHAR, status VARCHAR,
+                seconds DOUBLE, error VARCHAR, finished_at TIMESTAMP,
+                PRIMARY KEY (script_path, statement_index)
+            )
+        """)
+        if not resume:
+            conn.execute(f"DELETE FROM {_SCRIPT_LEDGER_TABLE} WHERE script_path = ?", [script_key])
+            return set()
+        done = dict(conn.execute(
+            f"SELECT statement_index, statement_hash FROM {_SCRIPT_LEDGER_TABLE} WHERE script_path = ? AND status = 'ok'",
+            [script_key],
+        ).fetchall())
+        completed: Set[int] = set()
+        for statement in plan:
+            if (done.get(statement["index"]) == hashlib.sha256(statement["sql"].encode()).hexdigest()
+                    and all(dependency in completed for dependency in statement["depends_on"])):
+                completed.add(statement["index"])
+        return completed
+
     def vacuum_database(self) -> bool:
         """
         Otimiza o banco de dados DuckDB, recuperando espaço e melhorando a performance.
@@ -230,44 +2050,345 @@ class DuckDBAnalytics:
         if not self.conn:
             return False
         try:
-            self.conn.execute("VACUUM;")
-            print("✓ Banco de dados DuckDB otimizado (VACUUM) com sucesso.")
-            return True
+            with self.cursor(query_class="batch") as conn:
+                conn.execute("VACUUM;")
+                print("✓ Banco de dados DuckDB otimizado (VACUUM) com sucesso.")
+                return True
         except duckdb.Error as e:
             print(f"✗ Erro ao otimizar banco de dados: {e}")
             return False
 
+    def recluster_table(self, table_name: str, cluster_by: Sequence[str]) -> bool:
+        """
+        Regrava uma tabela existente ordenada pelas colunas de cluster_by e
+        atualiza suas estatísticas (ANALYZE), para que filtros por faixa nessas
+        colunas pulem row groups. Tabelas com restrições (PRIMARY KEY, UNIQUE,
+        CHECK...) são regravadas no lugar, preservando a definição.
+        Rollups e amostras da tabela são recalculados em seguida.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return False
+        order_by = ", ".join(cluster_by)
+        try:
+            with self.cursor(query_class="batch") as conn:
+                constrained = conn.execute(
+                    "SELECT COUNT(*) FROM duckdb_constraints() WHERE table_name = ? AND constraint_type <> 'NOT NULL'",
+                    [table_name],
+                ).fetchone()[0]
+                conn.execute("BEGIN TRANSACTION")
+                try:
+                    if constrained:
+                        conn.execute(f"CREATE OR REPLACE TEMP TABLE __recluster_staging AS SELECT * FROM {table_name} ORDER BY {order_by}")
+                        conn.execute(f"DELETE FROM {table_name}")
+                        conn.execute(f"INSERT INTO {table_name} SELECT * FROM __recluster_staging")
+                        conn.execute("DROP TABLE __recluster_staging")
+                    else:
+                        conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {table_name} ORDER BY {order_by}")
+                    conn.execute("COMMIT")
+                except duckdb.Error:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute(f"ANALYZE {table_name}")
+                self._bump_table_versions([table_name])
+                self.metadata.update(table_name, cluster_by=list(cluster_by))
+                print(f"✓ Tabela \'{table_name}\' reordenada por {order_by}.")
+        except duckdb.Error as e:
+            print(f"✗ Erro ao reordenar a tabela \'{table_name}\': {e}")
+            return False
+        # A tabela foi regravada com novos rowids: derivados são recalculados por completo
+        self._refresh_derived_tables(table_name, replaced=True)
+        return True
+
+    def analyze_table(self, table_name: Optional[str] = None) -> bool:
+        """
+        Atualiza as estatísticas usadas pelo otimizador (ANALYZE) de uma tabela
+        ou, sem table_name, de todo o banco.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return False
+        try:
+            with self.cursor(query_class="batch") as conn:
+                conn.execute(f"ANALYZE {table_name}" if table_name else "ANALYZE")
+                print(f"✓ Estatísticas de \'{table_name or self.db_path}\' atualizadas (ANALYZE).")
+                return True
+        except duckdb.Error as e:
+            print(f"✗ Erro ao atualizar estatísticas: {e}")
+            return False
+
+    def pruning_report(self, table_name: str, predicate: str) -> Dict[str, Any]:
+        """
+        Mede quanto da tabela um filtro (ex.: "sale_date BETWEEN '2025-03-01'
+        AND '2025-03-31'") realmente lê: executa SELECT COUNT(*) com o filtro sob
+        profiling e retorna total_rows, matching_rows, rows_scanned (após o
+        descarte de row groups pelos zone maps min/max), scanned_fraction,
+        row_groups e row_groups_scanned (estimado pelas linhas lidas).
+        Compare o relatório antes e depois de recluster_table. Retorna {} em caso de erro.
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return {}
+        try:
+            with self._admission():
+                cursor = self._new_cursor()
+                try:
+                    total_rows = cursor.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+                    row_groups, row_group_rows = cursor.execute("""
+                        SELECT COUNT(*), MAX(rows) FROM (
+                            SELECT row_group_id, SUM(count) AS rows FROM pragma_storage_info(?)
+                            WHERE column_path = '[0]' GROUP BY row_group_id
+                        )
+                    """, [table_name]).fetchone()
+                    enable_connection_profiling(cursor)
+                    matching_rows = cursor.execute(f"SELECT COUNT(*) FROM {table_name} WHERE {predicate}").fetchone()[0]
+                    profile = parse_profile(cursor.get_profiling_information(format="json"))
+                finally:
+                    cursor.close()
+        except duckdb.Error as e:
+            print(f"✗ Erro ao medir o descarte de row groups em \'{table_name}\': {e}")
+            return {}
+        rows_scanned = sum(
+            operator["rows_scanned"] for operator in iter_operators(profile["plan"])
+            if operator["type"] == "TABLE_SCAN"
+        )
+        return {
+            "table": table_name,
+            "predicate": predicate,
+            "total_rows": total_rows,
+            "matching_rows": matching_rows,
+            "rows_scanned": rows_scanned,
+            "scanned_fraction": rows_scanned / total_rows if total_rows else 0.0,
+            "row_groups": row_groups,
+            "row_groups_scanned": min(row_groups, -(-rows_scanned // row_group_rows)) if row_group_rows else 0,
+            "cluster_by": (self.metadata.get(table_name) or {}).get("cluster_by"),
+        }
+
     def get_table_schema(self, table_name: str) -> List[Tuple[str, str]]:
         """
-        Retorna o esquema de uma tabela ou view.
+        Retorna o esquema de uma tabela ou view, do cache do catálogo quando
+        o objeto é gerenciado.
         """
         if not self.conn:
             self.connect()
         if not self.conn:
             return []
         try:
-            schema_df = self.conn.execute(f"PRAGMA table_info(\'{table_name}\')").fetchdf()
-            return [(row["name"], row["type"]) for index, row in schema_df.iterrows()]
+            cached = self.metadata.schema(table_name)
+            if cached is not None:
+                return cached
+            with self.cursor() as conn:
+                return [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info(\'{table_name}\')").fetchall()]
         except duckdb.Error as e:
             print(f"✗ Erro ao obter esquema da tabela/view \'{table_name}\' : {e}")
             return []
 
-    def _update_metadata(self, name: str, obj_type: str, source: str):
+    def _update_metadata(self, name: str, obj_type: str, source: str, **details: Any):
         """
-        Atualiza os metadados de uma tabela ou view.
+        Atualiza os metadados de uma tabela ou view no catálogo persistente.
+        O esquema e as estatísticas são calculados apenas quando lidos.
         """
-        self.metadata[name] = {
-            "type": obj_type,
-            "created_at": datetime.now().isoformat(),
-            "source": source,
-            "schema": self.get_table_schema(name)
-        }
+        self.metadata.record(name, obj_type, source, **details)
 
     def list_metadata(self) -> Dict[str, Dict[str, Any]]:
         """
-        Lista todos os metadados de tabelas e views gerenciadas.
+        Lista todos os metadados de tabelas e views gerenciadas, lidos do catálogo
+        persistente (__analytics_catalog). Esquemas e estatísticas ainda não
+        calculados são obtidos em lote e guardados no catálogo.
+        """
+        return self.metadata.snapshot()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas do cache de resultados (vazio se o cache estiver desabilitado).
+        """
+        return self.cache.stats() if self.cache else {}
+
+    def clear_cache(self):
+        """
+        Remove todas as entradas do cache de resultados.
+        """
+        if self.cache:
+            self.cache.clear()
+
+    def set_profiling(self, enabled: bool):
+        """
+        Ativa ou desativa a captura de profiling (plano, tempo, cardinalidade e
+        memória por operador) das queries de execute_query, fetch_data e
+        fetch_arrow em todas as conexões. Os perfis já capturados são mantidos.
+        """
+        self.profiling = enabled
+        if not self.conn:
+            return
+        for conn in self._connections():
+            (enable_connection_profiling if enabled else disable_connection_profiling)(conn)
+
+    def query_profiles(self) -> List[Dict[str, Any]]:
+        """
+        Perfis das últimas queries executadas com profiling ativo, do mais antigo
+        ao mais recente (no máximo max_profiles).
         """
-        return self.metadata
+        return self.profiler.profiles()
+
+    def slowest_operators(self, limit: int = 10, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Operadores mais lentos entre os perfis capturados (ou apenas os da query
+        informada), com tempo, cardinalidade, memória e a query de origem.
+        """
+        return self.profiler.slowest_operators(limit, query)
+
+    def query_plan(self, query: Optional[str] = None, as_text: bool = False) -> Any:
+        """
+        Árvore de operadores do perfil mais recente (ou do mais recente da query
+        informada); com as_text=True, uma representação indentada. Retorna None
+        se não houver perfil.
+        """
+        profiles = [p for p in self.query_profiles() if query is None or p["query"] == query]
+        if not profiles:
+            return None
+        plan = profiles[-1]["plan"]
+        return format_plan(plan) if as_text else plan
+
+    def explain_analyze(self, query: str) -> str:
+        """
+        Executa EXPLAIN ANALYZE e retorna o plano com métricas reais em texto
+        (string vazia em caso de erro).
+        """
+        if not self.conn:
+            self.connect()
+        if not self.conn:
+            return ""
+        try:
+            with self.cursor() as conn:
+                return conn.execute(f"EXPLAIN ANALYZE {query}").fetchall()[0][1]
+        except duckdb.Error as e:
+            print(f"✗ Erro ao executar EXPLAIN ANALYZE: {e}")
+            return ""
+        finally:
+            self._invalidate_written_tables(query)
+
+    def _execute(self, conn: duckdb.DuckDBPyConnection, query: str, params: Optional[Params]) -> duckdb.DuckDBPyConnection:
+        """
+        Executa a query na conexão; queries parametrizadas usam o cache de
+        prepared statements da conexão.
+        """
+        if params is None:
+            return conn.execute(query)
+        prepared = self._prepared.get(id(conn))
+        if prepared is None or prepared.conn is not conn:
+            prepared = self._prepared[id(conn)] = PreparedStatementCache(conn, self.max_prepared_statements)
+        return prepared.execute(query, params)
+
+    def _fetch(self, conn: duckdb.DuckDBPyConnection, query: str, params: Optional[Params],
+               fetch: Callable[[duckdb.DuckDBPyConnection], Any], method: str) -> Any:
+        """
+        Executa a query e converte o resultado com fetch. Com profiling ativo,
+        mede separadamente a execução no DuckDB e a conversão no Python e
+        registra o perfil da query.
+        """
+        if not self.profiling:
+            return fetch(self._execute(conn, query, params))
+        start = time.perf_counter()
+        result = self._execute(conn, query, params)
+        executed = time.perf_counter()
+        value = fetch(result)
+        self.profiler.capture(conn, query, method, executed - start, time.perf_counter() - executed)
+        return value
+
+    def _cache_key(self, kind: str, query: str, params: Optional[Params] = None) -> Optional[Tuple[Hashable, Set[str]]]:
+        """
+        Calcula a chave de cache (tipo de resultado, SQL normalizado, parâmetros e
+        versões das tabelas lidas) e o conjunto de dependências da query. Retorna
+        None se o cache estiver desabilitado ou a query não for um SELECT
+        determinístico com parâmetros hasheáveis.
+        """
+        if self.cache is None:
+            return None
+        if params is not None:
+            params = tuple(sorted(params.items())) if isinstance(params, Mapping) else tuple(params)
+            try:
+                hash(params)
+            except TypeError:
+                return None
+        normalized = normalize_sql(query)
+        # Outra thread pode limpar o dicionário a qualquer momento: usa só o valor local
+        tables = self._query_dependencies.get(normalized, _NOT_CACHED)
+        if tables is _NOT_CACHED:
+            if len(self._query_dependencies) >= 4096:
+                self._query_dependencies.clear()
+            tables = self._query_dependencies[normalized] = self._resolve_dependencies(query)
+        if tables is None:
+            return None
+        versions = tuple(sorted((table, self._table_versions.get(table, 0)) for table in tables))
+        return (kind, normalized, params, versions), tables
+
+    def _resolve_dependencies(self, query: str) -> Optional[Set[str]]:
+        """
+        Tabelas das quais o resultado de um SELECT depende, expandindo views
+        recursivamente até as tabelas base. None se a query não for cacheável.
+        """
+        try:
+            with self.cursor() as conn:
+                tree = parse_select(conn, query)
+                if tree is None or not is_deterministic(tree):
+                    return None
+                resolved: Set[str] = set()
+                pending = list(extract_read_tables(tree))
+                while pending:
+                    name = pending.pop()
+                    if name in resolved:
+                        continue
+                    resolved.add(name)
+                    if name in self._registered:
+                        continue
+                    view = conn.execute("SELECT sql FROM duckdb_views() WHERE lower(view_name) = ? AND NOT internal", [name]).fetchone()
+                    if view:
+                        view_tree = parse_select(conn, view[0].split(" AS ", 1)[1]) if " AS " in view[0] else None
+                        if view_tree is None or not is_deterministic(view_tree):
+                            return None
+                        pending.extend(extract_read_tables(view_tree))
+                return resolved
+        except duckdb.Error:
+            return None
+
+    def _bump_table_versions(self, tables: Iterable[str]):
+        """
+        Incrementa a versão das tabelas alteradas e invalida as entradas de cache dependentes.
+        """
+        tables = {unqualify(table) for table in tables}
+        if not tables:
+            return
+        with self._versions_lock:
+            for table in tables:
+                self._table_versions[table] = self._table_versions.get(table, 0) + 1
+        self._query_dependencies.clear()
+        self._rollup_routes.clear()
+        if self.cache:
+            self.cache.invalidate_tables(tables)
+        self._invalidate_catalog(tables)
+
+    def _invalidate_written_tables(self, query: str):
+        """
+        Invalida o cache das tabelas escritas por uma query arbitrária (INSERT, UPDATE, DDL...)
+        e, para comandos DDL, os esquemas guardados no catálogo.
+        """
+        self._bump_table_versions(extract_written_tables(query))
+        self._invalidate_catalog(extract_ddl_tables(query), schema=True)
+
+    def _invalidate_catalog(self, tables: Set[str], schema: bool = False):
+        """
+        Descarta estatísticas (e esquemas) em cache no catálogo. Falhas são
+        ignoradas: o catálogo é recalculado a partir do banco quando lido.
+        """
+        if not tables or not self.conn:
+            return
+        try:
+            self.metadata.invalidate(tables, schema=schema)
+        except duckdb.Error:
+            pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+"""
+DuckDB Embedded Analytics Engine - API Relacional Preguiçosa
+
+LazyFrame encadeia filtros, projeções, junções, agregações e funções de janela
+sobre relações do DuckDB sem executar nada: cada passo apenas compõe (e valida)
+o plano. Só as operações terminais (to_df, to_arrow, to_parquet, to_csv,
+to_table) executam, e o fazem com uma única query, que o otimizador do DuckDB
+trata como um todo (pushdown de filtros e projeções entre os passos, sem
+tabelas intermediárias).
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Union
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+_JOIN_TYPES = ("inner", "left", "right", "outer", "semi", "anti")
+
+
+class LazyFrame:
+    """
+    Consulta em construção sobre uma instância de DuckDBAnalytics (criada com
+    DuckDBAnalytics.lazy). Os métodos de transformação retornam um novo
+    LazyFrame e lançam duckdb.Error se o passo for inválido (coluna
+    inexistente, expressão malformada); as operações terminais passam pelos
+    métodos de DuckDBAnalytics (cache, agendador, profiling, rollups) e
+    seguem as suas convenções de erro.
+    """
+    def __init__(self, analytics: Any, relation: duckdb.DuckDBPyRelation):
+        self._analytics = analytics
+        self._relation = relation
+
+    def _derive(self, build: Callable[[duckdb.DuckDBPyRelation], duckdb.DuckDBPyRelation]) -> "LazyFrame":
+        with self._analytics._planning_lock:
+            return LazyFrame(self._analytics, build(self._relation))
+
+    # Transformações
+
+    def filter(self, condition: str) -> "LazyFrame":
+        """Mantém as linhas que satisfazem condition (ex.: "amount > 100")."""
+        return self._derive(lambda relation: relation.filter(condition))
+
+    def select(self, *expressions: str) -> "LazyFrame":
+        """Projeta colunas ou expressões (ex.: "category", "amount * 2 AS double_amount")."""
+        return self._derive(lambda relation: relation.project(", ".join(expressions)))
+
+    def with_columns(self, *expressions: str) -> "LazyFrame":
+        """Acrescenta colunas calculadas, mantendo as existentes."""
+        return self._derive(lambda relation: relation.project(", ".join(["*", *expressions])))
+
+    def window(self, *expressions: str) -> "LazyFrame":
+        """
+        Acrescenta funções de janela, ex.: "rank() OVER (PARTITION BY category
+        ORDER BY total DESC) AS position".
+        """
+        return self.with_columns(*expressions)
+
+    def join(self, other: Union["LazyFrame", str], on: Union[str, Sequence[str]], how: str = "inner") -> "LazyFrame":
+        """
+        Junta com outro LazyFrame (ou tabela) por uma condição ("s.id = c.id",
+        usando os nomes dados com alias) ou por colunas de mesmo nome
+        (["customer_id"], equivalente a USING). how: inner, left, right,
+        outer, semi ou anti.
+        """
+        if how not in _JOIN_TYPES:
+            raise ValueError(f"Tipo de junção inválido: {how}. Use um de {_JOIN_TYPES}")
+        if isinstance(other, str):
+            other = self._analytics.lazy(other)
+        if other._analytics is not self._analytics:
+            raise ValueError("Só é possível juntar LazyFrames da mesma instância de DuckDBAnalytics")
+        condition = on if isinstance(on, str) else ", ".join(on)
+        return self._derive(lambda relation: relation.join(other._relation, condition, how=how))
+
+    def aggregate(self, aggregates: Union[Mapping[str, str], Sequence[str]],
+                  group_by: Sequence[str] = ()) -> "LazyFrame":
+        """
+        Agrega por group_by. aggregates é {"total": "SUM(amount)"} ou uma lista
+        de expressões já com alias; as colunas de group_by entram no resultado.
+        """
+        if isinstance(aggregates, Mapping):
+            aggregates = [f"{expression} AS {name}" for name, expression in aggregates.items()]
+        expressions = ", ".join([*group_by, *aggregates])
+        return self._derive(lambda relation: relation.aggregate(expressions, ", ".join(group_by)))
+
+    def order_by(self, *expressions: str) -> "LazyFrame":
+        """Ordena pelas expressões (ex.: "total DESC")."""
+        return self._derive(lambda relation: relation.order(", ".join(expressions)))
+
+    def limit(self, n: int, offset: int = 0) -> "LazyFrame":
+        """Mantém no máximo n linhas, a partir de offset."""
+        return self._derive(lambda relation: relation.limit(n, offset))
+
+    def distinct(self) -> "LazyFrame":
+        """Remove linhas duplicadas."""
+        return self._derive(lambda relation: relation.distinct())
+
+    def alias(self, name: str) -> "LazyFrame":
+        """Nomeia o resultado, para qualificar colunas em condições de junção (ex.: "s.id")."""
+        return self._derive(lambda relation: relation.set_alias(name))
+
+    # Inspeção
+
+    @property
+    def columns(self) -> List[str]:
+        """Nomes das colunas do resultado."""
+        with self._analytics._planning_lock:
+            return list(self._relation.columns)
+
+    @property
+    def types(self) -> Dict[str, str]:
+        """Tipos das colunas do resultado."""
+        with self._analytics._planning_lock:
+            return {name: str(column_type) for name, column_type in zip(self._relation.columns, self._relation.types)}
+
+    def sql(self) -> str:
+        """SQL único que combina todos os passos."""
+        with self._analytics._planning_lock:
+            return self._relation.sql_query()
+
+    def explain(self) -> str:
+        """Plano físico otimizado da query combinada (sem executá-la)."""
+        with self._analytics._planning_lock:
+            return self._relation.explain()
+
+    def __repr__(self) -> str:
+        return f"LazyFrame({', '.join(f'{name} {column_type}' for name, column_type in self.types.items())})"
+
+    # Operações terminais
+
+    def to_df(self) -> pd.DataFrame:
+        """Executa e retorna um DataFrame pandas (ver DuckDBAnalytics.fetch_data)."""
+        return self._analytics.fetch_data(self.sql())
+
+    def to_arrow(self) -> pa.Table:
+        """Executa e retorna uma tabela PyArrow (ver DuckDBAnalytics.fetch_arrow)."""
+        return self._analytics.fetch_arrow(self.sql())
+
+    def to_parquet(self, output_path: str, **options: Any) -> Optional[Dict[str, Any]]:
+        """Executa e grava em Parquet; options como em DuckDBAnalytics.export_to_parquet."""
+        return self._analytics.export_to_parquet(self.sql(), output_path, **options)
+
+    def to_csv(self, output_file: str) -> bool:
+        """Executa e grava em CSV (ver DuckDBAnalytics.export_to_csv)."""
+        return self._analytics.export_to_csv(self.sql(), output_file)
+
+    def to_table(self, table_name: str) -> bool:
+        """Executa e grava o resultado em uma tabela (ver DuckDBAnalytics.create_table_from_query)."""
+        return self._analytics.create_table_from_query(table_name, self.sql())
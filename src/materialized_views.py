@@ -0,0 +1,79 @@
+"""
+DuckDB Embedded Analytics Engine - Views Materializadas
+
+Geração de SQL para views materializadas de agregação (GROUP BY com SUM,
+COUNT, MIN e MAX). Essas funções são decomponíveis: o agregado de uma tabela
+com linhas novas é o agregado do resultado anterior unido ao agregado apenas
+das linhas novas, o que permite o refresh incremental de fontes append-only.
+"""
+
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import duckdb
+
+try:
+    from .sql_utils import parse_expression
+except ImportError:
+    from sql_utils import parse_expression
+
+# Função do agregado na árvore de json_serialize_sql -> agregado decomponível
+_DECOMPOSABLE_FUNCTIONS = {"sum": "SUM", "count": "COUNT", "count_star": "COUNT", "min": "MIN", "max": "MAX"}
+
+# Como combinar o valor parcial de cada agregado com o valor já materializado
+_MERGE_EXPRESSIONS = {
+    "SUM": "SUM({column})",
+    "COUNT": "SUM({column})::BIGINT",
+    "MIN": "MIN({column})",
+    "MAX": "MAX({column})",
+}
+
+
+def parse_aggregates(conn: duckdb.DuckDBPyConnection,
+                     aggregates: Mapping[str, str]) -> Optional[Dict[str, Tuple[str, str]]]:
+    """
+    Mapeia cada coluna de saída para (função, expressão). Retorna None se algum
+    agregado não for uma única chamada a SUM, COUNT, MIN ou MAX sem DISTINCT,
+    FILTER nem ORDER BY (outra função, expressões compostas como
+    MAX(a) - MIN(a)...), caso em que a view só admite refresh completo.
+    """
+    parsed = {}
+    for column, expression in aggregates.items():
+        try:
+            node = parse_expression(conn, expression)
+        except duckdb.Error:
+            return None
+        function = _DECOMPOSABLE_FUNCTIONS.get(node.get("function_name", "").lower()) \
+            if node.get("class") == "FUNCTION" else None
+        if function is None or node.get("distinct") or node.get("filter") is not None \
+                or (node.get("order_bys") or {}).get("orders") or node.get("export_state"):
+            return None
+        parsed[column] = (function, expression)
+    return parsed
+
+
+def build_aggregate_query(source_table: str, group_by: Sequence[str], aggregates: Mapping[str, str],
+                          where: Optional[str] = None) -> str:
+    """SELECT que agrega source_table por group_by, opcionalmente filtrado por where."""
+    select_list = [*group_by, *(f"{expression} AS {column}" for column, expression in aggregates.items())]
+    query = f"SELECT {', '.join(select_list)} FROM {source_table}"
+    if where:
+        query += f" WHERE {where}"
+    return query + " GROUP BY ALL"
+
+
+def build_merge_query(view_name: str, delta_query: str, group_by: Sequence[str],
+                      aggregates: Mapping[str, Tuple[str, str]]) -> str:
+    """
+    SELECT que combina as linhas materializadas de view_name com o agregado
+    parcial produzido por delta_query, grupo a grupo.
+    """
+    select_list = [
+        *group_by,
+        *(f"{_MERGE_EXPRESSIONS[function].format(column=column)} AS {column}"
+          for column, (function, _) in aggregates.items()),
+    ]
+    return (
+        f"SELECT {', '.join(select_list)} "
+        f"FROM (SELECT * FROM {view_name} UNION ALL BY NAME {delta_query}) "
+        f"GROUP BY ALL"
+    )
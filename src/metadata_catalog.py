@@ -0,0 +1,248 @@
+"""
+DuckDB Embedded Analytics Engine - Catálogo de Metadados
+
+Catálogo das tabelas e views gerenciadas, persistido na tabela de sistema
+__analytics_catalog do próprio banco. Ao abrir um banco existente, as entradas
+são lidas com uma única query; esquemas e estatísticas (linhas, bytes) são
+calculados sob demanda, em lote, guardados no catálogo e invalidados quando o
+objeto muda (DDL invalida o esquema; qualquer escrita, as estatísticas).
+"""
+
+import json
+import threading
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import duckdb
+
+CATALOG_TABLE = "__analytics_catalog"
+
+_COLUMNS = ("name", "type", "created_at", "source", "schema", "row_count", "size_bytes", "details")
+_STORAGE_TYPES = ("table", "materialized_view")
+
+
+class MetadataCatalog:
+    """
+    Mapeamento somente leitura nome -> metadados (type, created_at, source,
+    schema, row_count, size_bytes e campos extras como last_ingest), alterado
+    por record, update, remove e invalidate.
+
+    Se o banco estiver em modo somente leitura, o catálogo existente é lido,
+    mas as alterações ficam apenas na memória.
+    """
+    def __init__(self, cursor: Callable[[], AbstractContextManager]):
+        self._cursor = cursor
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+        self.persistent = True
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        entry = self.get(name)
+        if entry is None:
+            raise KeyError(name)
+        return entry
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Metadados de um objeto, com esquema e estatísticas carregados."""
+        # Ordem de aquisição: cursor e depois o lock, como nos métodos que já têm um cursor
+        with self._cursor() as conn, self._lock:
+            if name not in self._load(conn):
+                return default
+            self._load_details(conn, [name])
+            return self._load(conn).get(name, default)
+
+    def __contains__(self, name: object) -> bool:
+        with self._cursor() as conn, self._lock:
+            return name in self._load(conn)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._cursor() as conn, self._lock:
+            return iter(list(self._load(conn)))
+
+    def __len__(self) -> int:
+        with self._cursor() as conn, self._lock:
+            return len(self._load(conn))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Cópia de todas as entradas, calculando em lote os esquemas e estatísticas pendentes."""
+        with self._cursor() as conn, self._lock:
+            self._load_details(conn, list(self._load(conn)))
+            return {name: dict(entry) for name, entry in self._load(conn).items()}
+
+    def schema(self, name: str) -> Optional[List[tuple]]:
+        """Esquema em cache de um objeto do catálogo, ou None se não estiver catalogado."""
+        entry = self.get(name)
+        return entry["schema"] if entry else None
+
+    def find(self, detail: str) -> Dict[str, Any]:
+        """
+        {nome: valor} do campo extra detail (ex.: "materialized") nas entradas
+        que o têm, sem calcular esquemas nem estatísticas.
+        """
+        with self._cursor() as conn, self._lock:
+            return {name: entry[detail] for name, entry in self._load(conn).items() if detail in entry}
+
+    def record(self, name: str, obj_type: str, source: str, **details: Any):
+        """Cria ou substitui a entrada de um objeto; esquema e estatísticas ficam pendentes."""
+        with self._cursor() as conn, self._lock:
+            self._load(conn)[name] = {
+                "type": obj_type,
+                "created_at": datetime.now().isoformat(),
+                "source": source,
+                "schema": None,
+                "row_count": None,
+                "size_bytes": None,
+                **details,
+            }
+            self._persist(conn, [name])
+
+    def update(self, name: str, **details: Any):
+        """Atualiza campos de uma entrada existente."""
+        with self._cursor() as conn, self._lock:
+            entry = self._load(conn).get(name)
+            if entry is not None:
+                entry.update(details)
+                self._persist(conn, [name])
+
+    def remove(self, name: str):
+        """Remove a entrada de um objeto."""
+        with self._cursor() as conn, self._lock:
+            if self._load(conn).pop(name, None) is not None:
+                self._write(conn, f"DELETE FROM {CATALOG_TABLE} WHERE name = ?", [name])
+
+    def invalidate(self, names: Iterable[str], schema: bool = False):
+        """
+        Descarta as estatísticas (e, com schema=True, o esquema) em cache dos
+        objetos informados; serão recalculados na próxima leitura.
+        """
+        lowered = {name.lower() for name in names}
+        if not lowered:
+            return
+        fields = ["row_count", "size_bytes"] + (["schema"] if schema else [])
+        with self._cursor() as conn, self._lock:
+            changed = []
+            for name, entry in self._load(conn).items():
+                if name.lower() in lowered and any(entry[field] is not None for field in fields):
+                    entry.update({field: None for field in fields})
+                    changed.append(name)
+            self._persist(conn, changed)
+
+    def reset(self):
+        """Esquece as entradas em memória (recarregadas na próxima leitura)."""
+        with self._lock:
+            self._entries = None
+            self.persistent = True
+
+    def _load(self, conn: duckdb.DuckDBPyConnection) -> Dict[str, Dict[str, Any]]:
+        """
+        Lê o catálogo do banco na primeira chamada, criando a tabela se preciso e
+        descartando entradas de objetos que não existem mais.
+        """
+        if self._entries is not None:
+            return self._entries
+        try:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} (
+                    name VARCHAR PRIMARY KEY, type VARCHAR, created_at VARCHAR, source VARCHAR,
+                    schema VARCHAR, row_count BIGINT, size_bytes BIGINT, details VARCHAR,
+                    updated_at TIMESTAMP
+                )
+            """)
+        except duckdb.Error:
+            self.persistent = False
+        existing = f"""
+            SELECT lower(table_name) FROM duckdb_tables() WHERE database_name IN (current_database(), 'temp')
+            UNION ALL SELECT lower(view_name) FROM duckdb_views() WHERE database_name IN (current_database(), 'temp')
+        """
+        try:
+            stored = conn.execute(f"SELECT COUNT(*) FROM {CATALOG_TABLE}").fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM {CATALOG_TABLE} WHERE lower(name) IN ({existing})"
+            ).fetchall()
+        except duckdb.Error:
+            stored, rows = 0, []
+        if stored > len(rows):
+            self._write(conn, f"DELETE FROM {CATALOG_TABLE} WHERE lower(name) NOT IN ({existing})", [])
+        self._entries = {}
+        for name, obj_type, created_at, source, schema, row_count, size_bytes, details in rows:
+            self._entries[name] = {
+                "type": obj_type,
+                "created_at": created_at,
+                "source": source,
+                "schema": [tuple(column) for column in json.loads(schema)] if schema else None,
+                "row_count": row_count,
+                "size_bytes": size_bytes,
+                **json.loads(details or "{}"),
+            }
+        return self._entries
+
+    def _load_details(self, conn: duckdb.DuckDBPyConnection, names: List[str]):
+        """
+        Calcula, com uma query para todos os esquemas pendentes e outra para as
+        contagens de linhas, os detalhes ainda não carregados; objetos que
+        deixaram de existir saem do catálogo.
+        """
+        entries = self._load(conn)
+        missing_schema = [name for name in names if entries[name]["schema"] is None]
+        missing_stats = [
+            name for name in names
+            if entries[name]["type"] in _STORAGE_TYPES and entries[name]["row_count"] is None
+        ]
+        if not missing_schema and not missing_stats:
+            return
+        by_lower = {name.lower(): name for name in set(missing_schema) | set(missing_stats)}
+        if missing_schema:
+            schemas = dict(conn.execute("""
+                SELECT lower(table_name), list((column_name, data_type) ORDER BY column_index)
+                FROM duckdb_columns() WHERE list_contains(?, lower(table_name)) AND database_name IN (current_database(), 'temp')
+                GROUP BY 1
+            """, [[name.lower() for name in missing_schema]]).fetchall())
+            for name in missing_schema:
+                schema = schemas.get(name.lower())
+                if schema is None:
+                    entries.pop(name, None)
+                    self._write(conn, f"DELETE FROM {CATALOG_TABLE} WHERE name = ?", [name])
+                else:
+                    entries[name]["schema"] = [tuple(column) for column in schema]
+        missing_stats = [name for name in missing_stats if name in entries]
+        if missing_stats:
+            block_size = conn.execute("SELECT block_size FROM pragma_database_size()").fetchone()[0]
+            for lowered, row_count in conn.execute(
+                "SELECT lower(table_name), estimated_size FROM duckdb_tables() "
+                "WHERE list_contains(?, lower(table_name)) AND database_name IN (current_database(), 'temp')",
+                [[name.lower() for name in missing_stats]],
+            ).fetchall():
+                name = by_lower[lowered]
+                blocks = conn.execute(
+                    "SELECT COUNT(DISTINCT block_id) FROM pragma_storage_info(?) WHERE block_id >= 0", [name]
+                ).fetchone()[0]
+                entries[name]["row_count"] = row_count
+                entries[name]["size_bytes"] = blocks * block_size if blocks else None
+        self._persist(conn, [name for name in by_lower.values() if name in entries])
+
+    def _persist(self, conn: duckdb.DuckDBPyConnection, names: List[str]):
+        for name in names:
+            entry = self._entries[name]
+            details = {key: value for key, value in entry.items() if key not in _COLUMNS}
+            self._write(
+                conn,
+                f"INSERT OR REPLACE INTO {CATALOG_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, now()::TIMESTAMP)",
+                [
+                    name, entry["type"], entry["created_at"], entry["source"],
+                    json.dumps(entry["schema"]) if entry["schema"] is not None else None,
+                    entry["row_count"], entry["size_bytes"], json.dumps(details, default=str),
+                ],
+            )
+
+    def _write(self, conn: duckdb.DuckDBPyConnection, sql: str, params: List[Any]):
+        """
+        Grava no catálogo. Em bancos somente leitura a gravação é ignorada; uma
+        falha pontual também, já que o catálogo é reconstruível a partir do banco.
+        """
+        if not self.persistent:
+            return
+        try:
+            conn.execute(sql, params)
+        except duckdb.Error:
+            pass
@@ -0,0 +1,77 @@
+"""
+DuckDB Embedded Analytics Engine - Cache de Prepared Statements
+
+A API Python do DuckDB analisa novamente o texto de cada chamada a
+execute(sql, params). Este módulo mantém, por conexão, as instruções já
+analisadas (conn.extract_statements) e as reutiliza com o binding nativo de
+parâmetros, evitando o re-parsing de queries executadas repetidamente com
+valores diferentes. O bind e o planejamento continuam a cada execução.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+import duckdb
+
+try:
+    from .sql_utils import normalize_sql
+except ImportError:
+    from sql_utils import normalize_sql
+
+Params = Union[Sequence[Any], Mapping[str, Any]]
+
+
+class PreparedStatementCache:
+    """
+    Instruções analisadas de uma conexão, com evicção LRU acima de
+    max_statements. Uma conexão DuckDB é usada por uma thread de cada vez,
+    mas as estatísticas podem ser lidas de qualquer thread.
+    """
+    def __init__(self, conn: duckdb.DuckDBPyConnection, max_statements: int = 128):
+        self.conn = conn
+        self.max_statements = max_statements
+        self._statements: "OrderedDict[str, duckdb.Statement]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "fallbacks": 0}
+
+    def execute(self, query: str, params: Params) -> duckdb.DuckDBPyConnection:
+        """
+        Executa a query com os parâmetros usando a instrução analisada em cache.
+        Recorre a conn.execute(query, params) quando o texto não contém
+        exatamente uma instrução.
+        """
+        statement = self._statement_for(query)
+        if statement is None:
+            with self._lock:
+                self._stats["fallbacks"] += 1
+            return self.conn.execute(query, params)
+        return self.conn.execute(statement, params)
+
+    def stats(self) -> Dict[str, int]:
+        """Hits, misses, evicções, fallbacks e número de instruções em cache."""
+        with self._lock:
+            return {**self._stats, "statements": len(self._statements)}
+
+    def _statement_for(self, query: str) -> Optional[duckdb.Statement]:
+        key = normalize_sql(query)
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is not None:
+                self._statements.move_to_end(key)
+                self._stats["hits"] += 1
+                return statement
+            self._stats["misses"] += 1
+        try:
+            # O texto original: a forma normalizada serve apenas como chave do cache
+            statements = self.conn.extract_statements(query)
+        except duckdb.Error:
+            return None
+        if len(statements) != 1:
+            return None
+        with self._lock:
+            self._statements[key] = statements[0]
+            while len(self._statements) > self.max_statements:
+                self._statements.popitem(last=False)
+                self._stats["evictions"] += 1
+        return statements[0]
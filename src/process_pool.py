@@ -0,0 +1,146 @@
+"""
+DuckDB Embedded Analytics Engine - Pool de Processos Somente Leitura
+
+Distribui tarefas "query + transformação em Python" entre N processos, cada
+um com sua própria conexão somente leitura ao mesmo arquivo DuckDB. O
+pós-processamento em pandas/Python, limitado pelo GIL em um único
+interpretador, passa a escalar com os núcleos. Resultados tabulares
+(DataFrame ou pa.Table) voltam ao processo principal serializados como Arrow
+IPC, sem pickle por linha; outros valores voltam por pickle.
+
+Os processos são criados com "spawn" (fork de um processo com threads do
+DuckDB ativas não é seguro). A transformação precisa ser serializável por
+pickle (função de módulo, functools.partial, operator.methodcaller...).
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    from .prepared_statements import Params
+except ImportError:
+    from prepared_statements import Params
+
+Task = Union[str, Tuple[str, Optional[Params]]]
+
+# Instância somente leitura do processo de trabalho (DuckDBAnalytics, criada por _init_worker)
+_worker_analytics: Any = None
+
+
+def _init_worker(db_path: str, threads: Optional[int]):
+    global _worker_analytics
+    # Importado aqui porque duckdb_analytics usa este módulo para a execução em shards
+    try:
+        from .duckdb_analytics import DuckDBAnalytics
+    except ImportError:
+        from duckdb_analytics import DuckDBAnalytics
+    _worker_analytics = DuckDBAnalytics(db_path, read_only=True)
+    _worker_analytics.connect()
+    if threads:
+        _worker_analytics.execute_query(f"SET threads = {int(threads)}")
+
+
+def _encode(result: Any) -> Tuple[str, Any]:
+    """Serializa DataFrames e tabelas Arrow como Arrow IPC; outros valores seguem como estão."""
+    if isinstance(result, pd.DataFrame):
+        kind, table = "dataframe", pa.Table.from_pandas(result)
+    elif isinstance(result, pa.Table):
+        kind, table = "arrow", result
+    else:
+        return "object", result
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return kind, sink.getvalue()
+
+
+def _decode(encoded: Tuple[str, Any]) -> Any:
+    kind, payload = encoded
+    if kind == "object":
+        return payload
+    table = pa.ipc.open_stream(payload).read_all()
+    return table.to_pandas() if kind == "dataframe" else table
+
+
+def _run_task(query: str, params: Optional[Params], transform: Optional[Callable[[Any], Any]],
+              as_arrow: bool) -> Tuple[str, Any]:
+    result = _worker_analytics.fetch_arrow(query, params) if as_arrow else _worker_analytics.fetch_data(query, params)
+    return _encode(transform(result) if transform is not None else result)
+
+
+class _DecodedFuture(Future):
+    """Future cujo resultado é o do processo de trabalho já desserializado."""
+
+    def __init__(self, inner: Future):
+        super().__init__()
+        inner.add_done_callback(self._resolve)
+
+    def _resolve(self, inner: Future):
+        try:
+            self.set_result(_decode(inner.result()))
+        except BaseException as e:
+            self.set_exception(e)
+
+
+class ProcessPoolAnalytics:
+    """
+    Pool de max_workers processos (padrão: número de CPUs), cada um com um
+    DuckDBAnalytics somente leitura sobre db_path. Cada tarefa executa
+    fetch_data (ou fetch_arrow, com as_arrow=True) no processo de trabalho,
+    aplica transform ao resultado e devolve o valor transformado.
+
+    O arquivo não pode estar aberto para escrita por outro processo (nem por
+    uma instância de DuckDBAnalytics deste processo) enquanto o pool existir.
+    threads_per_worker limita as threads do DuckDB em cada processo (padrão:
+    CPUs / processos) para não disputar núcleos entre eles.
+    """
+    def __init__(self, db_path: str, max_workers: Optional[int] = None,
+                 threads_per_worker: Optional[int] = None):
+        if db_path == ":memory:":
+            raise ValueError("ProcessPoolAnalytics precisa de um arquivo DuckDB (bancos :memory: não são compartilhados entre processos)")
+        self.db_path = db_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.max_workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(db_path, self.threads_per_worker),
+        )
+
+    def __enter__(self) -> "ProcessPoolAnalytics":
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.close()
+
+    def submit(self, query: str, params: Optional[Params] = None,
+               transform: Optional[Callable[[Any], Any]] = None, as_arrow: bool = False) -> Future:
+        """
+        Agenda uma tarefa e retorna um Future com transform(resultado da query)
+        (ou o próprio resultado, sem transform). Exceções de transform são
+        propagadas pelo Future; erros de query seguem a convenção de
+        DuckDBAnalytics (resultado vazio).
+        """
+        return _DecodedFuture(self._executor.submit(_run_task, query, params, transform, as_arrow))
+
+    def map(self, tasks: Iterable[Task], transform: Optional[Callable[[Any], Any]] = None,
+            as_arrow: bool = False) -> List[Any]:
+        """
+        Executa em paralelo uma lista de tarefas (query ou (query, params)) com a
+        mesma transform e retorna os resultados na ordem das tarefas.
+        """
+        futures = []
+        for task in tasks:
+            query, params = (task, None) if isinstance(task, str) else task
+            futures.append(self.submit(query, params, transform, as_arrow))
+        return [future.result() for future in futures]
+
+    def close(self, wait: bool = True):
+        """Encerra os processos de trabalho (e suas conexões)."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,124 @@
+"""
+DuckDB Embedded Analytics Engine - Cache de Resultados
+
+Cache LRU limitado por bytes para resultados de queries. Cada entrada guarda as
+tabelas das quais depende, permitindo invalidar apenas o que foi afetado por
+uma escrita. Entradas podem expirar por TTL.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+import pandas as pd
+
+
+def estimate_size(value: Any) -> int:
+    """Estima o tamanho em bytes de um resultado (DataFrame, tabela Arrow ou lista de tuplas)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, list):
+        size = sys.getsizeof(value)
+        for row in value:
+            size += sys.getsizeof(row) + sum(sys.getsizeof(item) for item in row)
+        return size
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """
+    Cache LRU de resultados de queries, limitado pelo total de bytes armazenados.
+    Thread-safe.
+    """
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float, Set[str]]]" = OrderedDict()
+        self._keys_by_table: Dict[str, Set[Hashable]] = {}
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache para a chave, ou None (miss/expirado)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            value, _, stored_at, _ = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, tables: Iterable[str], size_bytes: Optional[int] = None) -> bool:
+        """
+        Armazena um resultado. Retorna False se ele for maior que o limite do cache.
+        """
+        size = estimate_size(value) if size_bytes is None else size_bytes
+        if size > self.max_bytes:
+            return False
+        tables = set(tables)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic(), tables)
+            self._current_bytes += size
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+            while self._current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+        return True
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """Remove todas as entradas que dependem de alguma das tabelas informadas."""
+        removed = 0
+        with self._lock:
+            for table in tables:
+                for key in list(self._keys_by_table.get(table, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+            self._stats["invalidations"] += removed
+        return removed
+
+    def clear(self):
+        """Remove todas as entradas (as estatísticas são preservadas)."""
+        with self._lock:
+            self._stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+            self._keys_by_table.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna hits, misses, taxa de acerto, evicções e ocupação do cache."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key: Hashable):
+        _, size, _, tables = self._entries.pop(key)
+        self._current_bytes -= size
+        for table in tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
@@ -0,0 +1,130 @@
+"""
+DuckDB Embedded Analytics Engine - Profiling de Queries
+
+Captura o profiling JSON do DuckDB (equivalente a EXPLAIN ANALYZE) de cada
+query executada e guarda, por query, a árvore do plano com tempo,
+cardinalidade e memória de cada operador, além do tempo gasto no Python
+convertendo o resultado (pandas, Arrow, tuplas).
+"""
+
+import json
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import duckdb
+
+
+def enable_connection_profiling(conn: duckdb.DuckDBPyConnection):
+    """Ativa o profiling detalhado da conexão, sem imprimir nada."""
+    conn.execute("PRAGMA enable_profiling='no_output'")
+    conn.execute("SET profiling_mode='detailed'")
+
+
+def disable_connection_profiling(conn: duckdb.DuckDBPyConnection):
+    """Desativa o profiling da conexão."""
+    conn.execute("PRAGMA disable_profiling")
+
+
+def parse_profile(raw: str) -> Dict[str, Any]:
+    """
+    Converte o JSON de get_profiling_information() em um dicionário com as
+    métricas da query e a árvore de operadores (plan).
+    """
+    data = json.loads(raw)
+    return {
+        "latency": data.get("latency", 0.0),
+        "cpu_time": data.get("cpu_time", 0.0),
+        "rows_returned": data.get("rows_returned", 0),
+        "peak_buffer_memory": data.get("system_peak_buffer_memory", 0),
+        "rows_scanned": data.get("cumulative_rows_scanned", 0),
+        "plan": [_parse_operator(child) for child in data.get("children", [])],
+    }
+
+
+def _parse_operator(node: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "operator": node.get("operator_name") or node.get("operator_type", ""),
+        "type": node.get("operator_type", ""),
+        "timing": node.get("operator_timing", 0.0),
+        "cardinality": node.get("operator_cardinality", 0),
+        "rows_scanned": node.get("operator_rows_scanned", 0),
+        "peak_memory": node.get("system_peak_buffer_memory", 0),
+        "extra_info": node.get("extra_info", {}),
+        "children": [_parse_operator(child) for child in node.get("children", [])],
+    }
+
+
+def iter_operators(plan: List[Dict[str, Any]], depth: int = 0) -> Iterator[Dict[str, Any]]:
+    """Percorre a árvore de operadores em pré-ordem, anotando a profundidade."""
+    for node in plan:
+        yield {**{key: value for key, value in node.items() if key != "children"}, "depth": depth}
+        yield from iter_operators(node["children"], depth + 1)
+
+
+def format_plan(plan: List[Dict[str, Any]]) -> str:
+    """Representação textual da árvore: operador, tempo, cardinalidade e memória."""
+    lines = []
+    for node in iter_operators(plan):
+        lines.append(
+            f"{'  ' * node['depth']}{node['operator']}  "
+            f"{node['timing'] * 1000:.2f} ms  {node['cardinality']:,} linhas  "
+            f"{node['peak_memory'] / (1024 * 1024):.1f} MB"
+        )
+    return "\n".join(lines)
+
+
+class QueryProfiler:
+    """
+    Guarda os perfis das últimas max_profiles queries (thread-safe).
+    Cada perfil traz a query, o método que a executou, o tempo de execução no
+    DuckDB, o tempo de conversão do resultado no Python e o plano com métricas.
+    """
+    def __init__(self, max_profiles: int = 100):
+        self.max_profiles = max_profiles
+        self._profiles: Deque[Dict[str, Any]] = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def capture(self, conn: duckdb.DuckDBPyConnection, query: str, method: str,
+                execute_seconds: float, fetch_seconds: float) -> Optional[Dict[str, Any]]:
+        """Registra o perfil da última query executada na conexão."""
+        try:
+            raw = conn.get_profiling_information(format="json")
+        except duckdb.Error:
+            return None
+        profile = {
+            "query": query,
+            "method": method,
+            "captured_at": datetime.now().isoformat(),
+            "execute_seconds": execute_seconds,
+            "fetch_seconds": fetch_seconds,
+            **parse_profile(raw),
+        }
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def profiles(self) -> List[Dict[str, Any]]:
+        """Perfis guardados, do mais antigo ao mais recente."""
+        with self._lock:
+            return list(self._profiles)
+
+    def clear(self):
+        """Descarta os perfis guardados."""
+        with self._lock:
+            self._profiles.clear()
+
+    def slowest_operators(self, limit: int = 10, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Operadores mais lentos entre os perfis guardados (ou apenas os da query
+        informada), com a query de origem de cada um.
+        """
+        operators = [
+            {**operator, "query": profile["query"]}
+            for profile in self.profiles()
+            if query is None or profile["query"] == query
+            for operator in iter_operators(profile["plan"])
+        ]
+        operators.sort(key=lambda operator: operator["timing"], reverse=True)
+        return operators[:limit]
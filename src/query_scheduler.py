@@ -0,0 +1,225 @@
+"""
+DuckDB Embedded Analytics Engine - Controle de Admissão de Queries
+
+Classes de prioridade (ex.: interactive e batch), cada uma com um limite de
+queries simultâneas, uma fila com timeout e, opcionalmente, valores de
+threads e memory_limit. Quando há vaga, as queries na fila são admitidas por
+prioridade e, dentro da mesma prioridade, por ordem de chegada.
+
+threads e memory_limit são configurações globais no DuckDB (não existem por
+conexão nem por query), então o agendador aplica as da classe de maior
+prioridade com queries em execução e restaura os valores originais quando ela
+não os define. Assim, um batch rodando sozinho fica limitado e deixa threads
+e memória livres, e as queries interativas que chegarem rodam com os valores
+originais.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+import duckdb
+
+DEFAULT_PRIORITY_CLASSES: Dict[str, Dict[str, Any]] = {
+    "interactive": {"priority": 0},
+    "batch": {"priority": 1, "max_concurrent": 1},
+}
+
+_SETTINGS = ("threads", "memory_limit")
+
+
+class AdmissionTimeoutError(duckdb.Error):
+    """Lançada quando uma query espera na fila mais que o timeout da sua classe."""
+
+
+class UnknownQueryClassError(duckdb.Error):
+    """Lançada quando a query pede uma classe de prioridade que não foi configurada."""
+
+
+class QueryScheduler:
+    """
+    Fila de admissão por classe de prioridade (thread-safe).
+
+    priority_classes mapeia o nome da classe para priority (menor = primeiro),
+    max_concurrent (None = sem limite), timeout (segundos na fila; padrão:
+    timeout), threads e memory_limit. max_concurrent_queries limita o total
+    de queries simultâneas de todas as classes. apply_settings recebe um
+    dicionário {configuração: valor} a aplicar globalmente no DuckDB.
+    """
+    def __init__(self, priority_classes: Optional[Mapping[str, Mapping[str, Any]]] = None,
+                 max_concurrent_queries: Optional[int] = None, timeout: float = 60.0,
+                 apply_settings: Optional[Callable[[Dict[str, Any]], None]] = None, max_wait_samples: int = 1000):
+        self.classes = {name: dict(config) for name, config in (priority_classes or DEFAULT_PRIORITY_CLASSES).items()}
+        self.default_class = min(self.classes, key=lambda name: self.classes[name].get("priority", 0))
+        self.max_concurrent_queries = max_concurrent_queries
+        self.timeout = timeout
+        self._apply_settings = apply_settings
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._sequence = 0
+        self._waiting: List[Dict[str, Any]] = []
+        self._running = {name: 0 for name in self.classes}
+        self._stats = {
+            name: {"admitted": 0, "timed_out": 0, "waits": deque(maxlen=max_wait_samples)}
+            for name in self.classes
+        }
+        self._baseline: Optional[Dict[str, Any]] = None
+        self._applied: Optional[str] = None
+        self._applied_settings: Dict[str, Any] = {}
+
+    @contextmanager
+    def admit(self, query_class: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Espera uma vaga para a classe informada (padrão: a de maior prioridade)
+        e a libera ao sair. Chamadas aninhadas na mesma thread reutilizam a vaga
+        já obtida. Lança AdmissionTimeoutError se a espera exceder o timeout e
+        UnknownQueryClassError se a classe não existir.
+        """
+        if getattr(self._local, "depth", 0):
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+        query_class = query_class or self.default_class
+        if query_class not in self.classes:
+            raise UnknownQueryClassError(f"Classe de prioridade desconhecida: {query_class}. Use uma de {list(self.classes)}")
+        if timeout is None:
+            timeout = self.classes[query_class].get("timeout", self.timeout)
+        self._acquire(query_class, timeout)
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            self._release(query_class)
+
+    def admit_detached(self, query_class: Optional[str] = None, timeout: Optional[float] = None) -> Callable[[], None]:
+        """
+        Como admit, para leituras que continuam depois que a chamada retorna
+        (ex.: um RecordBatchReader): espera a vaga e retorna a função que a
+        libera, que pode ser chamada de qualquer thread (só a primeira chamada
+        tem efeito). Se a thread atual já ocupa uma vaga, ela é reutilizada.
+        """
+        if getattr(self._local, "depth", 0):
+            return lambda: None
+        query_class = query_class or self.default_class
+        if query_class not in self.classes:
+            raise UnknownQueryClassError(f"Classe de prioridade desconhecida: {query_class}. Use uma de {list(self.classes)}")
+        if timeout is None:
+            timeout = self.classes[query_class].get("timeout", self.timeout)
+        self._acquire(query_class, timeout)
+        released = threading.Event()
+
+        def release():
+            with self._condition:
+                if released.is_set():
+                    return
+                released.set()
+            self._release(query_class)
+
+        return release
+
+    def _acquire(self, query_class: str, timeout: float):
+        start = time.perf_counter()
+        with self._condition:
+            self._sequence += 1
+            waiter = {"class": query_class, "priority": self.classes[query_class].get("priority", 0),
+                      "sequence": self._sequence, "admitted": False}
+            self._waiting.append(waiter)
+            self._grant()
+            deadline = start + timeout
+            while not waiter["admitted"]:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._waiting.remove(waiter)
+                    self._stats[query_class]["timed_out"] += 1
+                    raise AdmissionTimeoutError(
+                        f"Query da classe '{query_class}' esperou mais de {timeout:.1f}s na fila de admissão"
+                    )
+                self._condition.wait(remaining)
+            self._stats[query_class]["waits"].append(time.perf_counter() - start)
+            self._update_settings()
+
+    def _release(self, query_class: str):
+        with self._condition:
+            self._running[query_class] -= 1
+            self._grant()
+            self._update_settings()
+
+    def _grant(self):
+        """Admite, por prioridade e ordem de chegada, as queries em espera que cabem nos limites."""
+        total = sum(self._running.values())
+        for waiter in sorted(self._waiting, key=lambda w: (w["priority"], w["sequence"])):
+            if self.max_concurrent_queries is not None and total >= self.max_concurrent_queries:
+                break
+            limit = self.classes[waiter["class"]].get("max_concurrent")
+            if limit is not None and self._running[waiter["class"]] >= limit:
+                continue
+            waiter["admitted"] = True
+            self._waiting.remove(waiter)
+            self._running[waiter["class"]] += 1
+            self._stats[waiter["class"]]["admitted"] += 1
+            total += 1
+        self._condition.notify_all()
+
+    def _update_settings(self):
+        """
+        Aplica threads/memory_limit da classe de maior prioridade em execução;
+        o que ela não define (ou nenhuma query rodando) volta ao valor original.
+        """
+        if self._apply_settings is None:
+            return
+        running = [name for name, count in self._running.items() if count]
+        target = min(running, key=lambda name: self.classes[name].get("priority", 0)) if running else None
+        settings = dict(self._baseline or {})
+        if target is not None:
+            settings.update({setting: self.classes[target][setting] for setting in _SETTINGS
+                             if self.classes[target].get(setting) is not None})
+        if settings == self._applied_settings:
+            self._applied = target
+            return
+        try:
+            self._apply_settings(settings)
+            self._applied, self._applied_settings = target, settings
+        except duckdb.Error:
+            pass
+
+    def capture_baseline(self, settings: Dict[str, Any]):
+        """
+        Registra os valores originais de threads/memory_limit (None = padrão
+        do DuckDB), restaurados quando a classe em execução não os define.
+        """
+        with self._condition:
+            self._baseline = dict(settings)
+            self._applied_settings = dict(settings)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Por classe: queries em execução e na fila, admitidas, com timeout e o
+        tempo de espera na fila (médio, p95 e máximo, em segundos); além dos
+        totais e da classe cujas configurações estão aplicadas.
+        """
+        with self._condition:
+            classes = {}
+            for name in self.classes:
+                waits = sorted(self._stats[name]["waits"])
+                classes[name] = {
+                    "running": self._running[name],
+                    "queued": sum(waiter["class"] == name for waiter in self._waiting),
+                    "admitted": self._stats[name]["admitted"],
+                    "timed_out": self._stats[name]["timed_out"],
+                    "wait_mean": sum(waits) / len(waits) if waits else 0.0,
+                    "wait_p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                    "wait_max": waits[-1] if waits else 0.0,
+                }
+            return {
+                "classes": classes,
+                "running": sum(self._running.values()),
+                "queued": len(self._waiting),
+                "settings_class": self._applied,
+                "settings": dict(self._applied_settings),
+            }
@@ -0,0 +1,424 @@
+"""
+DuckDB Embedded Analytics Engine - Servidor de Queries
+
+Hospeda uma instância "quente" de DuckDBAnalytics atrás de um endpoint HTTP
+local (TCP em 127.0.0.1 ou socket Unix), para que vários processos
+compartilhem o mesmo conjunto de dados em memória, o pool de conexões, o cache
+de resultados, os rollups e a fila de admissão, em vez de cada um carregar a
+sua cópia. Os resultados trafegam como stream Arrow IPC (em lotes, com
+Transfer-Encoding chunked), sem serialização por linha.
+
+Protocolo:
+    POST /query   {"query": ..., "params": [...] | {...}, "stream": false,
+                   "batch_size": 65536, "query_class": null}
+                  -> 200 application/vnd.apache.arrow.stream
+                  -> 400 {"error": ..., "type": ...} se a query falhar
+    GET  /health  -> {"status": "ok", ...}
+    GET  /stats   -> métricas do servidor, do cache e da fila de admissão
+
+Sem "stream", a query passa por fetch_arrow (cache e rollups); com
+"stream": true, os lotes são lidos do DuckDB sob demanda e a memória do
+servidor fica limitada a um lote, qualquer que seja o tamanho do resultado.
+
+O servidor não tem autenticação: use-o apenas em interfaces locais.
+
+Uso: python -m src.query_server --db-path dados.duckdb --port 8000
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+try:
+    from .duckdb_analytics import DuckDBAnalytics
+    from .prepared_statements import Params
+except ImportError:
+    from duckdb_analytics import DuckDBAnalytics
+    from prepared_statements import Params
+
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+_MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+class _ChunkedWriter:
+    """Arquivo de escrita que envia cada write como um chunk HTTP (Transfer-Encoding: chunked)."""
+
+    def __init__(self, wfile: Any):
+        self.wfile = wfile
+        self.rows = 0
+        self.bytes_sent = 0
+        self.closed = False
+
+    def write(self, data: Any) -> int:
+        data = memoryview(data).cast("B")
+        if len(data):
+            self.wfile.write(b"%x\r\n" % len(data))
+            self.wfile.write(data)
+            self.wfile.write(b"\r\n")
+            self.bytes_sent += len(data)
+        return len(data)
+
+    def flush(self):
+        self.wfile.flush()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+
+class _QueryRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: Any
+    sink: Optional[_ChunkedWriter] = None
+
+    def log_message(self, format: str, *args: Any):
+        # Sem log por requisição (e client_address é vazio em sockets Unix)
+        pass
+
+    def do_GET(self):
+        query_server: QueryServer = self.server.query_server
+        if self.path == "/health":
+            self._send_json(200, query_server.health())
+        elif self.path == "/stats":
+            self._send_json(200, query_server.stats())
+        else:
+            self._send_json(404, {"error": f"Caminho desconhecido: {self.path}"})
+
+    def do_POST(self):
+        query_server: QueryServer = self.server.query_server
+        if self.path != "/query":
+            self._send_json(404, {"error": f"Caminho desconhecido: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length > _MAX_REQUEST_BYTES:
+                raise ValueError("Requisição grande demais")
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict) or not isinstance(request.get("query"), str):
+                raise ValueError('O corpo deve ser um objeto JSON com o campo "query"')
+        except (ValueError, json.JSONDecodeError) as e:
+            query_server._count(requests=1, errors=1)
+            self._send_json(400, {"error": str(e), "type": type(e).__name__})
+            return
+        self.sink = None
+        query_server._serve_query(self, request)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_batches(self, schema: pa.Schema, batches: Iterable[pa.RecordBatch]):
+        """Envia schema e lotes como stream Arrow IPC chunked (progresso em self.sink)."""
+        self.send_response(200)
+        self.send_header("Content-Type", ARROW_STREAM_TYPE)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.sink = _ChunkedWriter(self.wfile)
+        writer = pa.ipc.new_stream(pa.PythonFile(self.sink, mode="w"), schema)
+        for batch in batches:
+            writer.write_batch(batch)
+            self.sink.rows += batch.num_rows
+        # Só um stream completo recebe o marcador de fim: se um lote falhar, o cliente vê o stream truncado
+        writer.close()
+        self.sink.close()
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class QueryServer:
+    """
+    Servidor HTTP local para uma instância de DuckDBAnalytics. Cada requisição
+    roda em uma thread própria; a concorrência com o banco é a do pool de
+    conexões da instância (use pool_size > 0) e, se ativa, da fila de admissão.
+    Com unix_socket, escuta no caminho informado em vez de host/port.
+    """
+    def __init__(self, analytics: DuckDBAnalytics, host: str = "127.0.0.1", port: int = 8000,
+                 unix_socket: Optional[str] = None, batch_size: int = 65_536):
+        self.analytics = analytics
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.batch_size = batch_size
+        self._server: Optional[socketserver.BaseServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "errors": 0, "active": 0, "rows_sent": 0, "bytes_sent": 0}
+
+    def __enter__(self) -> "QueryServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.stop()
+
+    @property
+    def address(self) -> str:
+        """Endereço para QueryClient: URL http://host:porta ou o caminho do socket Unix."""
+        if self.unix_socket:
+            return self.unix_socket
+        port = self._server.server_address[1] if self._server else self.port
+        return f"http://{self.host}:{port}"
+
+    def start(self):
+        """Conecta ao banco (se preciso) e atende requisições em uma thread em segundo plano."""
+        self._bind()
+        self._thread = threading.Thread(target=self._server.serve_forever, name="duckdb-query-server", daemon=True)
+        self._thread.start()
+        print(f"✓ Servidor de queries escutando em {self.address}")
+
+    def serve_forever(self):
+        """Conecta ao banco (se preciso) e atende requisições na thread atual até stop() ou Ctrl+C."""
+        self._bind()
+        self._thread = threading.current_thread()
+        print(f"✓ Servidor de queries escutando em {self.address}")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Para de aceitar requisições e libera o endereço (a instância de DuckDBAnalytics continua conectada)."""
+        server = self._server
+        if server is None:
+            return
+        address = self.address
+        self._server = None
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            server.shutdown()
+            if thread.name == "duckdb-query-server":
+                thread.join()
+        server.server_close()
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.remove(self.unix_socket)
+        print(f"✓ Servidor de queries encerrado ({address})")
+
+    def health(self) -> Dict[str, Any]:
+        """Estado do servidor."""
+        return {
+            "status": "ok" if self.analytics.conn else "disconnected",
+            "db_path": self.analytics.db_path,
+            "uptime_seconds": time.time() - self._started_at if self._started_at else 0.0,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Requisições, erros, linhas e bytes enviados, mais as métricas de cache e da fila de admissão."""
+        with self._stats_lock:
+            server = dict(self._stats)
+        return {
+            "server": server,
+            "cache": self.analytics.cache_stats(),
+            "scheduler": self.analytics.scheduler_metrics(),
+        }
+
+    def _bind(self):
+        if self._server is not None:
+            raise RuntimeError("O servidor de queries já está em execução")
+        if not self.analytics.conn:
+            self.analytics.connect()
+        if self.unix_socket:
+            if os.path.exists(self.unix_socket):
+                os.remove(self.unix_socket)
+            self._server = _UnixHTTPServer(self.unix_socket, _QueryRequestHandler)
+        else:
+            self._server = ThreadingHTTPServer((self.host, self.port), _QueryRequestHandler)
+            self._server.daemon_threads = True
+        self._server.query_server = self
+        self._started_at = time.time()
+
+    def _count(self, **increments: int):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def _serve_query(self, handler: _QueryRequestHandler, request: Dict[str, Any]):
+        """Executa a query da requisição e envia o resultado (ou o erro) pelo handler."""
+        query, params = request["query"], request.get("params")
+        query_class = request.get("query_class")
+        self._count(active=1)
+        error = False
+        try:
+            batch_size = int(request.get("batch_size") or self.batch_size)
+            with self.analytics.query_class(query_class) if query_class else nullcontext():
+                if request.get("stream"):
+                    with self.analytics._stream_record_batches(query, params, batch_size) as reader:
+                        handler._send_batches(reader.schema, reader)
+                else:
+                    table = self.analytics._fetch_arrow(query, params)
+                    handler._send_batches(table.schema, table.to_batches(batch_size))
+        except (duckdb.Error, OSError, pa.ArrowException, ValueError) as e:
+            # ValueError: batch_size inválido
+            error = True
+            if handler.sink is not None:
+                # Falha no meio do stream (query ou cliente): encerra a conexão sem o chunk final
+                handler.close_connection = True
+            else:
+                handler._send_json(400, {"error": str(e), "type": type(e).__name__})
+        finally:
+            sink = handler.sink
+            self._count(requests=1, errors=int(error), rows_sent=sink.rows if sink else 0,
+                        bytes_sent=sink.bytes_sent if sink else 0, active=-1)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection sobre um socket Unix."""
+
+    def __init__(self, path: str, timeout: Optional[float]):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class QueryClient:
+    """
+    Cliente do QueryServer com a mesma interface de leitura de DuckDBAnalytics
+    (fetch_data, fetch_arrow, fetch_record_batches). address é a URL do
+    servidor (http://127.0.0.1:8000) ou o caminho de um socket Unix.
+    Parâmetros de query precisam ser serializáveis em JSON. Como em
+    DuckDBAnalytics, erros (da query ou de comunicação) são impressos e
+    resultam em um resultado vazio.
+    """
+    def __init__(self, address: str, timeout: Optional[float] = 300.0):
+        self.address = address
+        self.timeout = timeout
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.address.startswith("http://"):
+            host, _, port = self.address[len("http://"):].rstrip("/").partition(":")
+            return http.client.HTTPConnection(host, int(port or 80), timeout=self.timeout)
+        return _UnixHTTPConnection(self.address, self.timeout)
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None
+                 ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Envia a requisição; lança duckdb.Error com a mensagem do servidor se a query falhar."""
+        conn = self._connection()
+        body = json.dumps(payload, default=str).encode() if payload is not None else None
+        conn.request(method, path, body=body, headers={"Content-Type": "application/json"} if body else {})
+        response = conn.getresponse()
+        if response.status != 200:
+            try:
+                error = json.loads(response.read()).get("error", response.reason)
+            except ValueError:
+                error = response.reason
+            conn.close()
+            raise duckdb.Error(f"{error} (HTTP {response.status})")
+        return conn, response
+
+    def _get_json(self, path: str) -> Dict[str, Any]:
+        conn, response = self._request("GET", path)
+        try:
+            return json.loads(response.read())
+        finally:
+            conn.close()
+
+    def fetch_arrow(self, query: str, params: Optional[Params] = None) -> pa.Table:
+        """Executa uma query no servidor e retorna os resultados como uma tabela PyArrow."""
+        try:
+            conn, response = self._request("POST", "/query", {"query": query, "params": params})
+            try:
+                return pa.ipc.open_stream(response).read_all()
+            finally:
+                conn.close()
+        except (duckdb.Error, OSError, http.client.HTTPException, pa.ArrowException) as e:
+            print(f"✗ Erro ao buscar dados do servidor de queries: {e}")
+            return pa.table({})
+
+    def fetch_data(self, query: str, params: Optional[Params] = None) -> pd.DataFrame:
+        """
+        Executa uma query no servidor e retorna os resultados como um DataFrame
+        Pandas, com as mesmas conversões de DuckDBAnalytics.fetch_data
+        (DECIMAL vira float64).
+        """
+        table = self.fetch_arrow(query, params)
+        for index, field in enumerate(table.schema):
+            if pa.types.is_decimal(field.type):
+                table = table.set_column(index, field.name, table.column(index).cast(pa.float64()))
+        return table.to_pandas()
+
+    def fetch_record_batches(self, query: str, params: Optional[Params] = None,
+                             batch_size: int = 65_536) -> Optional[pa.RecordBatchReader]:
+        """
+        Executa uma query no servidor em modo stream e retorna um
+        RecordBatchReader que recebe os lotes de até batch_size linhas à medida
+        que o servidor os produz (sem cache, memória limitada a um lote nos dois
+        lados). Erros no meio do stream chegam do reader como exceções.
+        """
+        try:
+            _, response = self._request(
+                "POST", "/query", {"query": query, "params": params, "stream": True, "batch_size": batch_size}
+            )
+            return pa.ipc.open_stream(response)
+        except (duckdb.Error, OSError, http.client.HTTPException, pa.ArrowException) as e:
+            print(f"✗ Erro ao buscar lotes do servidor de queries: {e}")
+            return None
+
+    def health(self) -> Dict[str, Any]:
+        """Estado do servidor ({"status": "unreachable"} se ele não responder)."""
+        try:
+            return self._get_json("/health")
+        except (duckdb.Error, OSError, http.client.HTTPException) as e:
+            return {"status": "unreachable", "error": str(e)}
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas do servidor, do cache e da fila de admissão ({} se ele não responder)."""
+        try:
+            return self._get_json("/stats")
+        except (duckdb.Error, OSError, http.client.HTTPException) as e:
+            print(f"✗ Erro ao consultar o servidor de queries: {e}")
+            return {}
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    """Ponto de entrada de linha de comando do servidor de queries."""
+    parser = argparse.ArgumentParser(description="Servidor local de queries DuckDB com streaming Arrow IPC")
+    parser.add_argument("--db-path", default=":memory:", help="Banco DuckDB (padrão: :memory:)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix-socket", help="Escuta neste socket Unix em vez de host/porta")
+    parser.add_argument("--pool-size", type=int, default=8, help="Conexões concorrentes com o banco")
+    parser.add_argument("--cache-mb", type=int, default=256, help="Tamanho do cache de resultados (0 desativa)")
+    parser.add_argument("--scheduler", action="store_true", help="Ativa a fila de admissão com classes de prioridade")
+    parser.add_argument("--init-sql", help="Script SQL executado antes de abrir o servidor (ex.: carga dos dados)")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    analytics = DuckDBAnalytics(
+        args.db_path, enable_cache=args.cache_mb > 0, cache_max_bytes=args.cache_mb * 1024 * 1024,
+        pool_size=args.pool_size, enable_scheduler=args.scheduler,
+    )
+    analytics.connect()
+    if args.init_sql and not analytics.run_sql_script(args.init_sql):
+        raise SystemExit(1)
+    try:
+        QueryServer(analytics, args.host, args.port, args.unix_socket).serve_forever()
+    finally:
+        analytics.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+DuckDB Embedded Analytics Engine - Rollups
+
+Rollups são tabelas de pré-agregação (dimensões + medidas aditivas) de uma
+tabela fato. Uma consulta de agregação sobre a tabela fato pode ser respondida
+por um rollup quando todas as colunas que ela usa fora dos agregados (SELECT,
+WHERE, GROUP BY) são dimensões do rollup e todos os agregados podem ser
+recombinados a partir das medidas: SUM e COUNT viram SUM das somas/contagens
+parciais, MIN e MAX viram MIN/MAX dos parciais e AVG vira SUM(somas) /
+SUM(contagens).
+
+A reescrita é feita na árvore sintática de json_serialize_sql: os agregados
+são substituídos pelas expressões sobre o rollup, a tabela do FROM é trocada e
+o SQL é regenerado com json_deserialize_sql.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import duckdb
+
+try:
+    from .sql_utils import deserialize_select, expression_children, parse_expression, unqualify
+except ImportError:
+    from sql_utils import deserialize_select, expression_children, parse_expression, unqualify
+
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_]\w*$")
+
+# Expressão sobre o rollup que recombina cada agregado da consulta original
+_ROLLUP_EXPRESSIONS = {
+    "sum": "SUM({sum})",
+    "count": "SUM({count})::BIGINT",
+    "count_star": "SUM({count_star})::BIGINT",
+    "min": "MIN({min})",
+    "max": "MAX({max})",
+    "avg": "(SUM({sum}) / SUM({count}))::DOUBLE",
+}
+
+# Classes de expressão que impedem a reescrita (o resultado dependeria das linhas da tabela fato)
+_UNSUPPORTED_CLASSES = {"WINDOW", "SUBQUERY", "STAR", "LAMBDA"}
+_SUPPORTED_MODIFIERS = {"ORDER_MODIFIER", "LIMIT_MODIFIER", "DISTINCT_MODIFIER"}
+
+
+def rollup_measures(measures: Any) -> Dict[str, str]:
+    """
+    Normaliza as medidas de um rollup para {coluna: agregado}. Aceita um
+    mapeamento pronto ({"total": "SUM(amount)"}) ou uma lista de colunas
+    numéricas, que gera sum_<coluna> e count_<coluna> (o suficiente para SUM,
+    COUNT e AVG). COUNT(*) é sempre incluído como count_star.
+    """
+    if isinstance(measures, Mapping):
+        aggregates = dict(measures)
+    else:
+        aggregates = {}
+        for column in measures:
+            aggregates[f"sum_{column}"] = f"SUM({column})"
+            aggregates[f"count_{column}"] = f"COUNT({column})"
+    if not any(expression.replace(" ", "").upper() == "COUNT(*)" for expression in aggregates.values()):
+        aggregates["count_star"] = "COUNT(*)"
+    return aggregates
+
+
+def is_identifier(name: str) -> bool:
+    """Indica se name é um nome de coluna simples (sem aspas nem expressões)."""
+    return bool(_IDENTIFIER_PATTERN.match(name))
+
+
+def canonical_expression(node: Any) -> Any:
+    """Expressão sem posições e aliases, com colunas sem qualificador e em minúsculas, para comparação."""
+    if isinstance(node, list):
+        return [canonical_expression(value) for value in node]
+    if not isinstance(node, dict):
+        return node
+    if node.get("class") == "COLUMN_REF":
+        return {"column": node["column_names"][-1].lower()}
+    return {key: canonical_expression(value) for key, value in node.items() if key not in ("query_location", "alias")}
+
+
+def _aggregate_key(node: dict) -> Optional[Tuple[str, str]]:
+    """(função, argumento canônico) de um agregado simples, ou None se tiver DISTINCT, FILTER ou ORDER BY."""
+    if node.get("distinct") or node.get("filter") or node.get("order_bys", {}).get("orders"):
+        return None
+    children = node.get("children", [])
+    if len(children) > 1:
+        return None
+    argument = json.dumps(canonical_expression(children[0]), sort_keys=True) if children else ""
+    return node["function_name"].lower(), argument
+
+
+def measure_key(node: dict) -> Optional[str]:
+    """Chave "<função>|<argumento canônico>" de um agregado simples, no formato de index_measures."""
+    key = _aggregate_key(node)
+    return "|".join(key) if key else None
+
+
+def index_measures(conn: duckdb.DuckDBPyConnection, measures: Mapping[str, str]) -> Dict[str, str]:
+    """
+    Indexa as medidas de um rollup por agregado canônico: {"sum|<arg>": coluna}.
+    Agregados que não podem ser recombinados (DISTINCT, funções não aditivas)
+    ficam de fora e não são usados no roteamento.
+    """
+    index = {}
+    for column, expression in measures.items():
+        node = parse_expression(conn, expression)
+        key = measure_key(node) if node.get("class") == "FUNCTION" else None
+        if key and key.split("|", 1)[0] in ("sum", "count", "count_star", "min", "max"):
+            index.setdefault(key, column)
+    return index
+
+
+class _Rewriter:
+    """Substitui agregados e valida colunas de uma consulta contra um rollup."""
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, measures: Mapping[str, str], dimensions: Set[str],
+                 qualifiers: Set[str], aggregates: Set[str]):
+        self.conn = conn
+        self.measures = measures
+        self.dimensions = dimensions
+        self.qualifiers = qualifiers
+        self.aggregates = aggregates
+        self.aggregate_count = 0
+
+    def replacement(self, node: dict) -> Optional[dict]:
+        """Expressão sobre o rollup equivalente a um agregado, ou None se não houver medida para ele."""
+        key = _aggregate_key(node)
+        if key is None or key[0] not in _ROLLUP_EXPRESSIONS:
+            return None
+        function, argument = key
+        needed = {"avg": ("sum", "count")}.get(function, (function,))
+        columns = {}
+        for part in needed:
+            column = self.measures.get(f"{part}|{argument}")
+            if column is None:
+                return None
+            columns[part] = f'"{column}"'
+        return parse_expression(self.conn, _ROLLUP_EXPRESSIONS[function].format(**columns))
+
+    def rewrite(self, node: dict, aliases: Set[str] = frozenset()) -> Optional[dict]:
+        """
+        Reescreve uma expressão (agregados -> medidas do rollup). Retorna None se
+        ela usar colunas que não são dimensões (nem aliases permitidos) ou
+        agregados sem medida correspondente.
+        """
+        node_class = node.get("class")
+        if node_class in _UNSUPPORTED_CLASSES:
+            return None
+        if node_class == "COLUMN_REF":
+            names = [name.lower() for name in node["column_names"]]
+            if len(names) == 2 and names[0] in self.qualifiers:
+                names = names[1:]
+            if len(names) != 1 or names[0] not in (self.dimensions | aliases):
+                return None
+            return node
+        if node_class == "FUNCTION" and node["function_name"].lower() in self.aggregates:
+            replacement = self.replacement(node)
+            if replacement is None:
+                return None
+            self.aggregate_count += 1
+            return {**replacement, "alias": node.get("alias", "")}
+        for container, key in list(expression_children(node)):
+            rewritten = self.rewrite(container[key], aliases)
+            if rewritten is None:
+                return None
+            container[key] = rewritten
+        return node
+
+
+def rewrite_for_rollup(conn: duckdb.DuckDBPyConnection, statement: dict, source_table: str, rollup_name: str,
+                       dimensions: Sequence[str], measures: Mapping[str, str], output_names: Sequence[str],
+                       aggregates: Set[str]) -> Optional[str]:
+    """
+    SQL da consulta (statement, já parseada com json_serialize_sql) reescrita
+    para ler de rollup_name, ou None se o rollup não puder respondê-la.
+    measures vem de index_measures; output_names são os nomes das colunas do
+    resultado original, preservados com aliases.
+    """
+    statement = json.loads(json.dumps(statement))
+    node = statement["node"]
+    from_table = node.get("from_table") or {}
+    if (node.get("type") != "SELECT_NODE" or node.get("cte_map", {}).get("map")
+            or from_table.get("type") != "BASE_TABLE" or from_table.get("sample") or from_table.get("at_clause")
+            or from_table["table_name"].lower() != unqualify(source_table)
+            or node.get("qualify") or node.get("sample")
+            or any(modifier["type"] not in _SUPPORTED_MODIFIERS for modifier in node.get("modifiers", []))
+            or len(output_names) != len(node["select_list"])):
+        return None
+    qualifiers = {from_table["table_name"].lower(), (from_table.get("alias") or "").lower()} - {""}
+    rewriter = _Rewriter(conn, measures, {dimension.lower() for dimension in dimensions}, qualifiers, aggregates)
+    select_aliases = {item["alias"].lower() for item in node["select_list"] if item.get("alias")}
+    select_list: List[dict] = []
+    for item, name in zip(node["select_list"], output_names):
+        rewritten = rewriter.rewrite(item)
+        if rewritten is None:
+            return None
+        rewritten["alias"] = item.get("alias") or name
+        select_list.append(rewritten)
+    node["select_list"] = select_list
+    if node.get("where_clause") is not None:
+        node["where_clause"] = rewriter.rewrite(node["where_clause"])
+        if node["where_clause"] is None:
+            return None
+    groups = []
+    for expression in node.get("group_expressions", []):
+        groups.append(rewriter.rewrite(expression))
+        if groups[-1] is None:
+            return None
+    node["group_expressions"] = groups
+    if node.get("having") is not None:
+        node["having"] = rewriter.rewrite(node["having"], select_aliases)
+        if node["having"] is None:
+            return None
+    for modifier in node.get("modifiers", []):
+        for order in modifier.get("orders", []):
+            order["expression"] = rewriter.rewrite(order["expression"], select_aliases)
+            if order["expression"] is None:
+                return None
+        for key in ("limit", "offset"):
+            if modifier.get(key) is not None and modifier[key].get("class") not in ("CONSTANT", "PARAMETER"):
+                return None
+    if rewriter.aggregate_count == 0:
+        return None
+    node["from_table"] = {**from_table, "table_name": rollup_name, "schema_name": "", "catalog_name": "",
+                          "alias": from_table.get("alias") or from_table["table_name"]}
+    return deserialize_select(conn, statement)
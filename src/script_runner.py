@@ -0,0 +1,168 @@
+"""
+DuckDB Embedded Analytics Engine - Execução de Scripts SQL
+
+Divide um script SQL em instruções, descobre as tabelas que cada uma lê e
+escreve e monta um DAG de dependências: uma instrução espera as anteriores que
+escrevem algo que ela referencia, ou que referenciam algo que ela escreve.
+Instruções independentes (ex.: vários CREATE TABLE AS sobre fontes já
+existentes) rodam em paralelo; a falha de uma instrução bloqueia apenas as que
+dependem dela.
+"""
+
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import duckdb
+
+try:
+    from .sql_utils import extract_read_tables, extract_written_tables, parse_select
+except ImportError:
+    from sql_utils import extract_read_tables, extract_written_tables, parse_select
+
+# Tipos de instrução cujo efeito se resume às tabelas lidas/escritas; os demais
+# (SET, PRAGMA, BEGIN/COMMIT, ATTACH, USE...) alteram o estado da sessão.
+_DATA_STATEMENT_TYPES = {"SELECT", "CREATE", "INSERT", "UPDATE", "DELETE", "DROP", "ALTER", "COPY", "ANALYZE"}
+
+_QUERY_BODY_PATTERN = re.compile(
+    r"""
+    ^\s*(?:
+        CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?(?:TABLE|VIEW)\s+(?:IF\s+NOT\s+EXISTS\s+)?[\w."]+\s+AS\s+
+      | INSERT\s+(?:OR\s+\w+\s+)?INTO\s+[\w."]+\s*(?:\([^)]*\)\s*)?(?:BY\s+(?:NAME|POSITION)\s+)?
+    )
+    (.*)$
+    """,
+    re.IGNORECASE | re.VERBOSE | re.DOTALL,
+)
+_CREATE_VIEW_PATTERN = re.compile(r"^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?VIEW\b", re.IGNORECASE)
+_COMMENT_OR_STRING_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'", re.DOTALL)
+_IDENTIFIER_PATTERN = re.compile(r'"((?:[^"]|"")+)"|([A-Za-z_]\w*)')
+
+
+def _referenced_names(sql: str) -> Set[str]:
+    """
+    Todos os identificadores da instrução (fora de strings e comentários), em
+    minúsculas: uma superaproximação das tabelas lidas, usada quando a consulta
+    não pode ser parseada. Nomes a mais apenas serializam instruções.
+    """
+    stripped = _COMMENT_OR_STRING_PATTERN.sub(" ", sql)
+    return {(quoted or bare).lower() for quoted, bare in _IDENTIFIER_PATTERN.findall(stripped)}
+
+
+def _read_tables(conn: duckdb.DuckDBPyConnection, sql: str, statement_type: str) -> Set[str]:
+    """Tabelas lidas: pela árvore sintática do SELECT, quando houver um; senão, superaproximadas."""
+    body = sql if statement_type == "SELECT" else None
+    match = _QUERY_BODY_PATTERN.match(sql)
+    if match:
+        body = match.group(1)
+    tree = parse_select(conn, body) if body else None
+    return extract_read_tables(tree) if tree is not None else _referenced_names(sql)
+
+
+def plan_script(conn: duckdb.DuckDBPyConnection, sql: str) -> List[Dict[str, Any]]:
+    """
+    Divide o script e calcula, para cada instrução, o índice, o SQL, o tipo, as
+    tabelas lidas e escritas e os índices das instruções de que depende.
+    Leituras de views existentes incluem as tabelas lidas pela view.
+    Instruções de sessão (SET, BEGIN...) dependem de todas as anteriores e
+    todas as seguintes dependem delas.
+    """
+    views = dict(conn.execute("SELECT lower(view_name), sql FROM duckdb_views() WHERE NOT internal").fetchall())
+    plan: List[Dict[str, Any]] = []
+    for index, statement in enumerate(duckdb.extract_statements(sql)):
+        statement_sql = _COMMENT_OR_STRING_PATTERN.sub(
+            lambda match: match.group(0) if match.group(0).startswith("'") else " ", statement.query
+        ).strip()
+        statement_type = statement.type.name
+        writes = extract_written_tables(statement_sql) if statement_type != "SELECT" else set()
+        reads = _read_tables(conn, statement_sql, statement_type)
+        pending, expanded = list(reads & views.keys()), set()
+        while pending:
+            view = pending.pop()
+            if view not in expanded:
+                expanded.add(view)
+                names = _referenced_names(views[view])
+                pending.extend(names & views.keys())
+                reads |= names
+        if _CREATE_VIEW_PATTERN.match(statement_sql):
+            views.update({name: statement_sql for name in extract_written_tables(statement_sql)})
+        plan.append({
+            "index": index,
+            "sql": statement_sql,
+            "type": statement_type,
+            "reads": reads,
+            "writes": writes,
+            "session": statement_type not in _DATA_STATEMENT_TYPES,
+        })
+    for statement in plan:
+        references = statement["reads"] | statement["writes"]
+        statement["depends_on"] = [
+            previous["index"] for previous in plan[:statement["index"]]
+            if statement["session"] or previous["session"]
+            or previous["writes"] & references
+            or statement["writes"] & (previous["reads"] | previous["writes"])
+        ]
+    return plan
+
+
+def run_plan(plan: List[Dict[str, Any]], execute: Callable[[str], None], max_workers: int = 1,
+             completed: Optional[Set[int]] = None,
+             on_finish: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Executa as instruções respeitando o DAG, até max_workers ao mesmo tempo.
+    Instruções em completed (já executadas em uma rodada anterior) são puladas
+    e contam como concluídas. Retorna um resultado por instrução (index, sql,
+    status 'ok' | 'failed' | 'blocked' | 'resumed', seconds e error), na ordem
+    do script; on_finish é chamado, na thread do chamador, a cada resultado.
+    """
+    completed = set(completed or ())
+    results: Dict[int, Dict[str, Any]] = {}
+    succeeded: Set[int] = set()
+    failed: Set[int] = set()
+
+    def finish(result: Dict[str, Any]):
+        results[result["index"]] = result
+        if on_finish:
+            on_finish(result)
+
+    def timed_execute(statement: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            execute(statement["sql"])
+            status, error = "ok", None
+        except duckdb.Error as e:
+            status, error = "failed", str(e)
+        return {"index": statement["index"], "sql": statement["sql"], "status": status,
+                "seconds": time.perf_counter() - start, "error": error}
+
+    for statement in plan:
+        if statement["index"] in completed:
+            succeeded.add(statement["index"])
+            finish({"index": statement["index"], "sql": statement["sql"], "status": "resumed",
+                    "seconds": 0.0, "error": None})
+
+    running: Set[Future] = set()
+    submitted: Set[int] = set()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while True:
+            for statement in plan:
+                index = statement["index"]
+                if index in results or index in submitted:
+                    continue
+                if any(dependency in failed for dependency in statement["depends_on"]):
+                    failed.add(index)
+                    finish({"index": index, "sql": statement["sql"], "status": "blocked", "seconds": 0.0,
+                            "error": "dependência falhou"})
+                elif all(dependency in succeeded for dependency in statement["depends_on"]):
+                    submitted.add(index)
+                    running.add(executor.submit(timed_execute, statement))
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                running.remove(future)
+                result = future.result()
+                (succeeded if result["status"] == "ok" else failed).add(result["index"])
+                finish(result)
+    return [results[statement["index"]] for statement in plan]
@@ -0,0 +1,256 @@
+"""
+DuckDB Embedded Analytics Engine - Execução em Shards
+
+Uma tabela lógica particionada (por hash ou por faixas de uma chave) em vários
+arquivos DuckDB. Este módulo monta o plano de uma consulta sobre a tabela:
+
+- Agregações: cada shard calcula agregados parciais agrupados pelas colunas
+  que a consulta usa fora dos agregados (já com o WHERE aplicado); a consulta
+  original é então reescrita, como para um rollup, sobre a união dos parciais
+  (SUM e COUNT viram SUM dos parciais, MIN/MAX dos parciais, AVG vira
+  SUM(somas) / SUM(contagens)). HAVING, ORDER BY e LIMIT (top-N) rodam na
+  junção.
+- Consultas sem agregação: cada shard roda a própria consulta, com LIMIT
+  aumentado para limit + offset, e a junção reaplica DISTINCT, ORDER BY e
+  LIMIT/OFFSET sobre as colunas do resultado.
+
+Consultas que não se encaixam (junções, subqueries, funções de janela,
+COUNT(DISTINCT)...) não têm plano e rodam sobre a view que une os shards.
+"""
+
+import copy
+import json
+from typing import Any, Dict, Optional, Sequence, Set
+
+import duckdb
+
+try:
+    from .rollups import canonical_expression, measure_key, rewrite_for_rollup
+    from .sql_utils import deserialize_select, expression_children, parse_expression, unqualify
+except ImportError:
+    from rollups import canonical_expression, measure_key, rewrite_for_rollup
+    from sql_utils import deserialize_select, expression_children, parse_expression, unqualify
+
+SHARD_METHODS = ("hash", "range")
+SHARD_COLUMN = "__shard"
+PARTIALS_TABLE = "__shard_partials"
+
+# Agregados parciais calculados em cada shard para cada agregado da consulta
+_PARTIAL_FUNCTIONS = {
+    "sum": ("sum",),
+    "count": ("count",),
+    "count_star": ("count_star",),
+    "min": ("min",),
+    "max": ("max",),
+    "avg": ("sum", "count"),
+}
+_SCAN_MODIFIERS = {"ORDER_MODIFIER", "LIMIT_MODIFIER", "DISTINCT_MODIFIER"}
+_ORDER_DIRECTIONS = {"ASCENDING": " ASC", "DESCENDING": " DESC", "ORDER_DEFAULT": ""}
+_NULL_ORDERS = {"NULLS_FIRST": " NULLS FIRST", "NULLS_LAST": " NULLS LAST", "ORDER_DEFAULT": ""}
+
+
+def _literal(value: Any) -> str:
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def shard_expression(shard_key: Sequence[str], method: str, shard_count: int,
+                     boundaries: Optional[Sequence[Any]] = None) -> str:
+    """
+    Expressão SQL com o número do shard (0 a shard_count - 1) de cada linha.
+    hash usa hash(chave) % shard_count; range usa as boundaries (shard_count - 1
+    valores crescentes): o shard i recebe boundaries[i-1] <= chave < boundaries[i]
+    (chaves nulas vão para o último shard).
+    """
+    if method == "hash":
+        return f"hash({', '.join(shard_key)}) % {shard_count}"
+    if method == "range":
+        cases = " ".join(f"WHEN {shard_key[0]} < {_literal(value)} THEN {index}"
+                         for index, value in enumerate(boundaries or []))
+        return f"CASE {cases} ELSE {shard_count - 1} END" if cases else "0"
+    raise ValueError(f"Método de particionamento inválido: {method}. Use um de {SHARD_METHODS}")
+
+
+class _AggregateCollector:
+    """Colunas usadas fora dos agregados e agregados parciais necessários de uma consulta."""
+
+    def __init__(self, aggregates: Set[str]):
+        self.aggregates = aggregates
+        self.columns: Set[str] = set()
+        self.partials: Dict[str, dict] = {}
+        self.supported = True
+
+    def visit(self, node: dict, aliases: Set[str] = frozenset()):
+        node_class = node.get("class")
+        if node_class in ("SUBQUERY", "WINDOW"):
+            self.supported = False
+        elif node_class == "COLUMN_REF":
+            name = node["column_names"][-1].lower()
+            if len(node["column_names"]) > 1 or name not in aliases:
+                self.columns.add(name)
+        elif node_class == "FUNCTION" and node["function_name"].lower() in self.aggregates:
+            function = node["function_name"].lower()
+            if function not in _PARTIAL_FUNCTIONS or measure_key(node) is None:
+                self.supported = False
+                return
+            for part in _PARTIAL_FUNCTIONS[function]:
+                partial = {**copy.deepcopy(node), "function_name": part, "alias": ""}
+                self.partials.setdefault(measure_key(partial), partial)
+        else:
+            for container, key in expression_children(node):
+                self.visit(container[key], aliases)
+
+
+def _has_parameters(node: Any) -> bool:
+    if isinstance(node, list):
+        return any(_has_parameters(value) for value in node)
+    if not isinstance(node, dict):
+        return False
+    return node.get("class") == "PARAMETER" or any(_has_parameters(value) for value in node.values())
+
+
+def _column_ref(name: str) -> dict:
+    return {"class": "COLUMN_REF", "type": "COLUMN_REF", "alias": "", "column_names": [name]}
+
+
+def _aggregate_plan(conn: duckdb.DuckDBPyConnection, statement: dict, table_name: str, columns: Set[str],
+                    collector: _AggregateCollector, output_names: Sequence[str],
+                    aggregates: Set[str]) -> Optional[Dict[str, Any]]:
+    node = statement["node"]
+    dimensions = sorted(collector.columns & columns)
+    shard_statement = copy.deepcopy(statement)
+    shard_node = shard_statement["node"]
+    measures = {}
+    select_list = [_column_ref(dimension) for dimension in dimensions]
+    for index, (key, partial) in enumerate(collector.partials.items()):
+        measures[key] = f"__p{index}"
+        select_list.append({**partial, "alias": f"__p{index}"})
+    shard_node.update({
+        "select_list": select_list,
+        "group_expressions": [_column_ref(dimension) for dimension in dimensions],
+        "group_sets": [list(range(len(dimensions)))] if dimensions else [],
+        "aggregate_handling": "STANDARD_HANDLING",
+        "having": None,
+        "qualify": None,
+        "modifiers": [],
+    })
+    merge_statement = copy.deepcopy(statement)
+    merge_statement["node"]["where_clause"] = None
+    merge_query = rewrite_for_rollup(conn, merge_statement, table_name, PARTIALS_TABLE, dimensions, measures,
+                                     output_names, aggregates)
+    if merge_query is None:
+        return None
+    return {
+        "mode": "partial_aggregate",
+        "shard_query": deserialize_select(conn, shard_statement),
+        "merge_query": merge_query,
+        "shard_params": _has_parameters(node.get("where_clause")),
+    }
+
+
+def _scan_plan(conn: duckdb.DuckDBPyConnection, statement: dict, output_names: Sequence[str],
+               uses_parameters: bool) -> Optional[Dict[str, Any]]:
+    node = statement["node"]
+    lowered = [name.lower() for name in output_names]
+    if len(set(lowered)) != len(lowered):
+        return None
+    select_items = [json.dumps(canonical_expression(item), sort_keys=True) for item in node["select_list"]]
+    distinct, orders, limit, offset = False, [], None, None
+    shard_statement = copy.deepcopy(statement)
+    for modifier in shard_statement["node"].get("modifiers", []):
+        if modifier["type"] not in _SCAN_MODIFIERS:
+            return None
+        if modifier["type"] == "DISTINCT_MODIFIER":
+            if modifier.get("distinct_on_targets"):
+                return None
+            distinct = True
+        for order in modifier.get("orders", []):
+            expression = order["expression"]
+            name = None
+            if expression.get("class") == "COLUMN_REF" and len(expression["column_names"]) == 1 \
+                    and expression["column_names"][0].lower() in lowered:
+                name = output_names[lowered.index(expression["column_names"][0].lower())]
+            elif expression.get("class") == "CONSTANT" and isinstance(expression["value"].get("value"), int) \
+                    and 1 <= expression["value"]["value"] <= len(output_names):
+                name = output_names[expression["value"]["value"] - 1]
+            elif json.dumps(canonical_expression(expression), sort_keys=True) in select_items:
+                name = output_names[select_items.index(json.dumps(canonical_expression(expression), sort_keys=True))]
+            if name is None:
+                return None
+            orders.append('"' + name.replace('"', '""') + '"'
+                          + _ORDER_DIRECTIONS.get(order["type"], "") + _NULL_ORDERS.get(order["null_order"], ""))
+        if modifier["type"] == "LIMIT_MODIFIER":
+            values = {}
+            for key in ("limit", "offset"):
+                value = modifier.get(key)
+                if value is None:
+                    continue
+                if value.get("class") != "CONSTANT" or not isinstance(value["value"].get("value"), int):
+                    return None
+                values[key] = value["value"]["value"]
+            limit, offset = values.get("limit"), values.get("offset")
+            if limit is not None:
+                modifier["limit"] = parse_expression(conn, str(limit + (offset or 0)))
+            modifier["offset"] = None
+    merge_query = f"SELECT {'DISTINCT ' if distinct else ''}* FROM {PARTIALS_TABLE}"
+    if orders:
+        merge_query += f" ORDER BY {', '.join(orders)}"
+    if limit is not None:
+        merge_query += f" LIMIT {limit}"
+    if offset:
+        merge_query += f" OFFSET {offset}"
+    return {
+        "mode": "scatter_gather",
+        "shard_query": deserialize_select(conn, shard_statement),
+        "merge_query": merge_query,
+        "shard_params": uses_parameters,
+    }
+
+
+def plan_sharded_query(conn: duckdb.DuckDBPyConnection, statement: dict, table_name: str, columns: Set[str],
+                       output_names: Sequence[str], aggregates: Set[str]) -> Optional[Dict[str, Any]]:
+    """
+    Plano de execução em shards de uma consulta sobre table_name (statement, já
+    parseada), ou None se ela precisar rodar sobre a união dos shards.
+    columns são as colunas da tabela; output_names, os nomes das colunas do
+    resultado. O plano tem mode ("partial_aggregate" ou "scatter_gather"),
+    shard_query (executada em cada shard, sobre a tabela de mesmo nome),
+    merge_query (executada sobre a união dos resultados dos shards, registrada
+    como __shard_partials) e shard_params (se os parâmetros da consulta vão
+    para os shards; a junção nunca usa parâmetros).
+    """
+    statement = json.loads(json.dumps(statement))
+    node = statement["node"]
+    from_table = node.get("from_table") or {}
+    if (node.get("type") != "SELECT_NODE" or node.get("cte_map", {}).get("map")
+            or from_table.get("type") != "BASE_TABLE" or from_table.get("sample") or from_table.get("at_clause")
+            or from_table["table_name"].lower() != unqualify(table_name)
+            or node.get("qualify") or node.get("sample")):
+        return None
+    collector = _AggregateCollector(aggregates)
+    for expression in [*node["select_list"], *node.get("group_expressions", [])]:
+        collector.visit(expression)
+    # Em HAVING e ORDER BY, nomes simples podem ser aliases do SELECT
+    aliases = {item["alias"].lower() for item in node["select_list"] if item.get("alias")}
+    expressions = [node["having"]] if node.get("having") is not None else []
+    expressions += [order["expression"] for modifier in node.get("modifiers", []) for order in modifier.get("orders", [])]
+    for expression in expressions:
+        collector.visit(expression, aliases)
+    if node.get("where_clause") is not None:
+        where_collector = _AggregateCollector(aggregates)
+        where_collector.visit(node["where_clause"])
+        if not where_collector.supported:
+            return None
+    if not collector.supported:
+        return None
+    if collector.partials:
+        if _has_parameters({key: value for key, value in node.items() if key != "where_clause"}):
+            return None
+        return _aggregate_plan(conn, statement, table_name, columns, collector, output_names, aggregates)
+    if node.get("group_expressions") or node.get("aggregate_handling") != "STANDARD_HANDLING" \
+            or node.get("having") is not None:
+        return None
+    return _scan_plan(conn, statement, output_names, _has_parameters(node))
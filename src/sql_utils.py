@@ -0,0 +1,181 @@
+"""
+DuckDB Embedded Analytics Engine - Utilitários de SQL
+
+Funções auxiliares para normalizar queries e descobrir quais tabelas uma
+instrução lê ou escreve. A leitura usa a árvore sintática devolvida por
+json_serialize_sql (apenas parsing, sem binding); a escrita usa expressões
+regulares sobre os comandos DDL/DML mais comuns, fora de literais e comentários.
+"""
+
+import json
+import re
+from typing import Any, Iterator, Optional, Set, Tuple
+
+import duckdb
+
+# Funções cujo resultado muda entre execuções; queries que as usam não são cacheáveis.
+NON_DETERMINISTIC_FUNCTIONS = {
+    "random", "setseed", "uuid", "gen_random_uuid", "nextval", "currval",
+    "now", "today", "current_date", "current_time", "current_timestamp",
+    "get_current_time", "get_current_timestamp", "transaction_timestamp",
+}
+
+_WRITE_TARGET_PATTERN = re.compile(
+    r"""
+    \b(?:
+        CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?(?:TABLE|VIEW)\s+(?:IF\s+NOT\s+EXISTS\s+)?
+      | INSERT\s+(?:OR\s+\w+\s+)?INTO\s+
+      | UPDATE\s+
+      | DELETE\s+FROM\s+
+      | DROP\s+(?:TABLE|VIEW)\s+(?:IF\s+EXISTS\s+)?
+      | ALTER\s+(?:TABLE|VIEW)\s+(?:IF\s+EXISTS\s+)?
+      | TRUNCATE\s+(?:TABLE\s+)?
+      | COPY\s+
+    )
+    ([\w."]+)
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_DDL_TARGET_PATTERN = re.compile(
+    r"""
+    \b(?:
+        CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?(?:TABLE|VIEW)\s+(?:IF\s+NOT\s+EXISTS\s+)?
+      | DROP\s+(?:TABLE|VIEW)\s+(?:IF\s+EXISTS\s+)?
+      | ALTER\s+(?:TABLE|VIEW)\s+(?:IF\s+EXISTS\s+)?
+    )
+    ([\w."]+)
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# Identificadores entre aspas (grupo 1, mantidos), literais de texto e comentários
+_SQL_LITERAL_PATTERN = re.compile(
+    r"""("(?:[^"]|"")*")|'(?:[^']|'')*'|\$([A-Za-z_]\w*|)\$.*?\$\2\$|--[^\n]*|/\*.*?\*/""",
+    re.DOTALL,
+)
+
+# Literais (grupo 1, mantidos) ou sequências de espaços e comentários (viram um espaço)
+_SQL_NORMALIZE_PATTERN = re.compile(
+    r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|\$([A-Za-z_]\w*|)\$.*?\$\2\$)|(?:\s|--[^\n]*|/\*.*?\*/)+""",
+    re.DOTALL,
+)
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Normaliza espaços em branco e comentários fora de literais (strings,
+    identificadores entre aspas e strings $tag$) e remove o ';' final de uma
+    query. O conteúdo dos literais é mantido como está.
+    """
+    normalized = _SQL_NORMALIZE_PATTERN.sub(lambda match: match.group(1) or " ", query)
+    return normalized.strip().rstrip(";").strip()
+
+
+def unqualify(name: str) -> str:
+    """Remove catálogo/esquema e aspas de um identificador, em minúsculas."""
+    return name.split(".")[-1].strip('"').lower()
+
+
+def parse_select(conn: duckdb.DuckDBPyConnection, query: str) -> Optional[dict]:
+    """
+    Retorna a árvore sintática (JSON) de uma única instrução SELECT, ou None
+    se a query não for um SELECT serializável.
+    """
+    try:
+        serialized = conn.execute("SELECT json_serialize_sql(?)", [query]).fetchone()[0]
+    except duckdb.Error:
+        return None
+    tree = json.loads(serialized)
+    if tree.get("error") or len(tree.get("statements", [])) != 1:
+        return None
+    return tree["statements"][0]
+
+
+def _walk(node: Any) -> Iterator[dict]:
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value)
+
+
+def parse_expression(conn: duckdb.DuckDBPyConnection, expression: str) -> dict:
+    """Árvore sintática de uma expressão SQL isolada. Lança duckdb.ParserException se for inválida."""
+    tree = json.loads(conn.execute("SELECT json_serialize_sql(?)", [f"SELECT {expression}"]).fetchone()[0])
+    if tree.get("error"):
+        raise duckdb.ParserException(tree.get("error_message", expression))
+    return tree["statements"][0]["node"]["select_list"][0]
+
+
+def expression_children(node: Any) -> Iterator[Tuple[Any, Any]]:
+    """
+    (contêiner, chave) de cada subexpressão direta de uma expressão parseada,
+    para substituí-la no lugar; inclui as que ficam em estruturas auxiliares
+    (ex.: os WHEN/THEN de um CASE).
+    """
+    items = node.items() if isinstance(node, dict) else enumerate(node)
+    for key, value in items:
+        if isinstance(value, dict) and "class" in value:
+            yield node, key
+        elif isinstance(value, (dict, list)):
+            yield from expression_children(value)
+
+
+def deserialize_select(conn: duckdb.DuckDBPyConnection, statement: dict) -> str:
+    """SQL de uma instrução parseada por parse_select (possivelmente alterada)."""
+    serialized = json.dumps({"error": False, "statements": [statement]})
+    return conn.execute("SELECT json_deserialize_sql(?::JSON)", [serialized]).fetchone()[0]
+
+
+def aggregate_functions(conn: duckdb.DuckDBPyConnection) -> Set[str]:
+    """Nomes (em minúsculas) de todas as funções de agregação do DuckDB."""
+    return {name for (name,) in conn.execute(
+        "SELECT DISTINCT lower(function_name) FROM duckdb_functions() WHERE function_type = 'aggregate'"
+    ).fetchall()} | {"count_star"}
+
+
+def extract_read_tables(tree: dict) -> Set[str]:
+    """Tabelas base referenciadas por um SELECT já parseado (sem nomes de CTEs)."""
+    tables: Set[str] = set()
+    cte_names: Set[str] = set()
+    for node in _walk(tree):
+        if node.get("type") == "BASE_TABLE" and "table_name" in node:
+            tables.add(node["table_name"].lower())
+        cte_map = node.get("cte_map")
+        if isinstance(cte_map, dict):
+            cte_names.update(entry["key"].lower() for entry in cte_map.get("map", []))
+    return tables - cte_names
+
+
+def is_deterministic(tree: dict) -> bool:
+    """
+    Indica se um SELECT parseado sempre retorna o mesmo resultado para o mesmo
+    estado das tabelas: sem funções voláteis, SAMPLE ou table functions
+    (read_csv, read_parquet...), cujo conteúdo pode mudar fora do banco.
+    """
+    for node in _walk(tree):
+        if node.get("class") == "FUNCTION" and node.get("function_name", "").lower() in NON_DETERMINISTIC_FUNCTIONS:
+            return False
+        if node.get("type") == "TABLE_FUNCTION":
+            return False
+        if node.get("sample"):
+            return False
+    return True
+
+
+def strip_literals(sql: str) -> str:
+    """Remove literais de texto e comentários, mantendo os identificadores entre aspas."""
+    return _SQL_LITERAL_PATTERN.sub(lambda match: match.group(1) or " ", sql)
+
+
+def extract_written_tables(sql: str) -> Set[str]:
+    """Tabelas/views alvo de comandos de escrita (CREATE, INSERT, UPDATE, DELETE, DROP, ALTER...)."""
+    return {unqualify(name) for name in _WRITE_TARGET_PATTERN.findall(strip_literals(sql))}
+
+
+def extract_ddl_tables(sql: str) -> Set[str]:
+    """Tabelas/views cujo esquema é criado, alterado ou removido (CREATE, ALTER, DROP)."""
+    return {unqualify(name) for name in _DDL_TARGET_PATTERN.findall(strip_literals(sql))}
@@ -0,0 +1,436 @@
+"""
+DuckDB Embedded Analytics Engine - Ingestão Contínua de Arquivos
+
+Acompanha arquivos JSONL/CSV que crescem continuamente (coletores de eventos
+que só fazem append) e carrega apenas as linhas novas: para cada arquivo é
+guardado o offset em bytes até onde ele já foi lido, e cada leitura parte
+dali, até o último fim de linha completo (uma linha ainda sendo escrita fica
+para a próxima leitura). As linhas novas são convertidas em tabelas Arrow
+pelos parsers do PyArrow, acumuladas em memória e gravadas em lotes (por
+quantidade de linhas ou por tempo); o lote e os novos offsets (tabela
+__stream_offsets) são gravados na mesma transação, então uma reinicialização
+retoma exatamente de onde parou, sem duplicar nem perder linhas.
+
+Arquivos truncados ou substituídos (rotação de logs: o arquivo encolheu ou é
+outro inode) são relidos desde o início.
+"""
+
+import glob
+import io
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import duckdb
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+
+OFFSETS_TABLE = "__stream_offsets"
+STREAM_STAGING_VIEW = "__stream_batch"
+SOURCE_FILE_COLUMN = "_source_file"
+STREAM_FORMATS = {"json": (".json", ".jsonl", ".ndjson"), "csv": (".csv", ".tsv", ".txt")}
+# Erros causados pelos dados de um lote (e não pelo banco): as linhas culpadas são descartadas
+_DATA_ERRORS = (duckdb.ConversionException, duckdb.ConstraintException, duckdb.InvalidInputException,
+                duckdb.OutOfRangeException)
+
+
+class TailingIngestor:
+    """
+    Ingestão contínua de file_path (arquivo, glob ou lista deles, reavaliados
+    a cada leitura para achar arquivos novos) na tabela table_name de uma
+    instância de DuckDBAnalytics.
+
+    start() lê os arquivos a cada poll_interval segundos em uma thread em
+    segundo plano e grava um lote quando há batch_rows linhas acumuladas ou
+    quando a linha mais antiga do buffer espera há flush_interval segundos;
+    poll() e flush() fazem o mesmo passo a passo. metrics() informa o atraso
+    (bytes ainda não gravados e idade do buffer) e a vazão. A tabela é criada
+    no primeiro lote, com os tipos inferidos do primeiro trecho lido, se ainda
+    não existir (crie-a antes para fixar os tipos); cada linha leva a coluna
+    _source_file (se a tabela já existir sem ela, a coluna não é gravada).
+
+    As linhas novas são convertidas para os tipos das colunas da tabela;
+    colunas que ela não tem são ignoradas. Linhas que não podem ser
+    convertidas (JSON inválido, "abc" ou 1.5 em uma coluna inteira) ou que o
+    banco rejeita (restrições) são descartadas e contadas em parse_errors, sem
+    impedir a gravação das demais.
+    """
+    def __init__(self, analytics: Any, file_path: Union[str, Sequence[str]], table_name: str,
+                 file_format: Optional[str] = None, batch_rows: int = 50_000, flush_interval: float = 1.0,
+                 poll_interval: float = 0.2, max_read_bytes: int = 64 * 1024 * 1024):
+        patterns = [file_path] if isinstance(file_path, str) else list(file_path)
+        file_format = file_format or next(
+            (name for name, extensions in STREAM_FORMATS.items() if patterns and patterns[0].lower().endswith(extensions)),
+            None,
+        )
+        if file_format not in STREAM_FORMATS:
+            raise ValueError(f"Formato de arquivo não suportado para ingestão contínua: {file_format or patterns[:1]}. "
+                             f"Use um de {tuple(STREAM_FORMATS)}")
+        self.analytics = analytics
+        self.patterns = patterns
+        self.table_name = table_name
+        self.file_format = file_format
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.max_read_bytes = max_read_bytes
+        # Por arquivo: file_id (dispositivo:inode), offset lido, offset gravado e cabeçalho CSV
+        self._files: Optional[Dict[str, Dict[str, Any]]] = None
+        self._buffer: List[pa.Table] = []
+        self._buffered_rows = 0
+        self._buffered_since: Optional[float] = None
+        self._schema: Optional[pa.Schema] = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = time.time()
+        self._stats = {
+            "rows_read": 0, "rows_written": 0, "bytes_read": 0, "batches": 0, "parse_errors": 0,
+            "flush_errors": 0, "last_flush_at": None, "last_batch_rows": 0, "last_batch_seconds": 0.0,
+        }
+
+    def __enter__(self) -> "TailingIngestor":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Inicia a leitura contínua em segundo plano."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"duckdb-tail-{self.table_name}", daemon=True)
+        self._thread.start()
+        print(f"✓ Ingestão contínua de {self.patterns} em '{self.table_name}' iniciada.")
+
+    def stop(self, flush: bool = True):
+        """Para a leitura contínua e, com flush=True, grava o que estiver no buffer."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            if thread is not threading.current_thread():
+                thread.join()
+        if flush:
+            self.flush()
+        if thread is not None:
+            print(f"✓ Ingestão contínua em '{self.table_name}' encerrada ({self._stats['rows_written']} linhas gravadas).")
+
+    def poll(self) -> int:
+        """
+        Lê as linhas completas acrescentadas aos arquivos desde a última leitura
+        e as coloca no buffer (gravando um lote se batch_rows for atingido).
+        Retorna a quantidade de linhas lidas.
+        """
+        rows = 0
+        with self._lock:
+            files = self._load_offsets()
+            for path in self._resolve():
+                chunk = self._read_new_lines(path, files, self._target_schema())
+                if chunk is not None and chunk.num_rows:
+                    self._buffer.append(chunk)
+                    self._buffered_rows += chunk.num_rows
+                    self._buffered_since = self._buffered_since or time.time()
+                    rows += chunk.num_rows
+            self._stats["rows_read"] += rows
+            if self._buffered_rows >= self.batch_rows:
+                self.flush()
+        return rows
+
+    def flush(self) -> int:
+        """
+        Grava o buffer na tabela e os offsets lidos em __stream_offsets, em uma
+        única transação. Se o banco rejeitar o lote por causa dos dados, as
+        linhas rejeitadas são localizadas (por bissecção, em transações
+        desfeitas em seguida), descartadas e contadas em parse_errors, e as
+        demais são gravadas. Retorna as linhas gravadas (0 se o buffer estiver
+        vazio ou a gravação falhar por outro motivo; nesse caso o buffer é
+        mantido para a próxima tentativa).
+        """
+        with self._lock:
+            files = self._load_offsets()
+            pending = [path for path, state in files.items() if state["read_offset"] != state["offset"]]
+            if not self._buffer and not pending:
+                return 0
+            start = time.perf_counter()
+            batch = pa.concat_tables(self._buffer, promote_options="permissive") if self._buffer else None
+            try:
+                with self.analytics.cursor(query_class="batch") as conn:
+                    try:
+                        created = self._write_batch(conn, batch, files, pending)
+                    except _DATA_ERRORS as e:
+                        accepted = self._accepted_rows(conn, batch)
+                        rejected = batch.num_rows - accepted.num_rows
+                        self._stats["parse_errors"] += rejected
+                        print(f"✗ {rejected} linha(s) rejeitada(s) pelo banco descartada(s) em '{self.table_name}': {e}")
+                        batch = accepted
+                        created = self._write_batch(conn, batch, files, pending)
+            except (duckdb.Error, pa.ArrowException) as e:
+                self._stats["flush_errors"] += 1
+                print(f"✗ Erro ao gravar lote da ingestão contínua em '{self.table_name}': {e}")
+                return 0
+            for path in pending:
+                files[path]["offset"] = files[path]["read_offset"]
+            rows = batch.num_rows if batch is not None else 0
+            self._buffer, self._buffered_rows, self._buffered_since = [], 0, None
+            if created:
+                self._schema = None
+            seconds = time.perf_counter() - start
+            self._stats.update(
+                rows_written=self._stats["rows_written"] + rows, batches=self._stats["batches"] + 1,
+                last_flush_at=time.time(), last_batch_rows=rows, last_batch_seconds=seconds,
+            )
+        if created:
+            self.analytics._update_metadata(self.table_name, "table", f"Ingestão contínua: {', '.join(self.patterns)}")
+        if rows:
+            self.analytics._bump_table_versions([self.table_name])
+            self.analytics._refresh_derived_tables(self.table_name)
+        return rows
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Métricas da ingestão: linhas lidas e gravadas, lotes, erros de parse
+        (linhas descartadas por não caberem na tabela), atraso (lag_bytes: bytes dos
+        arquivos ainda não gravados na tabela; lag_seconds: há quanto tempo a
+        linha mais antiga do buffer espera), vazão média (rows_per_second) e do
+        último lote, e os offsets por arquivo.
+        """
+        with self._lock:
+            files = self._files or {}
+            lag_bytes, offsets = 0, {}
+            for path, state in files.items():
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    size = state["offset"]
+                lag_bytes += max(0, size - state["offset"])
+                offsets[path] = {"offset": state["offset"], "size": size}
+            elapsed = time.time() - self._started_at
+            return {
+                **self._stats,
+                "running": self.running,
+                "buffered_rows": self._buffered_rows,
+                "lag_bytes": lag_bytes,
+                "lag_seconds": time.time() - self._buffered_since if self._buffered_since else 0.0,
+                "rows_per_second": self._stats["rows_written"] / elapsed if elapsed > 0 else 0.0,
+                "last_batch_rows_per_second": (self._stats["last_batch_rows"] / self._stats["last_batch_seconds"]
+                                               if self._stats["last_batch_seconds"] else 0.0),
+                "files": offsets,
+            }
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                rows = self.poll()
+                if self._buffered_since and time.time() - self._buffered_since >= self.flush_interval:
+                    self.flush()
+            except (duckdb.Error, pa.ArrowException, OSError) as e:
+                print(f"✗ Erro na ingestão contínua em '{self.table_name}': {e}")
+                rows = 0
+            if not rows:
+                self._stop.wait(self.poll_interval)
+
+    def _resolve(self) -> List[str]:
+        paths = []
+        for pattern in self.patterns:
+            matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+            paths.extend(os.path.abspath(path) for path in matches if os.path.isfile(path))
+        return list(dict.fromkeys(paths))
+
+    def _load_offsets(self) -> Dict[str, Dict[str, Any]]:
+        """Offsets gravados de table_name (lidos do banco na primeira chamada)."""
+        if self._files is not None:
+            return self._files
+        files = {}
+        with self.analytics.cursor() as conn:
+            exists = conn.execute(
+                "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = ? AND database_name = current_database()",
+                [OFFSETS_TABLE],
+            ).fetchone()[0]
+            if exists:
+                for path, file_id, offset, header in conn.execute(
+                    f"SELECT file_path, file_id, byte_offset, header FROM {OFFSETS_TABLE} WHERE table_name = ?",
+                    [self.table_name],
+                ).fetchall():
+                    files[path] = {"file_id": file_id, "offset": offset, "read_offset": offset,
+                                   "header": header.encode() if header is not None else None}
+        self._files = files
+        return files
+
+    def _target_schema(self) -> Optional[pa.Schema]:
+        """
+        Tipos para os quais as linhas novas são convertidas: os da tabela, se
+        ela já existir, ou os do primeiro trecho do buffer (que a criará).
+        """
+        if self._schema is None:
+            with self.analytics.cursor() as conn:
+                if self._table_exists(conn):
+                    self._schema = conn.execute(f"SELECT * FROM {self.table_name} LIMIT 0").fetch_record_batch().schema
+        schema = self._schema or (self._buffer[0].schema if self._buffer else None)
+        if schema is None:
+            return None
+        # Colunas só com nulos no primeiro trecho ficam como texto
+        return pa.schema([pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                          for field in schema if field.name != SOURCE_FILE_COLUMN])
+
+    def _table_exists(self, conn: duckdb.DuckDBPyConnection) -> bool:
+        return bool(conn.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE lower(table_name) = lower(?) AND database_name = current_database()",
+            [self.table_name],
+        ).fetchone()[0])
+
+    def _read_new_lines(self, path: str, files: Dict[str, Dict[str, Any]],
+                        schema: Optional[pa.Schema]) -> Optional[pa.Table]:
+        """Lê e converte as linhas completas de path a partir do offset lido; avança o offset."""
+        try:
+            stat = os.stat(path)
+            state = files.get(path)
+            file_id = f"{stat.st_dev}:{stat.st_ino}"
+            if state is None or state["file_id"] != file_id or stat.st_size < state["read_offset"]:
+                # Arquivo novo, truncado ou substituído: relido desde o início
+                state = files[path] = {"file_id": file_id, "offset": 0, "read_offset": 0, "header": None}
+            if stat.st_size == state["read_offset"]:
+                return None
+            with open(path, "rb") as handle:
+                handle.seek(state["read_offset"])
+                data = handle.read(self.max_read_bytes)
+        except OSError as e:
+            print(f"✗ Erro ao ler '{path}': {e}")
+            return None
+        end = data.rfind(b"\n")
+        if end < 0:
+            return None
+        data = data[:end + 1]
+        start_offset = state["read_offset"]
+        state["read_offset"] += len(data)
+        self._stats["bytes_read"] += len(data)
+        header = b""
+        if self.file_format == "csv":
+            if state["header"] is None:
+                header_end = data.find(b"\n")
+                state["header"], data = data[:header_end + 1], data[header_end + 1:]
+            header = state["header"]
+        if not data.strip():
+            return None
+        try:
+            table = self._parse(header + data, schema)
+        except pa.ArrowInvalid:
+            # Alguma linha não é válida ou não cabe nos tipos: converte linha a linha e descarta as inválidas
+            tables, errors = [], 0
+            for line in data.splitlines(keepends=True):
+                if not line.strip():
+                    continue
+                try:
+                    tables.append(self._parse(header + line, schema))
+                    # Sem a tabela, a primeira linha válida define os tipos das seguintes
+                    schema = schema or tables[0].schema
+                except pa.ArrowInvalid:
+                    errors += 1
+            self._stats["parse_errors"] += errors
+            print(f"✗ {errors} linha(s) inválida(s) descartada(s) em '{path}' (a partir do byte {start_offset}).")
+            table = pa.concat_tables(tables, promote_options="permissive") if tables else None
+        if table is None or not table.num_rows:
+            return None
+        return table.append_column(SOURCE_FILE_COLUMN, pa.array([path] * table.num_rows, pa.string()))
+
+    def _parse(self, data: bytes, schema: Optional[pa.Schema]) -> pa.Table:
+        """
+        Converte linhas JSON/CSV em uma tabela Arrow com as colunas e os tipos de
+        schema (se houver). Lança ArrowInvalid se algum valor não puder ser convertido.
+        """
+        if self.file_format == "csv":
+            options = pa_csv.ConvertOptions()
+            if schema is not None:
+                options = pa_csv.ConvertOptions(column_types={field.name: field.type for field in schema},
+                                                include_columns=schema.names, include_missing_columns=True)
+            return pa_csv.read_csv(io.BytesIO(data), convert_options=options)
+        table = pa_json.read_json(io.BytesIO(data))
+        if schema is None:
+            return table
+        # safe=True: 1.5 em uma coluna inteira é um erro, não um arredondamento
+        return pa.table([
+            table[field.name].cast(field.type, safe=True) if field.name in table.column_names
+            else pa.nulls(table.num_rows, field.type)
+            for field in schema
+        ], schema=schema)
+
+    def _insert(self, conn: duckdb.DuckDBPyConnection, batch: pa.Table) -> bool:
+        """
+        Insere batch na tabela, criando-a se não existir (a coluna _source_file
+        só é gravada se a tabela a tiver); retorna se ela foi criada.
+        """
+        conn.register(STREAM_STAGING_VIEW, batch)
+        try:
+            created = not self._table_exists(conn)
+            if created:
+                conn.execute(f"CREATE TABLE {self.table_name} AS SELECT * FROM {STREAM_STAGING_VIEW} LIMIT 0")
+            columns = "*"
+            if not created and SOURCE_FILE_COLUMN not in conn.execute(
+                f"SELECT * FROM {self.table_name} LIMIT 0"
+            ).fetch_record_batch().schema.names:
+                columns = f"* EXCLUDE ({SOURCE_FILE_COLUMN})"
+            conn.execute(f"INSERT INTO {self.table_name} BY NAME SELECT {columns} FROM {STREAM_STAGING_VIEW}")
+        finally:
+            conn.unregister(STREAM_STAGING_VIEW)
+        return created
+
+    def _accepted_rows(self, conn: duckdb.DuckDBPyConnection, batch: pa.Table) -> pa.Table:
+        """
+        Linhas de batch que o banco aceita, na ordem original (as demais são
+        descartadas). Cada parte é testada junto com as já aceitas, para
+        detectar também conflitos entre linhas do próprio lote (chave duplicada).
+        """
+
+        def accepted(part: pa.Table) -> bool:
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                self._insert(conn, part)
+                return True
+            except _DATA_ERRORS:
+                return False
+            finally:
+                conn.execute("ROLLBACK")
+
+        parts, pending = [], [batch]
+        while pending:
+            part = pending.pop()
+            if accepted(pa.concat_tables([*parts, part])):
+                parts.append(part)
+            elif part.num_rows > 1:
+                half = part.num_rows // 2
+                pending += [part.slice(half), part.slice(0, half)]
+        return pa.concat_tables(parts) if parts else batch.slice(0, 0)
+
+    def _write_batch(self, conn: duckdb.DuckDBPyConnection, batch: Optional[pa.Table],
+                     files: Dict[str, Dict[str, Any]], pending: List[str]) -> bool:
+        """Insere o lote e grava os offsets em uma transação; retorna se a tabela foi criada."""
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {OFFSETS_TABLE} (
+                table_name VARCHAR, file_path VARCHAR, file_id VARCHAR, byte_offset BIGINT, header VARCHAR,
+                updated_at TIMESTAMP, PRIMARY KEY (table_name, file_path)
+            )
+        """)
+        created = False
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            if batch is not None:
+                created = self._insert(conn, batch)
+            for path in pending:
+                state = files[path]
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {OFFSETS_TABLE} VALUES (?, ?, ?, ?, ?, now()::TIMESTAMP)",
+                    [self.table_name, path, state["file_id"], state["read_offset"],
+                     state["header"].decode() if state["header"] is not None else None],
+                )
+            conn.execute("COMMIT")
+        except (duckdb.Error, pa.ArrowException):
+            conn.execute("ROLLBACK")
+            raise
+        return created
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import asyncio
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from async_analytics import AsyncDuckDBAnalytics
+
+
+class TestAsyncDuckDBAnalytics(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.test_data_dir = "test_data_async"
+        os.makedirs(self.test_data_dir, exist_ok=True)
+        self.sample_csv_path = os.path.join(self.test_data_dir, "sales.csv")
+        with open(self.sample_csv_path, "w") as f:
+            f.write("transaction_id,product,amount\n")
+            f.write("1,Laptop,1200.00\n")
+            f.write("2,Mouse,25.00\n")
+        self.analytics = AsyncDuckDBAnalytics(max_workers=2)
+        await self.analytics.connect()
+
+    async def asyncTearDown(self):
+        await self.analytics.disconnect()
+        for f in os.listdir(self.test_data_dir):
+            os.remove(os.path.join(self.test_data_dir, f))
+        os.rmdir(self.test_data_dir)
+
+    async def test_ingest_fetch_and_export(self):
+        self.assertTrue(await self.analytics.ingest_csv(self.sample_csv_path, "sales"))
+        df = await self.analytics.fetch_data("SELECT SUM(amount) AS total FROM sales")
+        self.assertEqual(df["total"].iloc[0], 1225.00)
+        output_file = os.path.join(self.test_data_dir, "out.csv")
+        self.assertTrue(await self.analytics.export_to_csv("SELECT * FROM sales", output_file))
+        self.assertTrue(os.path.exists(output_file))
+        self.assertIn("sales", self.analytics.list_metadata())
+
+    async def test_concurrent_queries(self):
+        results = await asyncio.gather(*[
+            self.analytics.execute_query(f"SELECT {i} * 2") for i in range(20)
+        ])
+        self.assertEqual([r[0][0] for r in results], [i * 2 for i in range(20)])
+        results = await asyncio.gather(*[
+            self.analytics.execute_query("SELECT ? * 3", [i]) for i in range(20)
+        ])
+        self.assertEqual([r[0][0] for r in results], [i * 3 for i in range(20)])
+
+    async def test_cancellation_interrupts_query(self):
+        task = asyncio.create_task(self.analytics.execute_query("SELECT COUNT(*) FROM range(100000000000) t1"))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        # A thread de trabalho é liberada rapidamente porque a query foi interrompida
+        deadline = time.monotonic() + 5
+        while self.analytics.analytics.pool.stats()["in_use"] and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self.assertEqual(self.analytics.analytics.pool.stats()["in_use"], 0)
+        self.assertEqual((await self.analytics.execute_query("SELECT 42"))[0][0], 42)
+
+    async def test_async_iteration_over_batches(self):
+        total = 0
+        async for batch in self.analytics.fetch_record_batches("SELECT * FROM range(1000) t(i)", batch_size=100):
+            self.assertLessEqual(batch.num_rows, 100)
+            total += batch.num_rows
+        self.assertEqual(total, 1000)
+        chunks = [c async for c in self.analytics.fetch_data_chunks("SELECT * FROM range(250) t(i)", chunk_size=100)]
+        self.assertEqual([len(c) for c in chunks], [100, 100, 50])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+from connection_pool import PoolTimeoutError
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_analytics_pool.duckdb"
+        self.analytics = DuckDBAnalytics(self.test_db_path, pool_size=4, pool_timeout=5.0)
+        self.analytics.connect()
+        self.analytics.create_table_from_query(
+            "sales", "SELECT range AS id, range % 10 AS category, range * 1.5 AS amount FROM range(10000)"
+        )
+
+    def tearDown(self):
+        self.analytics.disconnect()
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+        if os.path.exists(f"{self.test_db_path}.wal"):
+            os.remove(f"{self.test_db_path}.wal")
+
+    def test_concurrent_fetch_data_stress(self):
+        def query(i):
+            category = i % 10
+            df = self.analytics.fetch_data(f"SELECT COUNT(*) AS n, SUM(id) AS s FROM sales WHERE category = {category}")
+            return category, int(df["n"].iloc[0]), int(df["s"].iloc[0])
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(query, range(400)))
+
+        self.assertEqual(len(results), 400)
+        for category, n, s in results:
+            self.assertEqual(n, 1000)
+            self.assertEqual(s, sum(range(category, 10000, 10)))
+        stats = self.analytics.pool.stats()
+        self.assertLessEqual(stats["created"], 4)
+        self.assertEqual(stats["in_use"], 0)
+
+    def test_concurrent_reads_and_writes(self):
+        def work(i):
+            if i % 10 == 0:
+                return self.analytics.create_table_from_query(f"part_{i}", f"SELECT * FROM sales WHERE category = {i % 10}")
+            return len(self.analytics.fetch_data("SELECT * FROM sales WHERE id < 100")) == 100
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            self.assertTrue(all(executor.map(work, range(100))))
+
+    def test_registered_dataframe_visible_in_all_cursors(self):
+        df = pd.DataFrame({"category": range(10), "label": [f"c{i}" for i in range(10)]})
+        self.assertTrue(self.analytics.ingest_dataframe(df, "labels"))
+
+        def query(i):
+            return self.analytics.execute_query(f"SELECT label FROM labels WHERE category = {i % 10}")[0][0]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(query, range(40)))
+        self.assertEqual(results, [f"c{i % 10}" for i in range(40)])
+        self.assertEqual(self.analytics.pool.stats()["created"], 4)
+
+    def test_acquire_timeout(self):
+        analytics = DuckDBAnalytics(pool_size=1, pool_timeout=0.05)
+        analytics.connect()
+        results = {}
+        with analytics.cursor():
+            def other_thread():
+                try:
+                    with analytics.pool.acquire():
+                        results["acquired"] = True
+                except PoolTimeoutError:
+                    results["timeout"] = True
+                results["fetch_empty"] = analytics.fetch_data("SELECT 1 AS x").empty
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+        self.assertTrue(results.get("timeout"))
+        self.assertTrue(results["fetch_empty"])
+        # Cursor devolvido: novas aquisições funcionam
+        self.assertEqual(analytics.fetch_data("SELECT 1 AS x")["x"].iloc[0], 1)
+        analytics.disconnect()
+
+    def test_nested_acquire_reuses_thread_cursor(self):
+        with self.analytics.cursor() as outer:
+            with self.analytics.cursor() as inner:
+                self.assertIs(outer, inner)
+            # Métodos chamados com um cursor já emprestado não bloqueiam
+            self.assertEqual(self.analytics.execute_query("SELECT COUNT(*) FROM sales")[0][0], 10000)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
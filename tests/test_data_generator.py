@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import shutil
+import duckdb
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_generator import DEFAULT_END_DATE, SyntheticDataGenerator
+
+
+class TestSyntheticDataGenerator(unittest.TestCase):
+    def setUp(self):
+        self.conn = duckdb.connect()
+        self.output_dir = "test_generated_data"
+        self.generator = SyntheticDataGenerator(self.conn, 200, 20, 5000, seed=7, vocabulary_size=50,
+                                                end_date=date(2025, 6, 30))
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_tables_match_generate_data_schema(self):
+        report = self.generator.to_tables(table_names={"sales": "transactions"}, batch_size=1500)
+        self.assertEqual({table: step["rows"] for table, step in report.items()},
+                         {"customers": 200, "products": 20, "sales": 5000})
+        columns = self.conn.execute(
+            "SELECT list(column_name ORDER BY column_index) FROM duckdb_columns() WHERE table_name = 'transactions'"
+        ).fetchone()[0]
+        self.assertEqual(columns, ["transaction_id", "customer_id", "product_id", "quantity", "amount", "sale_date", "region"])
+        # Todas as vendas referenciam clientes e produtos existentes, sem ids repetidos entre lotes
+        self.assertEqual(self.conn.execute("""
+            SELECT COUNT(DISTINCT t.transaction_id), COUNT(c.customer_id), COUNT(p.product_id),
+                   MIN(t.sale_date), MAX(t.sale_date), MIN(t.quantity), MAX(t.quantity)
+            FROM transactions t
+            LEFT JOIN customers c USING (customer_id)
+            LEFT JOIN products p USING (product_id)
+        """).fetchone(), (5000, 5000, 5000, "2024-06-30", "2025-06-30", 1, 5))
+
+    def test_same_seed_is_reproducible_across_batch_sizes(self):
+        query = "SELECT * FROM sales ORDER BY transaction_id"
+        self.generator.to_tables(batch_size=5000)
+        first = self.conn.execute(query).fetchall()
+        self.generator.to_tables(batch_size=999)
+        self.assertEqual(self.conn.execute(query).fetchall(), first)
+
+        other = SyntheticDataGenerator(self.conn, 200, 20, 5000, seed=8, vocabulary_size=50, end_date=date(2025, 6, 30))
+        other.to_tables(tables=("sales",))
+        self.assertNotEqual(self.conn.execute(query).fetchall(), first)
+        # Sem end_date, as datas não dependem do dia em que os dados são gerados
+        self.assertEqual(SyntheticDataGenerator(self.conn, seed=8, vocabulary_size=50).end_date, DEFAULT_END_DATE)
+
+    def test_to_parquet_writes_one_file_per_batch_and_partitions(self):
+        report = self.generator.to_parquet(self.output_dir, batch_size=2000, partition_by={"sales": ["region"]})
+        self.assertEqual(sorted(os.listdir(report["customers"]["path"])), ["part-00000.parquet"])
+        self.assertEqual(len(os.listdir(os.path.join(self.output_dir, "sales"))), 5)
+        self.assertEqual(self.conn.execute(
+            f"SELECT COUNT(*), COUNT(DISTINCT region) FROM read_parquet('{self.output_dir}/sales/*/*.parquet', hive_partitioning = true)"
+        ).fetchone(), (5000, 5))
+        # Uma nova geração substitui os arquivos anteriores
+        self.generator.to_parquet(self.output_dir, tables=("sales",), batch_size=5000, partition_by={"sales": ["region"]})
+        self.assertEqual(self.conn.execute(
+            f"SELECT COUNT(*) FROM read_parquet('{self.output_dir}/sales/*/*.parquet')"
+        ).fetchone()[0], 5000)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -4,6 +4,7 @@ import sys
 import os
 import duckdb
 import pandas as pd
+import pyarrow as pa
 import json
 
 # Adicionar o diretório src ao path para importar os módulos
@@ -70,6 +71,94 @@ class TestDuckDBAnalytics(unittest.TestCase):
         self.assertEqual(len(data), 1)
         self.assertEqual(data['product'].iloc[0], 'Laptop')
 
+    def test_fetch_arrow(self):
+        table = self.analytics.fetch_arrow("SELECT * FROM sales_initial ORDER BY transaction_id")
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column("product").to_pylist(), ["Laptop", "Mouse", "Keyboard"])
+        self.assertEqual(self.analytics.fetch_arrow("SELECT * FROM missing_table").num_rows, 0)
+
+    def test_fetch_record_batches(self):
+        reader = self.analytics.fetch_record_batches("SELECT * FROM range(10) t(i)", batch_size=4)
+        # Outras queries na mesma instância não interrompem o stream
+        self.analytics.execute_query("SELECT COUNT(*) FROM sales_initial")
+        batches = list(reader)
+        self.assertEqual(sum(b.num_rows for b in batches), 10)
+        self.assertTrue(all(b.num_rows <= 4 for b in batches))
+        self.assertIsNone(self.analytics.fetch_record_batches("SELECT * FROM missing_table"))
+
+    def test_fetch_data_chunks(self):
+        chunks = list(self.analytics.fetch_data_chunks("SELECT * FROM range(25) t(i)", chunk_size=10))
+        self.assertEqual([len(c) for c in chunks], [10, 10, 5])
+        self.assertEqual(chunks[-1]["i"].iloc[-1], 24)
+        self.assertEqual(list(self.analytics.fetch_data_chunks("SELECT * FROM missing_table")), [])
+
+    def test_fetch_data_chunks_early_termination(self):
+        chunks = self.analytics.fetch_data_chunks("SELECT * FROM range(100000000) t(i)", chunk_size=1000)
+        first = next(chunks)
+        chunks.close()  # cancela a query em andamento
+        self.assertEqual(len(first), 1000)
+        self.assertEqual(self.analytics.execute_query("SELECT COUNT(*) FROM sales_initial")[0][0], 3)
+
+    def test_parameterized_queries(self):
+        data = self.analytics.fetch_data("SELECT * FROM sales_initial WHERE customer_id = ? AND amount > ?", ["C001", 100])
+        self.assertEqual(data['product'].tolist(), ['Laptop'])
+        rows = self.analytics.execute_query("SELECT product FROM sales_initial WHERE product = $name", {"name": "Mouse"})
+        self.assertEqual(rows, [('Mouse',)])
+        # Valores são sempre tratados como dados, nunca como SQL
+        self.assertEqual(self.analytics.execute_query("SELECT * FROM sales_initial WHERE product = ?", ["x' OR '1'='1"]), [])
+        for customer_id in ["C001", "C002", "C001"]:
+            self.analytics.fetch_data("SELECT * FROM sales_initial WHERE customer_id = ?", [customer_id])
+        stats = self.analytics.prepared_statement_stats()
+        self.assertEqual(stats["statements"], 4)
+        self.assertEqual(stats["hits"], 2)
+        # Espaços dentro de literais são preservados na instrução preparada
+        self.assertEqual(self.analytics.fetch_data("SELECT 'x  y' AS s, ? AS p", [1])["s"].iloc[0], "x  y")
+        self.assertEqual(self.analytics.execute_query("SELECT ? || '  z'", ["a"]), [("a  z",)])
+        # Os valores usam o binding nativo, inclusive tipos sem literal SQL
+        self.assertEqual(self.analytics.execute_query("SELECT list_sum(?)", [[1, 2, 3]]), [(6,)])
+        self.assertEqual(self.analytics.prepared_statement_stats()["fallbacks"], 0)
+
+    def test_prepared_statement_cache_eviction(self):
+        analytics = DuckDBAnalytics(max_prepared_statements=2)
+        for i in range(4):
+            self.assertEqual(analytics.execute_query(f"SELECT ? + {i}", [1])[0][0], 1 + i)
+        stats = analytics.prepared_statement_stats()
+        self.assertEqual(stats["statements"], 2)
+        self.assertEqual(stats["evictions"], 2)
+        analytics.disconnect()
+
+    def test_executemany(self):
+        self.assertTrue(self.analytics.executemany(
+            "INSERT INTO sales_initial VALUES (?, ?, ?, ?, ?)",
+            [(10 + i, "Cable", 5.0, "C004", "2025-02-01") for i in range(5)]
+        ))
+        self.assertEqual(self.analytics.execute_query("SELECT COUNT(*) FROM sales_initial")[0][0], 8)
+        self.assertFalse(self.analytics.executemany("INSERT INTO missing_table VALUES (?)", [(1,)]))
+
+    def test_query_profiling(self):
+        self.assertEqual(self.analytics.query_profiles(), [])
+        self.analytics.set_profiling(True)
+        query = "SELECT customer_id, SUM(amount) AS total FROM sales_initial GROUP BY customer_id"
+        self.assertEqual(len(self.analytics.fetch_data(query)), 2)
+        self.analytics.execute_query("SELECT COUNT(*) FROM range(100000) a JOIN range(10) b ON a.range = b.range")
+
+        profiles = self.analytics.query_profiles()
+        self.assertEqual([p["method"] for p in profiles], ["fetch_data", "execute_query"])
+        self.assertEqual(profiles[0]["rows_returned"], 2)
+        self.assertGreaterEqual(profiles[0]["fetch_seconds"], 0)
+        operator_types = [node["type"] for node in profiles[1]["plan"][0]["children"]]
+        self.assertTrue(operator_types)
+        slowest = self.analytics.slowest_operators(limit=3)
+        self.assertEqual(len(slowest), 3)
+        self.assertGreaterEqual(slowest[0]["timing"], slowest[-1]["timing"])
+        self.assertIn("HASH_GROUP_BY", self.analytics.query_plan(query, as_text=True))
+        self.assertIn("HASH_JOIN", self.analytics.explain_analyze(
+            "SELECT COUNT(*) FROM range(1000) a JOIN range(10) b ON a.range = b.range"))
+
+        self.analytics.set_profiling(False)
+        self.analytics.execute_query("SELECT 1")
+        self.assertEqual(len(self.analytics.query_profiles()), 2)
+
     def test_create_table_from_query(self):
         self.assertTrue(self.analytics.create_table_from_query("high_value_sales", "SELECT * FROM sales_initial WHERE amount > 100"))
         result = self.analytics.fetch_data("SELECT COUNT(*) as count FROM high_value_sales")
@@ -108,12 +197,305 @@ class TestDuckDBAnalytics(unittest.TestCase):
         self.assertEqual(result['count'].iloc[0], 2)
         self.assertIn("customers_table", self.analytics.list_metadata())
 
+    def test_ingest_csv_glob_with_schema_unification(self):
+        for i, header in enumerate(["id,item,price", "price,id,item,discount"]):
+            with open(os.path.join(self.test_data_dir, f"shard_{i}.csv"), "w") as f:
+                f.write(header + "\n")
+                values = {"id": str(i), "item": "Book", "price": "20.00", "discount": "0.5"}
+                for _ in range(i + 1):
+                    f.write(",".join(values[c] for c in header.split(",")) + "\n")
+        pattern = os.path.join(self.test_data_dir, "shard_*.csv")
+        self.assertTrue(self.analytics.ingest_csv(pattern, "shards", threads=2))
+        result = self.analytics.fetch_data("SELECT COUNT(*) AS n, COUNT(discount) AS with_discount FROM shards")
+        self.assertEqual(result['n'].iloc[0], 3)
+        self.assertEqual(result['with_discount'].iloc[0], 2)
+        self.assertNotIn("_source_file", dict(self.analytics.get_table_schema("shards")))
+        report = self.analytics.last_ingest_report
+        self.assertEqual(report["file_count"], 2)
+        self.assertEqual([f["rows"] for f in report["files"]], [1, 2])
+        self.assertEqual(report["total_rows"], 3)
+        self.assertGreater(report["rows_per_second"], 0)
+        self.assertEqual(self.analytics.list_metadata()["shards"]["last_ingest"], report)
+
+    def test_ingest_parquet_hive_partitioned_directory(self):
+        for year in (2024, 2025):
+            partition_dir = os.path.join(self.test_data_dir, "hive", f"year={year}")
+            os.makedirs(partition_dir)
+            pd.DataFrame({"product_id": ["P1", "P2"], "amount": [10.0, 20.0]}).to_parquet(
+                os.path.join(partition_dir, "part-0.parquet"), index=False
+            )
+        self.assertTrue(self.analytics.ingest_parquet(os.path.join(self.test_data_dir, "hive"), "partitioned",
+                                                      hive_partitioning=True))
+        result = self.analytics.fetch_data("SELECT year, SUM(amount) AS total FROM partitioned GROUP BY year ORDER BY year")
+        self.assertEqual(result['year'].tolist(), [2024, 2025])
+        self.assertEqual(result['total'].tolist(), [30.0, 30.0])
+        for year in (2024, 2025):
+            partition_dir = os.path.join(self.test_data_dir, "hive", f"year={year}")
+            os.remove(os.path.join(partition_dir, "part-0.parquet"))
+            os.rmdir(partition_dir)
+        os.rmdir(os.path.join(self.test_data_dir, "hive"))
+
+    def test_ingest_file_list_append_and_missing_file(self):
+        self.assertTrue(self.analytics.ingest_csv([self.sample_csv_path, self.sample_csv_path], "sales_initial",
+                                                  create_table=False))
+        self.assertEqual(self.analytics.execute_query("SELECT COUNT(*) FROM sales_initial")[0][0], 6)
+        self.assertFalse(self.analytics.ingest_csv([self.sample_csv_path, "missing.csv"], "sales_initial"))
+        self.assertFalse(self.analytics.ingest_json(os.path.join(self.test_data_dir, "*.nothing"), "empty"))
+
+    def test_ingest_incremental_ledger(self):
+        first = os.path.join(self.test_data_dir, "inc_a.csv")
+        second = os.path.join(self.test_data_dir, "inc_b.csv")
+        with open(first, "w") as f:
+            f.write("id,amount\n1,10\n2,20\n")
+        pattern = os.path.join(self.test_data_dir, "inc_*.csv")
+        count = "SELECT COUNT(*), SUM(amount) FROM incremental"
+
+        self.assertTrue(self.analytics.ingest_csv(pattern, "incremental", incremental=True))
+        self.assertEqual(self.analytics.execute_query(count)[0], (2, 30))
+        # Nova execução sem mudanças não recarrega nada
+        self.assertTrue(self.analytics.ingest_csv(pattern, "incremental", incremental=True))
+        self.assertEqual(self.analytics.last_ingest_report["file_count"], 0)
+        self.assertEqual(self.analytics.execute_query(count)[0], (2, 30))
+
+        # Arquivo novo é anexado; arquivo apenas "tocado" (mesmo conteúdo) não é recarregado
+        with open(second, "w") as f:
+            f.write("id,amount\n3,30\n")
+        os.utime(first, (0, 0))
+        self.assertTrue(self.analytics.ingest_csv(pattern, "incremental", incremental=True))
+        self.assertEqual(self.analytics.last_ingest_report["file_count"], 1)
+        self.assertEqual(self.analytics.execute_query(count)[0], (3, 60))
+
+        # Arquivo alterado substitui apenas as próprias linhas
+        with open(first, "w") as f:
+            f.write("id,amount\n1,100\n")
+        self.assertTrue(self.analytics.ingest_csv(pattern, "incremental", incremental=True))
+        self.assertEqual(self.analytics.execute_query(count)[0], (2, 130))
+        ledger = self.analytics.execute_query(
+            "SELECT file_path, row_count FROM __ingest_ledger WHERE table_name = 'incremental' ORDER BY file_path"
+        )
+        self.assertEqual(ledger, [(os.path.abspath(first), 1), (os.path.abspath(second), 1)])
+
+        # Tabelas criadas sem incremental não têm a coluna de origem
+        self.assertFalse(self.analytics.ingest_csv(pattern, "sales_initial", incremental=True))
+
+    def test_clustered_ingest_recluster_and_pruning_report(self):
+        # Datas fora de ordem: sem cluster, um filtro de um mês lê todos os row groups
+        unordered_path = os.path.join(self.test_data_dir, "unordered.parquet")
+        self.analytics.execute_query(
+            "COPY (SELECT range AS id, DATE '2024-01-01' + (hash(range) % 365)::INTEGER AS sale_date "
+            f"FROM range(600000)) TO '{unordered_path}' (FORMAT parquet)"
+        )
+        predicate = "sale_date BETWEEN DATE '2024-03-01' AND DATE '2024-03-31'"
+        self.assertTrue(self.analytics.ingest_parquet(unordered_path, "unclustered"))
+        self.assertTrue(self.analytics.ingest_parquet(unordered_path, "clustered", cluster_by=["sale_date"]))
+        before = self.analytics.pruning_report("unclustered", predicate)
+        after = self.analytics.pruning_report("clustered", predicate)
+        self.assertEqual(before["matching_rows"], after["matching_rows"])
+        self.assertEqual(before["rows_scanned"], before["total_rows"])
+        self.assertLess(after["rows_scanned"], before["rows_scanned"] / 2)
+        self.assertLess(after["row_groups_scanned"], after["row_groups"])
+        self.assertEqual(after["cluster_by"], ["sale_date"])
+        # Tabela com chave primária é reclusterizada no lugar, preservando a restrição
+        self.analytics.execute_query("CREATE TABLE keyed (id BIGINT PRIMARY KEY, sale_date DATE)")
+        self.analytics.execute_query("INSERT INTO keyed SELECT * FROM unclustered")
+        self.assertTrue(self.analytics.recluster_table("keyed", ["sale_date"]))
+        self.assertLess(self.analytics.pruning_report("keyed", predicate)["rows_scanned"], before["rows_scanned"] / 2)
+        with self.assertRaises(duckdb.ConstraintException):
+            self.analytics.conn.execute("INSERT INTO keyed VALUES (0, DATE '2024-01-01')")
+        self.assertTrue(self.analytics.analyze_table("keyed"))
+        self.assertFalse(self.analytics.recluster_table("missing", ["sale_date"]))
+        self.assertEqual(self.analytics.pruning_report("missing", predicate), {})
+
+    def test_ingest_dataframe_and_register_arrow(self):
+        df = pd.DataFrame({"id": [1, 2, 3], "score": [0.5, 1.5, 2.0]})
+        self.assertTrue(self.analytics.ingest_dataframe(df, "features"))
+        self.assertEqual(self.analytics.execute_query("SELECT SUM(score) FROM features")[0][0], 4.0)
+        self.assertEqual(self.analytics.list_metadata()["features"]["type"], "view")
+        self.assertEqual(dict(self.analytics.get_table_schema("features"))["score"], "DOUBLE")
+        total = sum(len(c) for c in self.analytics.fetch_data_chunks("SELECT * FROM features", chunk_size=2))
+        self.assertEqual(total, 3)
+
+        table = pa.table({"id": [1, 2], "label": ["a", "b"]})
+        self.assertTrue(self.analytics.register_arrow(table.to_reader(), "labels"))
+        self.assertEqual(self.analytics.list_metadata()["labels"]["type"], "table")
+        result = self.analytics.fetch_data("SELECT label FROM features JOIN labels USING (id) ORDER BY id")
+        self.assertEqual(result["label"].tolist(), ["a", "b"])
+
+        self.assertTrue(self.analytics.ingest_dataframe(df, "features", materialize=True))
+        self.assertEqual(self.analytics.execute_query(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'features' AND NOT temporary")[0][0], 1)
+        self.assertEqual(self.analytics.execute_query("SELECT SUM(score) FROM features")[0][0], 4.0)
+        self.assertFalse(self.analytics.unregister("features"))
+
+        self.assertTrue(self.analytics.register_arrow(table, "arrow_view"))
+        self.assertTrue(self.analytics.unregister("arrow_view"))
+        self.assertNotIn("arrow_view", self.analytics.list_metadata())
+        self.assertIsNone(self.analytics.execute_query("SELECT * FROM arrow_view"))
+
     def test_create_view(self):
         self.assertTrue(self.analytics.create_view("product_summary", "SELECT product, SUM(amount) as total_amount FROM sales_initial GROUP BY product"))
         result = self.analytics.fetch_data("SELECT * FROM product_summary")
         self.assertEqual(len(result), 3)
         self.assertIn("product_summary", self.analytics.list_metadata())
 
+    def test_materialized_view_incremental_refresh(self):
+        self.assertTrue(self.analytics.create_materialized_view(
+            "sales_by_customer", source_table="sales_initial", group_by=["customer_id"],
+            aggregates={"total": "SUM(amount)", "n": "COUNT(*)", "biggest": "MAX(amount)", "smallest": "MIN(amount)"},
+        ))
+        self.assertEqual(self.analytics.list_metadata()["sales_by_customer"]["materialized"]["dependencies"], ["sales_initial"])
+        self.assertFalse(self.analytics.materialized_view_status("sales_by_customer")["stale"])
+
+        self.analytics.execute_query("INSERT INTO sales_initial VALUES (4, 'Monitor', 300.0, 'C001', '2025-01-04'), "
+                                     "(5, 'Cable', 5.0, 'C003', '2025-01-05')")
+        status = self.analytics.materialized_view_status("sales_by_customer")
+        self.assertTrue(status["stale"])
+        self.assertEqual(status["pending_rows"], 2)
+
+        self.assertTrue(self.analytics.refresh_materialized_view("sales_by_customer"))
+        status = self.analytics.materialized_view_status("sales_by_customer")
+        self.assertEqual((status["stale"], status["refresh_mode"]), (False, "incremental"))
+        query = "SELECT customer_id, total, n, biggest, smallest FROM {} ORDER BY customer_id"
+        expected = self.analytics.execute_query(query.format(
+            "(SELECT customer_id, SUM(amount) AS total, COUNT(*) AS n, MAX(amount) AS biggest, "
+            "MIN(amount) AS smallest FROM sales_initial GROUP BY customer_id)"
+        ))
+        self.assertEqual(self.analytics.execute_query(query.format("sales_by_customer")), expected)
+
+        # Linhas removidas da fonte forçam um refresh completo
+        self.analytics.execute_query("DELETE FROM sales_initial WHERE customer_id = 'C003'")
+        self.assertTrue(self.analytics.refresh_materialized_view("sales_by_customer"))
+        self.assertEqual(self.analytics.materialized_view_status("sales_by_customer")["refresh_mode"], "full")
+        self.assertEqual(len(self.analytics.execute_query("SELECT * FROM sales_by_customer")), 2)
+
+        # Fonte recriada com pelo menos as mesmas linhas: também exige refresh completo
+        self.analytics.execute_query("CREATE OR REPLACE TABLE sales_initial AS SELECT * REPLACE (amount * 10 AS amount) "
+                                     "FROM sales_initial UNION ALL SELECT 6, 'Dock', 80.0, 'C002', '2025-01-06'")
+        self.assertTrue(self.analytics.refresh_materialized_view("sales_by_customer"))
+        self.assertEqual(self.analytics.materialized_view_status("sales_by_customer")["refresh_mode"], "full")
+        self.assertEqual(self.analytics.execute_query(
+            "SELECT customer_id, total FROM sales_by_customer ORDER BY customer_id"
+        ), [("C001", 15750.0), ("C002", 330.0)])
+
+    def test_compound_aggregates_are_fully_recomputed(self):
+        aggregates = {"spread": "MAX(amount) - MIN(amount)", "average": "SUM(amount) / COUNT(*)",
+                      "buyers": "COUNT(DISTINCT product)", "big": "SUM(amount) FILTER (WHERE amount > 100)"}
+        for name, expression in aggregates.items():
+            self.assertTrue(self.analytics.create_materialized_view(
+                f"mv_{name}", source_table="sales_initial", group_by=["customer_id"], aggregates={name: expression},
+            ))
+        self.analytics.execute_query("INSERT INTO sales_initial VALUES (4, 'Monitor', 300.0, 'C001', '2025-01-04'), "
+                                     "(5, 'Laptop', 150.0, 'C002', '2025-01-05')")
+        for name, expression in aggregates.items():
+            self.assertTrue(self.analytics.refresh_materialized_view(f"mv_{name}"))
+            self.assertEqual(self.analytics.materialized_view_status(f"mv_{name}")["refresh_mode"], "full")
+            self.assertEqual(
+                self.analytics.execute_query(f"SELECT customer_id, {name} FROM mv_{name} ORDER BY customer_id"),
+                self.analytics.execute_query(f"SELECT customer_id, {expression} FROM sales_initial "
+                                             "GROUP BY customer_id ORDER BY customer_id"),
+            )
+
+    def test_materialized_view_from_query(self):
+        self.assertTrue(self.analytics.create_materialized_view(
+            "avg_amount", "SELECT product, AVG(amount) AS avg_amount FROM sales_initial GROUP BY product"
+        ))
+        self.analytics.ingest_csv(self.sample_csv_path, "sales_initial", create_table=False)
+        status = self.analytics.materialized_view_status("avg_amount")
+        self.assertEqual((status["stale"], status["changed_tables"], status["incremental"]), (True, ["sales_initial"], False))
+        self.assertTrue(self.analytics.refresh_materialized_view("avg_amount"))
+        self.assertFalse(self.analytics.materialized_view_status("avg_amount")["stale"])
+        self.assertFalse(self.analytics.refresh_materialized_view("missing_view"))
+        self.assertFalse(self.analytics.create_materialized_view("invalid", source_table="sales_initial"))
+
+    def test_rollup_routing_and_refresh_on_ingest(self):
+        self.analytics.execute_query(
+            "CREATE TABLE facts AS SELECT 'cat' || (range % 3) AS category, 'city' || (range % 4) AS city, "
+            "(range % 10)::DECIMAL(10, 2) AS amount FROM range(1000)"
+        )
+        self.assertTrue(self.analytics.create_rollup("facts_by_category_city", "facts", ["category", "city"], ["amount"]))
+        self.assertTrue(self.analytics.create_rollup("facts_by_category", "facts", ["category"], ["amount"]))
+        self.assertFalse(self.analytics.create_rollup("invalid", "facts", ["lower(city)"], ["amount"]))
+        query = ("SELECT category, SUM(amount) AS total, COUNT(*), AVG(amount) AS mean FROM facts "
+                 "WHERE city <> 'city0' GROUP BY category ORDER BY category")
+        # O filtro usa city: só o rollup por categoria e cidade responde
+        self.assertEqual(self.analytics.rollup_for(query)["rollup"], "facts_by_category_city")
+        self.assertEqual(self.analytics.rollup_for("SELECT SUM(amount) FROM facts")["rollup"], "facts_by_category")
+        self.assertEqual(self.analytics.rollup_for("SELECT category, MEDIAN(amount) FROM facts GROUP BY 1"), {})
+        self.assertEqual(self.analytics.rollup_for("SELECT amount, COUNT(*) FROM facts GROUP BY 1"), {})
+        routed = self.analytics.fetch_data(query)
+        self.analytics.rollup_routing = False
+        expected = self.analytics.fetch_data(query)
+        self.analytics.rollup_routing = True
+        pd.testing.assert_frame_equal(routed, expected)
+        self.assertEqual(self.analytics.list_rollups()["facts_by_category_city"]["routed_queries"], 1)
+        # Escritas fora da ingestão deixam o rollup desatualizado; a ingestão o atualiza
+        self.analytics.execute_query("INSERT INTO facts VALUES ('cat0', 'city1', 100)")
+        self.assertFalse(self.analytics.list_rollups()["facts_by_category"]["fresh"])
+        self.assertEqual(self.analytics.rollup_for(query), {})
+        csv_path = os.path.join(self.test_data_dir, "more_facts.csv")
+        with open(csv_path, "w") as f:
+            f.write("category,city,amount\ncat1,city2,50.00\n")
+        self.assertTrue(self.analytics.ingest_csv(csv_path, "facts", create_table=False))
+        self.assertTrue(all(rollup["fresh"] for rollup in self.analytics.list_rollups().values()))
+        self.assertEqual(self.analytics.fetch_data("SELECT SUM(amount) AS total FROM facts")["total"][0], 4650)
+        self.assertEqual(self.analytics.list_rollups()["facts_by_category"]["routed_queries"], 1)
+
+    def test_rollup_full_refresh_when_source_is_replaced(self):
+        csv_path = os.path.join(self.test_data_dir, "categories.csv")
+        with open(csv_path, "w") as f:
+            f.write("category,amount\na,1\nb,2\n")
+        self.assertTrue(self.analytics.ingest_csv(csv_path, "category_sales"))
+        self.assertTrue(self.analytics.create_rollup("category_totals", "category_sales", ["category"], ["amount"]))
+        # Recarga com create_table=True substitui a tabela com mais linhas do que antes
+        with open(csv_path, "w") as f:
+            f.write("category,amount\na,100\nb,200\nc,300\n")
+        self.assertTrue(self.analytics.ingest_csv(csv_path, "category_sales"))
+        query = "SELECT category, SUM(amount) AS total FROM category_sales GROUP BY category ORDER BY category"
+        self.assertEqual(self.analytics.rollup_for(query)["rollup"], "category_totals")
+        self.assertEqual(self.analytics.fetch_data(query)["total"].tolist(), [100, 200, 300])
+        # Reclusterizar regrava a tabela (novos rowids): o rollup é recalculado e continua em uso
+        self.assertTrue(self.analytics.recluster_table("category_sales", ["amount"]))
+        self.assertEqual(self.analytics.rollup_for(query)["rollup"], "category_totals")
+        self.assertEqual(self.analytics.fetch_data(query)["total"].tolist(), [100, 200, 300])
+
+    def test_fetch_approximate_with_samples_and_intervals(self):
+        self.analytics.execute_query(
+            "CREATE TABLE events AS SELECT range AS id, CASE WHEN range % 500 = 0 THEN 'rare' ELSE 'common' END AS kind, "
+            "(range % 100)::DOUBLE AS value FROM range(200000)"
+        )
+        query = "SELECT kind, SUM(value) AS total, COUNT(*) AS n, AVG(value) AS mean FROM events GROUP BY kind ORDER BY kind"
+        exact = self.analytics.fetch_data(query)
+        approximate = self.analytics.fetch_approximate(query, method="bernoulli", sample_percent=10, confidence=0.999, seed=7)
+        info = approximate.attrs["approximate"]
+        self.assertEqual((info["mode"], info["method"], info["source_rows"]), ("sample", "bernoulli", 200000))
+        self.assertEqual(info["intervals"]["total"], ("total_low", "total_high"))
+        for column in ("total", "n", "mean"):
+            for row in range(2):
+                self.assertLessEqual(approximate[f"{column}_low"][row], exact[column][row])
+                self.assertGreaterEqual(approximate[f"{column}_high"][row], exact[column][row])
+        # Amostra estratificada: estratos pequenos entram inteiros, então a contagem de 'rare' é exata
+        self.assertTrue(self.analytics.create_sample("events", ["kind"], rows_per_stratum=2000))
+        stratified = self.analytics.fetch_data(query, approximate=True)
+        self.assertEqual(stratified.attrs["approximate"]["method"], "stratified")
+        self.assertEqual(stratified["n"].tolist()[1], 400)
+        self.assertAlmostEqual(stratified["n"].tolist()[0], 199600, delta=199600 * 0.05)
+        # Escritas deixam a amostra desatualizada; a ingestão a recria
+        self.analytics.execute_query("INSERT INTO events VALUES (200000, 'rare', 1)")
+        self.assertEqual(self.analytics.fetch_approximate(query).attrs["approximate"]["method"], "system")
+        csv_path = os.path.join(self.test_data_dir, "more_events.csv")
+        with open(csv_path, "w") as f:
+            f.write("id,kind,value\n200001,rare,2\n")
+        self.assertTrue(self.analytics.ingest_csv(csv_path, "events", create_table=False))
+        stratified = self.analytics.fetch_approximate(query, method="stratified")
+        self.assertEqual(stratified["n"].tolist()[1], 402)
+        # COUNT(DISTINCT) roda na tabela inteira com HyperLogLog; consultas sem agregados, de forma exata
+        distinct = self.analytics.fetch_approximate("SELECT COUNT(DISTINCT id % 100) AS d, MEDIAN(value) AS m FROM events")
+        self.assertEqual(distinct.attrs["approximate"]["mode"], "approx_functions")
+        self.assertAlmostEqual(distinct["d"][0], 100, delta=10)
+        rows = self.analytics.fetch_approximate("SELECT * FROM events LIMIT 3")
+        self.assertEqual((len(rows), rows.attrs["approximate"]["mode"]), (3, "exact"))
+        self.assertTrue(self.analytics.fetch_approximate(query, method="invalid").empty)
+
     def test_export_to_csv(self):
         output_file = os.path.join(self.test_data_dir, "exported_sales.csv")
         self.assertTrue(self.analytics.export_to_csv("SELECT * FROM sales_initial", output_file))
@@ -122,6 +504,36 @@ class TestDuckDBAnalytics(unittest.TestCase):
             lines = f.readlines()
             self.assertEqual(len(lines), 4) # Header + 3 rows
 
+    def test_export_to_parquet(self):
+        output_file = os.path.join(self.test_data_dir, "exported_sales.parquet")
+        report = self.analytics.export_to_parquet("SELECT * FROM sales_initial", output_file,
+                                                  compression="snappy", row_group_size=2)
+        self.assertEqual((report["file_count"], report["total_rows"]), (1, 3))
+        self.assertEqual(report["total_bytes"], os.path.getsize(output_file))
+        self.assertEqual(pd.read_parquet(output_file)["product"].tolist(), ["Laptop", "Mouse", "Keyboard"])
+
+        partitioned = os.path.join(self.test_data_dir, "by_customer")
+        report = self.analytics.export_to_parquet("SELECT * FROM sales_initial", partitioned, partition_by=["customer_id"])
+        self.assertEqual(sorted(f["partition"]["customer_id"] for f in report["files"]), ["C001", "C002"])
+        self.assertEqual(sorted(os.listdir(partitioned)), ["customer_id=C001", "customer_id=C002"])
+        self.assertTrue(self.analytics.ingest_parquet(partitioned, "reloaded", hive_partitioning=True))
+        self.assertEqual(self.analytics.execute_query("SELECT COUNT(*) FROM reloaded WHERE customer_id = 'C001'")[0][0], 2)
+        for f in report["files"]:
+            os.remove(f["path"])
+            os.rmdir(os.path.dirname(f["path"]))
+        os.rmdir(partitioned)
+
+        self.assertIsNone(self.analytics.export_to_parquet("SELECT * FROM missing_table", output_file))
+
+    def test_export_to_arrow_ipc(self):
+        output_file = os.path.join(self.test_data_dir, "exported_sales.feather")
+        report = self.analytics.export_to_arrow_ipc("SELECT * FROM range(10) t(i)", output_file,
+                                                    compression="lz4", batch_size=3)
+        self.assertEqual(report["total_rows"], 10)
+        table = pa.ipc.open_file(output_file).read_all()
+        self.assertEqual(table.column("i").to_pylist(), list(range(10)))
+        self.assertIsNone(self.analytics.export_to_arrow_ipc("SELECT * FROM missing_table", output_file))
+
     def test_run_sql_script(self):
         script_path = os.path.join(self.test_data_dir, "test_script.sql")
         with open(script_path, "w") as f:
@@ -133,6 +545,51 @@ class TestDuckDBAnalytics(unittest.TestCase):
         # Script execution doesn't update metadata automatically
         # Just verify the table exists and has data
 
+    def test_run_sql_script_parallel_dag_and_resume(self):
+        script_path = os.path.join(self.test_data_dir, "dag_script.sql")
+        self.analytics.create_table_from_query("base", "SELECT range AS x FROM range(100)")
+        with open(script_path, "w") as f:
+            f.write("CREATE TABLE evens AS SELECT x FROM base WHERE x % 2 = 0;\n")
+            f.write("CREATE TABLE odds AS SELECT x FROM base WHERE x % 2 = 1;\n")
+            f.write("CREATE TABLE broken AS SELECT * FROM not_there;\n")
+            f.write("CREATE TABLE broken_total AS SELECT COUNT(*) AS n FROM broken;\n")
+            f.write("CREATE TABLE total AS SELECT COUNT(*) AS n FROM (SELECT * FROM evens UNION ALL SELECT * FROM odds);\n")
+            f.write("INSERT INTO base VALUES (100);\n")
+
+        self.assertFalse(self.analytics.run_sql_script(script_path, max_workers=4))
+        report = self.analytics.last_script_report
+        self.assertEqual([s["status"] for s in report["statements"]], ["ok", "ok", "failed", "blocked", "ok", "ok"])
+        self.assertEqual([s["depends_on"] for s in report["statements"]], [[], [], [], [2], [0, 1], [0, 1]])
+        self.assertIn("not_there", report["statements"][2]["error"])
+        self.assertEqual(self.analytics.execute_query("SELECT n FROM total"), [(100,)])
+
+        # Após corrigir a causa, resume executa apenas o que faltou
+        self.analytics.create_table_from_query("not_there", "SELECT 1 AS y")
+        self.assertTrue(self.analytics.run_sql_script(script_path, resume=True))
+        self.assertEqual([s["status"] for s in self.analytics.last_script_report["statements"]],
+                         ["resumed", "resumed", "ok", "ok", "resumed", "resumed"])
+        self.assertEqual(self.analytics.execute_query("SELECT COUNT(*) FROM base"), [(101,)])
+
+    def test_run_sql_script_with_transaction_runs_sequentially(self):
+        script_path = os.path.join(self.test_data_dir, "transaction_script.sql")
+        with open(script_path, "w") as f:
+            f.write("CREATE TABLE ledger_a (v INTEGER);\n")
+            f.write("BEGIN TRANSACTION;\n")
+            f.write("INSERT INTO ledger_a VALUES (1);\n")
+            f.write("INSERT INTO ledger_a VALUES ('x');\n")
+            f.write("COMMIT;\n")
+        self.assertFalse(self.analytics.run_sql_script(script_path))
+        self.assertEqual(self.analytics.last_script_report["max_workers"], 1)
+        self.assertEqual(self.analytics.execute_query("SELECT COUNT(*) FROM ledger_a"), [(0,)])
+        # A transação foi desfeita: o resume recomeça do BEGIN
+        with open(script_path, "w") as f:
+            f.write("CREATE TABLE ledger_a (v INTEGER);\nBEGIN TRANSACTION;\nINSERT INTO ledger_a VALUES (1);\n"
+                    "INSERT INTO ledger_a VALUES (2);\nCOMMIT;\n")
+        self.assertTrue(self.analytics.run_sql_script(script_path, resume=True))
+        self.assertEqual([s["status"] for s in self.analytics.last_script_report["statements"]],
+                         ["resumed", "ok", "ok", "ok", "ok"])
+        self.assertEqual(self.analytics.execute_query("SELECT SUM(v) FROM ledger_a"), [(3,)])
+
     def test_vacuum_database(self):
         self.assertTrue(self.analytics.vacuum_database())
         # Não há um resultado direto para verificar, mas a execução sem erro é o suficiente
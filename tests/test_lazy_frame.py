@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import duckdb
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+
+
+class TestLazyFrame(unittest.TestCase):
+    def setUp(self):
+        self.analytics = DuckDBAnalytics(pool_size=2)
+        self.analytics.connect()
+        self.analytics.execute_query(
+            "CREATE TABLE sales AS SELECT range AS id, range % 10 AS customer_id, (range % 7)::DOUBLE AS amount, "
+            "'c' || (range % 3) AS category FROM range(1000)"
+        )
+        self.analytics.execute_query(
+            "CREATE TABLE customers AS SELECT range AS customer_id, 'city' || (range % 4) AS city FROM range(10)"
+        )
+
+    def tearDown(self):
+        self.analytics.disconnect()
+
+    def test_pipeline_runs_as_a_single_query(self):
+        self.analytics.ingest_dataframe(pd.DataFrame({"category": ["c0", "c1"], "label": ["zero", "one"]}), "labels")
+        frame = (
+            self.analytics.lazy("sales")
+            .filter("amount > 1")
+            .join(self.analytics.lazy("customers"), ["customer_id"], how="left")
+            .aggregate({"total": "SUM(amount)", "n": "COUNT(*)"}, group_by=["category", "city"])
+            .window("rank() OVER (PARTITION BY category ORDER BY total DESC) AS position")
+            .filter("position <= 2")
+            .join("labels", ["category"])
+            .order_by("category", "position")
+        )
+        self.assertEqual(frame.columns, ["category", "city", "total", "n", "position", "label"])
+        # Nada foi materializado: uma única query, com o filtro aplicado na leitura
+        self.assertEqual(frame.sql().upper().count("CREATE"), 0)
+        self.assertIn("SEQ_SCAN", frame.explain())
+        expected = self.analytics.fetch_data("""
+            SELECT * FROM (
+                SELECT category, city, SUM(amount) AS total, COUNT(*) AS n,
+                       rank() OVER (PARTITION BY category ORDER BY SUM(amount) DESC) AS position
+                FROM sales LEFT JOIN customers USING (customer_id) WHERE amount > 1 GROUP BY category, city
+            ) JOIN labels USING (category) WHERE position <= 2 ORDER BY category, position
+        """)
+        pd.testing.assert_frame_equal(frame.to_df(), expected)
+        self.assertEqual(frame.to_arrow().num_rows, 4)
+
+    def test_terminal_operations_and_errors(self):
+        frame = self.analytics.lazy("SELECT * FROM sales").filter("category = 'c1'").select("id", "amount")
+        self.assertTrue(frame.to_table("c1_sales"))
+        self.assertEqual(self.analytics.execute_query("SELECT COUNT(*) FROM c1_sales"), [(333,)])
+        output_path = "lazy_frame_test.parquet"
+        try:
+            report = frame.to_parquet(output_path)
+            self.assertEqual(report["total_rows"], 333)
+        finally:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+        renamed = self.analytics.lazy("sales").alias("s").join(
+            self.analytics.lazy("customers").alias("c"), "s.customer_id = c.customer_id AND c.city = 'city0'", how="semi"
+        )
+        self.assertEqual(renamed.to_df()["customer_id"].isin([0, 4, 8]).all(), True)
+        with self.assertRaises(duckdb.BinderException):
+            self.analytics.lazy("sales").filter("missing_column > 1")
+        with self.assertRaises(ValueError):
+            self.analytics.lazy("sales").join("customers", ["customer_id"], how="sideways")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+
+
+class TestMetadataCatalog(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_analytics_catalog.duckdb"
+        self.analytics = DuckDBAnalytics(self.test_db_path)
+        self.analytics.connect()
+        self.analytics.create_table_from_query("sales", "SELECT range AS id, (range * 2.5)::DOUBLE AS amount FROM range(1000)")
+        self.analytics.create_view("big_sales", "SELECT * FROM sales WHERE amount > 100")
+
+    def tearDown(self):
+        self.analytics.disconnect()
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+        if os.path.exists(f"{self.test_db_path}.wal"):
+            os.remove(f"{self.test_db_path}.wal")
+
+    def stored(self, name):
+        return self.analytics.execute_query(
+            "SELECT schema, row_count FROM __analytics_catalog WHERE name = ?", [name]
+        )
+
+    def test_schema_is_loaded_lazily_and_cached(self):
+        # Nada é introspectado na criação
+        self.assertEqual(self.stored("sales"), [(None, None)])
+        metadata = self.analytics.list_metadata()
+        self.assertEqual(metadata["sales"]["schema"], [("id", "BIGINT"), ("amount", "DOUBLE")])
+        self.assertEqual(metadata["sales"]["row_count"], 1000)
+        self.assertEqual(metadata["big_sales"]["type"], "view")
+        self.assertIsNotNone(self.stored("sales")[0][0])
+
+    def test_catalog_persists_across_restarts(self):
+        self.analytics.list_metadata()
+        self.analytics.disconnect()
+        reopened = DuckDBAnalytics(self.test_db_path)
+        reopened.connect()
+        try:
+            metadata = reopened.list_metadata()
+            self.assertEqual(set(metadata), {"sales", "big_sales"})
+            self.assertEqual(metadata["sales"]["source"], "SELECT range AS id, (range * 2.5)::DOUBLE AS amount FROM range(1000)")
+            self.assertEqual(metadata["sales"]["row_count"], 1000)
+        finally:
+            reopened.disconnect()
+        self.analytics.connect()
+
+    def test_writes_invalidate_stats_and_ddl_invalidates_schema(self):
+        self.analytics.list_metadata()
+        self.analytics.execute_query("INSERT INTO sales VALUES (1000, 1.5)")
+        schema, row_count = self.stored("sales")[0]
+        self.assertIsNotNone(schema)
+        self.assertIsNone(row_count)
+        self.assertEqual(self.analytics.list_metadata()["sales"]["row_count"], 1001)
+
+        self.analytics.execute_query("ALTER TABLE sales ADD COLUMN region VARCHAR")
+        self.assertEqual(self.stored("sales"), [(None, None)])
+        self.assertEqual(self.analytics.get_table_schema("sales")[-1], ("region", "VARCHAR"))
+
+        # Objetos removidos saem do catálogo
+        self.analytics.execute_query("DROP VIEW big_sales")
+        self.assertNotIn("big_sales", self.analytics.list_metadata())
+        self.assertEqual(self.stored("big_sales"), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+from process_pool import ProcessPoolAnalytics
+
+
+def digit_sum(df: pd.DataFrame) -> int:
+    """Pós-processamento em Python puro (limitado pelo GIL)."""
+    return int(df["id"].map(lambda value: sum(int(digit) for digit in str(value * 7919))).sum())
+
+
+def summarize(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby("part", as_index=False)["amount"].sum()
+
+
+class TestProcessPoolAnalytics(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db_path = os.path.join(tempfile.mkdtemp(), "process_pool.duckdb")
+        analytics = DuckDBAnalytics(cls.db_path)
+        analytics.connect()
+        analytics.create_table_from_query(
+            "sales", "SELECT range AS id, range % 4 AS part, range * 0.5 AS amount FROM range(40000)"
+        )
+        analytics.disconnect()
+
+    @classmethod
+    def tearDownClass(cls):
+        if os.path.exists(cls.db_path):
+            os.remove(cls.db_path)
+
+    def test_read_only_mode(self):
+        readers = [DuckDBAnalytics(self.db_path, read_only=True) for _ in range(2)]
+        for reader in readers:
+            reader.connect()
+        try:
+            self.assertEqual(readers[1].execute_query("SELECT COUNT(*) FROM sales"), [(40000,)])
+            self.assertIsNone(readers[0].execute_query("CREATE TABLE other AS SELECT 1"))
+        finally:
+            for reader in readers:
+                reader.disconnect()
+
+    def test_map_and_submit_match_serial_results(self):
+        tasks = [("SELECT * FROM sales WHERE part = ?", [part]) for part in range(4)]
+        reader = DuckDBAnalytics(self.db_path, read_only=True)
+        reader.connect()
+        serial = [digit_sum(reader.fetch_data(query, params)) for query, params in tasks]
+        reader.disconnect()
+        with ProcessPoolAnalytics(self.db_path, max_workers=2) as pool:
+            self.assertEqual(pool.map(tasks, digit_sum), serial)
+            summary = pool.submit("SELECT * FROM sales", transform=summarize).result()
+            self.assertIsInstance(summary, pd.DataFrame)
+            self.assertEqual(summary["amount"].sum(), sum(range(40000)) * 0.5)
+            self.assertEqual(pool.submit("SELECT * FROM sales", as_arrow=True).result().num_rows, 40000)
+            self.assertTrue(pool.submit("SELECT * FROM missing_table").result().empty)
+        with self.assertRaises(ValueError):
+            ProcessPoolAnalytics(":memory:")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
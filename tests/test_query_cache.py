@@ -0,0 +1,116 @@
+import unittest
+import sys
+import os
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+from query_cache import QueryCache
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_lru_eviction_by_bytes(self):
+        cache = QueryCache(max_bytes=100)
+        cache.put("a", "x", ["t1"], size_bytes=40)
+        cache.put("b", "y", ["t1"], size_bytes=40)
+        cache.get("a")  # "a" passa a ser o mais recente
+        cache.put("c", "z", ["t2"], size_bytes=40)
+        self.assertEqual(cache.get("a"), "x")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertFalse(cache.put("big", "w", ["t3"], size_bytes=1000))
+
+    def test_ttl_expiration(self):
+        cache = QueryCache(max_bytes=100, ttl_seconds=0.01)
+        cache.put("a", "x", ["t1"], size_bytes=1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_invalidate_only_dependent_entries(self):
+        cache = QueryCache(max_bytes=100)
+        cache.put("a", "x", ["t1"], size_bytes=1)
+        cache.put("b", "y", ["t2"], size_bytes=1)
+        self.assertEqual(cache.invalidate_tables(["t1"]), 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "y")
+
+
+class TestDuckDBAnalyticsResultCache(unittest.TestCase):
+    def setUp(self):
+        self.test_data_dir = "test_data_cache"
+        os.makedirs(self.test_data_dir, exist_ok=True)
+        self.analytics = DuckDBAnalytics(enable_cache=True)
+        self.analytics.connect()
+        self.sample_csv_path = os.path.join(self.test_data_dir, "sales.csv")
+        with open(self.sample_csv_path, "w") as f:
+            f.write("transaction_id,product,amount\n")
+            f.write("1,Laptop,1200.00\n")
+            f.write("2,Mouse,25.00\n")
+        self.analytics.ingest_csv(self.sample_csv_path, "sales")
+        self.analytics.create_table_from_query("other", "SELECT 1 AS x")
+
+    def tearDown(self):
+        self.analytics.disconnect()
+        for f in os.listdir(self.test_data_dir):
+            os.remove(os.path.join(self.test_data_dir, f))
+        os.rmdir(self.test_data_dir)
+
+    def test_repeated_fetch_is_served_from_cache(self):
+        query = "SELECT product, SUM(amount) AS total FROM sales GROUP BY product ORDER BY product"
+        first = self.analytics.fetch_data(query)
+        second = self.analytics.fetch_data("  " + query.replace(" ", "  ") + ";")
+        pd.testing.assert_frame_equal(first, second)
+        stats = self.analytics.cache_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        # Mutar o resultado retornado não afeta o cache
+        second.loc[0, "total"] = -1
+        self.assertEqual(self.analytics.fetch_data(query)["total"].iloc[0], 1200.00)
+
+    def test_whitespace_inside_literals_is_part_of_the_key(self):
+        self.assertEqual(self.analytics.fetch_data("SELECT 'a  b' AS s FROM other")["s"].iloc[0], "a  b")
+        self.assertEqual(self.analytics.fetch_data("SELECT 'a b' AS s FROM other")["s"].iloc[0], "a b")
+        self.assertEqual(self.analytics.fetch_data("SELECT 'a b'  AS s -- comentário\nFROM other")["s"].iloc[0], "a b")
+        stats = self.analytics.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_ingest_invalidates_dependent_entries_only(self):
+        self.analytics.execute_query("SELECT COUNT(*) FROM sales")
+        self.analytics.execute_query("SELECT * FROM other")
+        self.assertTrue(self.analytics.ingest_csv(self.sample_csv_path, "sales", create_table=False))
+        self.assertEqual(self.analytics.execute_query("SELECT COUNT(*) FROM sales")[0][0], 4)
+        self.analytics.execute_query("SELECT * FROM other")
+        stats = self.analytics.cache_stats()
+        self.assertEqual(stats["invalidations"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_view_dependencies_and_direct_writes(self):
+        self.analytics.create_view("sales_view", "SELECT * FROM sales WHERE amount > 100")
+        self.assertEqual(len(self.analytics.fetch_data("SELECT * FROM sales_view")), 1)
+        self.analytics.execute_query("INSERT INTO sales VALUES (3, 'Monitor', 300.00)")
+        self.assertEqual(len(self.analytics.fetch_data("SELECT * FROM sales_view")), 2)
+
+    def test_write_keywords_in_literals_and_names_do_not_invalidate(self):
+        self.analytics.execute_query("SELECT COUNT(*) FROM sales")
+        self.analytics.execute_query("CREATE TABLE audit (last_update INTEGER)")
+        self.analytics.execute_query("SELECT last_update FROM audit")
+        self.analytics.execute_query("SELECT 'insert into sales' AS s -- delete from sales\nFROM other")
+        self.analytics.execute_query("SELECT COUNT(*) FROM sales")
+        self.assertEqual(self.analytics.cache_stats()["hits"], 1)
+
+    def test_non_deterministic_queries_are_not_cached(self):
+        self.analytics.fetch_data("SELECT random() AS r")
+        self.analytics.fetch_data("SELECT random() AS r")
+        self.assertEqual(self.analytics.cache_stats()["entries"], 0)
+
+    def test_cache_disabled_by_default(self):
+        analytics = DuckDBAnalytics()
+        self.assertIsNone(analytics.cache)
+        self.assertEqual(analytics.cache_stats(), {})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,140 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+from query_scheduler import AdmissionTimeoutError, QueryScheduler, UnknownQueryClassError
+
+
+class TestQueryScheduler(unittest.TestCase):
+    def hold(self, scheduler, query_class, release):
+        """Ocupa uma vaga da classe em outra thread até release ser sinalizado."""
+        admitted = threading.Event()
+
+        def run():
+            with scheduler.admit(query_class):
+                admitted.set()
+                release.wait(5)
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.assertTrue(admitted.wait(5))
+        return thread
+
+    def test_batch_cap_queue_and_timeout(self):
+        scheduler = QueryScheduler()
+        release = threading.Event()
+        holder = self.hold(scheduler, "batch", release)
+        # Interativas não são limitadas pelo batch em execução
+        with scheduler.admit("interactive"):
+            self.assertEqual(scheduler.metrics()["classes"]["interactive"]["running"], 1)
+        with self.assertRaises(AdmissionTimeoutError):
+            with scheduler.admit("batch", timeout=0.05):
+                pass
+        metrics = scheduler.metrics()["classes"]["batch"]
+        self.assertEqual((metrics["running"], metrics["queued"], metrics["timed_out"]), (1, 0, 1))
+        release.set()
+        holder.join()
+        # Chamadas aninhadas reutilizam a vaga da thread
+        with scheduler.admit("batch", timeout=0.05), scheduler.admit("batch", timeout=0.05):
+            self.assertEqual(scheduler.metrics()["running"], 1)
+
+    def test_higher_priority_is_admitted_first(self):
+        scheduler = QueryScheduler(max_concurrent_queries=1)
+        release = threading.Event()
+        holder = self.hold(scheduler, "interactive", release)
+        order = []
+
+        def queued(query_class):
+            with scheduler.admit(query_class):
+                order.append(query_class)
+        batch = threading.Thread(target=queued, args=("batch",))
+        batch.start()
+        while scheduler.metrics()["queued"] < 1:
+            time.sleep(0.005)
+        interactive = threading.Thread(target=queued, args=("interactive",))
+        interactive.start()
+        while scheduler.metrics()["queued"] < 2:
+            time.sleep(0.005)
+        release.set()
+        for thread in (holder, batch, interactive):
+            thread.join()
+        self.assertEqual(order, ["interactive", "batch"])
+        self.assertGreater(scheduler.metrics()["classes"]["batch"]["wait_max"], 0)
+
+    def test_analytics_applies_class_settings_and_reports_timeouts(self):
+        analytics = DuckDBAnalytics(enable_scheduler=True, admission_timeout=0.05, priority_classes={
+            "interactive": {"priority": 0},
+            "batch": {"priority": 1, "max_concurrent": 1, "threads": 1, "memory_limit": "512MB"},
+        })
+        analytics.connect()
+        try:
+            baseline = analytics.execute_query("SELECT current_setting('threads'), current_setting('memory_limit')")
+            with analytics.query_class("batch"):
+                self.assertEqual(analytics.execute_query("SELECT current_setting('threads')"), [(1,)])
+            self.assertEqual(
+                analytics.execute_query("SELECT current_setting('threads'), current_setting('memory_limit')"), baseline
+            )
+            release = threading.Event()
+            holder = self.hold(analytics.scheduler, "batch", release)
+            # CTAS é batch: com a vaga ocupada, esgota o timeout da fila e segue a convenção de erro
+            self.assertFalse(analytics.create_table_from_query("t", "SELECT 1 AS x"))
+            self.assertEqual(analytics.execute_query("SELECT 42"), [(42,)])
+            release.set()
+            holder.join()
+            self.assertTrue(analytics.create_table_from_query("t", "SELECT 1 AS x"))
+            self.assertEqual(analytics.scheduler_metrics()["classes"]["batch"]["timed_out"], 1)
+        finally:
+            analytics.disconnect()
+
+    def test_record_batch_reader_holds_a_slot_until_released(self):
+        analytics = DuckDBAnalytics(enable_scheduler=True, admission_timeout=0.05, priority_classes={
+            "interactive": {"priority": 0, "max_concurrent": 1},
+        })
+        analytics.connect()
+        try:
+            reader = analytics.fetch_record_batches("SELECT * FROM range(100000) t(i)", batch_size=1000)
+            self.assertEqual(reader.read_next_batch().num_rows, 1000)
+            self.assertEqual(analytics.scheduler_metrics()["running"], 1)
+            # Outra thread espera a vaga ocupada pela leitura
+            other = ThreadPoolExecutor(max_workers=1)
+            self.assertIsNone(other.submit(analytics.execute_query, "SELECT 1").result())
+            del reader
+            self.assertEqual(analytics.scheduler_metrics()["running"], 0)
+            self.assertEqual(other.submit(analytics.execute_query, "SELECT 1").result(), [(1,)])
+            # Ler até o fim também libera a vaga
+            self.assertEqual(analytics.fetch_record_batches("SELECT * FROM range(10) t(i)").read_all().num_rows, 10)
+            self.assertEqual(analytics.scheduler_metrics()["running"], 0)
+            # fetch_data_chunks também ocupa a vaga até o fim da iteração
+            chunks = analytics.fetch_data_chunks("SELECT * FROM range(100000) t(i)", chunk_size=1000)
+            self.assertEqual(len(next(chunks)), 1000)
+            self.assertEqual(analytics.scheduler_metrics()["running"], 1)
+            self.assertIsNone(other.submit(analytics.execute_query, "SELECT 1").result())
+            chunks.close()
+            self.assertEqual(analytics.scheduler_metrics()["running"], 0)
+            other.shutdown()
+        finally:
+            analytics.disconnect()
+
+    def test_unknown_query_class_is_a_duckdb_error(self):
+        with self.assertRaises(UnknownQueryClassError):
+            QueryScheduler().admit_detached("reports")
+        analytics = DuckDBAnalytics(enable_scheduler=True)
+        analytics.connect()
+        try:
+            # Os métodos tratam o erro como qualquer outra falha do DuckDB
+            with analytics.query_class("reports"):
+                self.assertIsNone(analytics.execute_query("SELECT 1"))
+                self.assertIsNone(analytics.fetch_record_batches("SELECT 1"))
+                self.assertEqual(list(analytics.fetch_data_chunks("SELECT 1")), [])
+            self.assertEqual(analytics.execute_query("SELECT 1"), [(1,)])
+        finally:
+            analytics.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+from query_server import QueryClient, QueryServer
+
+
+class TestQueryServer(unittest.TestCase):
+    def setUp(self):
+        self.analytics = DuckDBAnalytics(enable_cache=True, pool_size=4)
+        self.analytics.connect()
+        self.analytics.create_table_from_query(
+            "sales", "SELECT range AS id, range % 10 AS category, range * 1.5 AS amount FROM range(200000)"
+        )
+        self.server = QueryServer(self.analytics, port=0)
+        self.server.start()
+        self.client = QueryClient(self.server.address)
+
+    def tearDown(self):
+        self.server.stop()
+        self.analytics.disconnect()
+
+    def test_fetch_matches_local_results_and_shares_cache(self):
+        query = "SELECT category, SUM(amount) AS total, COUNT(*) AS n FROM sales WHERE id >= ? GROUP BY category ORDER BY category"
+        expected = self.analytics.fetch_data(query, [100])
+        pd.testing.assert_frame_equal(self.client.fetch_data(query, [100]), expected)
+        # Vários clientes concorrentes reutilizam o mesmo resultado em cache
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tables = list(executor.map(lambda _: self.client.fetch_arrow(query, [100]), range(16)))
+        self.assertTrue(all(table.equals(tables[0]) for table in tables))
+        self.assertGreaterEqual(self.client.stats()["cache"]["hits"], 16)
+        self.assertEqual(self.client.health()["status"], "ok")
+
+    def test_streaming_and_errors(self):
+        reader = self.client.fetch_record_batches("SELECT * FROM sales", batch_size=10_000)
+        sizes = [batch.num_rows for batch in reader]
+        self.assertEqual(sum(sizes), 200000)
+        self.assertEqual(max(sizes), 10_000)
+        self.assertTrue(self.client.fetch_data("SELECT * FROM missing_table").empty)
+        self.assertIsNone(self.client.fetch_record_batches("SELECT * FROM missing_table"))
+        # Falha no meio do stream: o cliente não recebe um resultado truncado como se fosse completo
+        reader = self.client.fetch_record_batches(
+            "SELECT CASE WHEN id > 150000 THEN error('falha') ELSE id END AS id FROM sales", batch_size=1_000
+        )
+        with self.assertRaises(Exception):
+            for _ in reader:
+                pass
+        stats = self.client.stats()["server"]
+        self.assertEqual(stats["errors"], 3)
+        self.assertEqual(stats["active"], 0)
+        self.assertEqual(QueryClient("http://127.0.0.1:1").health()["status"], "unreachable")
+
+    def test_invalid_request_options_return_errors(self):
+        analytics = DuckDBAnalytics(enable_scheduler=True)
+        analytics.connect()
+        try:
+            with QueryServer(analytics, port=0) as server:
+                client = QueryClient(server.address)
+                for options in ({"query_class": "unknown"}, {"batch_size": "many"}):
+                    with self.assertRaisesRegex(duckdb.Error, "HTTP 400"):
+                        client._request("POST", "/query", {"query": "SELECT 1", **options})
+                connection, response = client._request("POST", "/query", {"query": "SELECT 1", "query_class": "batch"})
+                response.read()
+                connection.close()
+                self.assertEqual(client.stats()["server"], {**client.stats()["server"], "errors": 2, "active": 0})
+        finally:
+            analytics.disconnect()
+
+    def test_unix_socket(self):
+        socket_path = os.path.join(tempfile.mkdtemp(), "analytics.sock")
+        with QueryServer(self.analytics, unix_socket=socket_path) as server:
+            client = QueryClient(server.address)
+            df = client.fetch_data("SELECT COUNT(*) AS n FROM sales WHERE category = $category", {"category": 3})
+            self.assertEqual(df["n"].iloc[0], 20000)
+        self.assertFalse(os.path.exists(socket_path))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
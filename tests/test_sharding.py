@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+
+
+class TestShardedTables(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.analytics = DuckDBAnalytics(os.path.join(self.directory, "coordinator.duckdb"))
+        self.analytics.connect()
+        self.reference = DuckDBAnalytics()
+        self.reference.connect()
+        self.reference.create_table_from_query(
+            "sales", "SELECT range AS id, range % 7 AS category, (range % 101) * 1.5 AS amount, "
+                     "'r' || (range % 3) AS region FROM range(60000)"
+        )
+        self.shards = [os.path.join(self.directory, f"sales_{index}.duckdb") for index in range(3)]
+
+    def tearDown(self):
+        self.analytics.disconnect()
+        self.reference.disconnect()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def assert_same_result(self, query, params=None, mode=None):
+        self.assertEqual(self.analytics.shard_plan(query, params).get("mode"), mode)
+        pd.testing.assert_frame_equal(
+            self.analytics.fetch_data(query, params), self.reference.fetch_data(query, params), check_dtype=False
+        )
+
+    def test_hash_sharding_with_partial_aggregates_and_top_n(self):
+        parquet_path = os.path.join(self.directory, "sales.parquet")
+        self.reference.export_to_parquet("SELECT * FROM sales", parquet_path)
+        self.assertTrue(self.analytics.create_sharded_table("sales", self.shards, "id"))
+        self.assertTrue(self.analytics.ingest_sharded("sales", parquet_path))
+        report = self.analytics.last_ingest_report
+        self.assertEqual(report["rows"], 60000)
+        self.assertTrue(all(rows > 15000 for rows in report["rows_per_shard"]))
+        self.assert_same_result(
+            "SELECT category, SUM(amount) AS total, COUNT(*) AS n, AVG(amount) AS mean, MIN(id) AS first, "
+            "MAX(id) AS last FROM sales WHERE region <> ? GROUP BY category ORDER BY category", ["r1"],
+            mode="partial_aggregate",
+        )
+        self.assert_same_result(
+            "SELECT region, category, SUM(amount) AS total FROM sales GROUP BY ALL "
+            "HAVING COUNT(*) > 10 ORDER BY total DESC, region LIMIT 3", mode="partial_aggregate",
+        )
+        self.assert_same_result(
+            "SELECT id, amount FROM sales WHERE category = 2 ORDER BY amount DESC, id LIMIT 5 OFFSET 2",
+            mode="scatter_gather",
+        )
+        # Sem decomposição em parciais: roda sobre a view que une os shards
+        self.assert_same_result("SELECT category, COUNT(DISTINCT region) AS regions FROM sales GROUP BY 1 ORDER BY 1")
+        self.assertEqual(self.analytics.list_metadata()["sales"]["sharded"]["rows_per_shard"], report["rows_per_shard"])
+
+    def test_range_sharding_and_reopen(self):
+        self.assertFalse(self.analytics.create_sharded_table("sales", self.shards, "id", method="range", boundaries=[10]))
+        self.assertTrue(self.analytics.create_sharded_table("sales", self.shards, "id", method="range",
+                                                            boundaries=[20000, 40000]))
+        self.assertTrue(self.analytics.ingest_sharded("sales", self.reference.fetch_data("SELECT * FROM sales")))
+        self.assertEqual(self.analytics.last_ingest_report["rows_per_shard"], [20000, 20000, 20000])
+        self.analytics.disconnect()
+        self.analytics.connect()
+        self.assert_same_result("SELECT region, AVG(amount) AS mean FROM sales GROUP BY region ORDER BY region",
+                                mode="partial_aggregate")
+        new_rows = pd.DataFrame({"id": [70000], "category": [1], "amount": [3.0], "region": ["r9"]})
+        self.assertTrue(self.analytics.ingest_sharded("sales", new_rows))
+        self.assertEqual(self.analytics.last_ingest_report["rows_per_shard"], [0, 0, 1])
+        self.assertEqual(self.analytics.fetch_data("SELECT COUNT(*) AS n FROM sales")["n"].iloc[0], 60001)
+        self.assertFalse(self.analytics.ingest_sharded("missing_table", new_rows))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
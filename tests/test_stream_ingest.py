@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duckdb_analytics import DuckDBAnalytics
+
+
+class TestTailingIngestor(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.directory, "stream.duckdb")
+        self.analytics = DuckDBAnalytics(self.db_path)
+        self.analytics.connect()
+
+    def tearDown(self):
+        self.analytics.disconnect()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def append(self, path, text):
+        with open(path, "a") as handle:
+            handle.write(text)
+
+    def count(self, table):
+        return self.analytics.execute_query(f"SELECT COUNT(*) FROM {table}")[0][0]
+
+    def test_jsonl_only_new_complete_lines_and_resume(self):
+        path = os.path.join(self.directory, "events.jsonl")
+        lines = "".join(json.dumps({"id": index, "value": index * 1.5}) + "\n" for index in range(100))
+        self.append(path, lines + '{"id": 100, "val')
+        ingestor = self.analytics.ingest_stream(path, "events", batch_rows=1000, start=False)
+        self.assertEqual(ingestor.poll(), 100)
+        self.assertEqual(ingestor.metrics()["buffered_rows"], 100)
+        self.assertEqual(ingestor.flush(), 100)
+        # A linha incompleta só é lida quando terminar
+        self.append(path, 'ue": 150.0}\nnot json\n{"id": 101, "value": 151.5}\n')
+        self.assertEqual(ingestor.poll(), 2)
+        self.assertEqual(ingestor.flush(), 2)
+        metrics = ingestor.metrics()
+        self.assertEqual((metrics["rows_written"], metrics["parse_errors"], metrics["lag_bytes"]), (102, 1, 0))
+        self.assertEqual(self.analytics.execute_query("SELECT SUM(id) FROM events")[0][0], sum(range(102)))
+
+        # Nova instância retoma dos offsets gravados, sem duplicar linhas
+        self.analytics.disconnect()
+        self.append(path, '{"id": 102, "value": 153.0}\n')
+        self.analytics = DuckDBAnalytics(self.db_path)
+        self.analytics.connect()
+        resumed = self.analytics.ingest_stream(path, "events", start=False)
+        self.assertEqual(resumed.poll(), 1)
+        self.assertEqual(resumed.metrics()["lag_bytes"], len('{"id": 102, "value": 153.0}\n'))
+        resumed.flush()
+        self.assertEqual(self.count("events"), 103)
+
+        # Arquivo truncado (rotação) é relido desde o início
+        with open(path, "w") as handle:
+            handle.write('{"id": 200, "value": 1.0}\n')
+        self.assertEqual(resumed.poll(), 1)
+        resumed.flush()
+        self.assertEqual(self.count("events"), 104)
+
+    def test_rows_that_do_not_fit_the_table_are_skipped(self):
+        path = os.path.join(self.directory, "readings.csv")
+        self.append(path, "id,value\n1,2\n")
+        ingestor = self.analytics.ingest_stream(path, "readings", start=False)
+        ingestor.poll()
+        ingestor.flush()
+        # value é BIGINT: 1.5 e abc não são arredondados nem bloqueiam as linhas seguintes
+        self.append(path, "2,1.5\n3,2.5\n5,abc\n6,7\n")
+        ingestor.poll()
+        self.assertEqual(ingestor.flush(), 1)
+        self.append(path, "7,8\n")
+        ingestor.poll()
+        self.assertEqual(ingestor.flush(), 1)
+        metrics = ingestor.metrics()
+        self.assertEqual((metrics["parse_errors"], metrics["flush_errors"], metrics["buffered_rows"]), (3, 0, 0))
+        self.assertEqual(self.analytics.execute_query("SELECT id, value FROM readings ORDER BY id"),
+                         [(1, 2), (6, 7), (7, 8)])
+
+        # Linhas rejeitadas pelo banco (chave duplicada, NOT NULL) também são descartadas
+        self.analytics.execute_query("CREATE TABLE accounts (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL)")
+        path = os.path.join(self.directory, "accounts.jsonl")
+        self.append(path, '{"id": 1, "name": "a"}\n{"id": 1, "name": "b"}\n{"id": 2}\n{"id": 3, "name": "c"}\n')
+        ingestor = self.analytics.ingest_stream(path, "accounts", start=False)
+        ingestor.poll()
+        self.assertEqual(ingestor.flush(), 2)
+        self.assertEqual((ingestor.metrics()["parse_errors"], ingestor.metrics()["lag_bytes"]), (2, 0))
+        self.assertEqual(self.analytics.execute_query("SELECT * FROM accounts ORDER BY id"), [(1, "a"), (3, "c")])
+
+    def test_csv_background_ingestion_with_glob(self):
+        for part in range(2):
+            self.append(os.path.join(self.directory, f"part_{part}.csv"), "id,amount\n1,2.5\n")
+        ingestor = self.analytics.ingest_stream(os.path.join(self.directory, "*.csv"), "sales",
+                                                flush_interval=0.05, poll_interval=0.01)
+        self.append(os.path.join(self.directory, "part_1.csv"), "2,3.5\n3,4.5\n")
+        deadline = time.time() + 10
+        while ingestor.metrics()["rows_written"] < 4 and time.time() < deadline:
+            time.sleep(0.02)
+        ingestor.stop()
+        self.assertFalse(ingestor.running)
+        self.assertEqual(self.analytics.execute_query(
+            "SELECT COUNT(*), SUM(amount), COUNT(DISTINCT _source_file) FROM sales"), [(4, 13.0, 2)])
+        self.assertIn("sales", self.analytics.list_metadata())
+        with self.assertRaises(ValueError):
+            self.analytics.ingest_stream("events.parquet", "other", start=False)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)